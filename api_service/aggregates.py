@@ -0,0 +1,212 @@
+"""
+Dataset aggregates for the Ditto Insurance Data API.
+
+Everything in here is a pure function of a dataset snapshot's DataFrame and
+is computed once per dataset version by the DatasetStore, never on the
+request path.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+import pandas as pd
+
+from serialization import RawJSON, records_json
+
+if TYPE_CHECKING:
+    from indexes import DatasetIndex
+
+# Rating distribution buckets as (label, low, high, high inclusive); the
+# N/A bucket holds plans without a rating
+RATING_BUCKETS = [
+    ("4.0-5.0", 4.0, 5.0, True),
+    ("3.0-3.9", 3.0, 4.0, False),
+    ("2.0-2.9", 2.0, 3.0, False),
+    ("0.0-1.9", 0.0, 2.0, False),
+]
+NA_BUCKET = "N/A"
+BUCKET_LABELS = [label for label, _, _, _ in RATING_BUCKETS] + [NA_BUCKET]
+# Bucket code of ratings outside every range (counted in totals only)
+OTHER_BUCKET = len(BUCKET_LABELS)
+
+PLAN_COLUMNS = ['Company', 'Policy Name', 'Rating By Ditto', 'Plan URL']
+
+# Plans included in top_rated_plans; the full ranking is paged via /api/top-plans
+TOP_RATED_PLANS_LIMIT = 10
+
+# Companies in top_companies_by_rating, and the rated plans each needs
+TOP_COMPANIES_LIMIT = 10
+TOP_COMPANIES_MIN_PLANS = 2
+
+# Ratings carry two decimals: sums are kept in exact integer hundredths, so
+# an average does not depend on the order the ratings were added in
+RATING_SCALE = 100
+
+
+def rating_bucket_codes(ratings: np.ndarray) -> np.ndarray:
+    """Index into BUCKET_LABELS (or OTHER_BUCKET) of every rating."""
+    codes = np.full(len(ratings), OTHER_BUCKET, dtype=np.int8)
+    with np.errstate(invalid="ignore"):
+        for code, (_, low, high, inclusive) in enumerate(RATING_BUCKETS):
+            upper = ratings <= high if inclusive else ratings < high
+            codes[(ratings >= low) & upper] = code
+    codes[np.isnan(ratings)] = BUCKET_LABELS.index(NA_BUCKET)
+    return codes
+
+
+def rating_hundredths(ratings: np.ndarray) -> np.ndarray:
+    """Ratings as integer hundredths (missing ratings count as 0)."""
+    return np.rint(np.nan_to_num(ratings) * RATING_SCALE).astype(np.int64)
+
+
+def average_rating(hundredths_sum, count) -> Optional[float]:
+    """Mean rating, rounded to two decimals, from a sum of hundredths."""
+    if not count:
+        return None
+    return round(float(hundredths_sum) / count / RATING_SCALE, 2)
+
+
+def company_distribution(names, counts) -> dict:
+    """Plan count per company with any plans: most plans first, ties by name."""
+    order = sorted((i for i in range(len(names)) if counts[i] > 0), key=lambda i: (-counts[i], names[i]))
+    return {names[i]: int(counts[i]) for i in order}
+
+
+def top_companies_by_rating(names, hundredths_sums, rated_counts) -> dict:
+    """Highest average ratings (companies with enough rated plans), ties by name."""
+    eligible = [i for i in range(len(names)) if rated_counts[i] >= TOP_COMPANIES_MIN_PLANS]
+    eligible.sort(key=lambda i: (-hundredths_sums[i] / rated_counts[i], names[i]))
+    return {
+        names[i]: average_rating(hundredths_sums[i], rated_counts[i])
+        for i in eligible[:TOP_COMPANIES_LIMIT]
+    }
+
+
+@dataclass(frozen=True)
+class CompanyAggregates:
+    """
+    Plan counts and rating sums (in hundredths) per (company, rating bucket).
+
+    Rows follow the index's company codes, columns are BUCKET_LABELS plus
+    OTHER_BUCKET; every filtered statistic is a sum over a sub-grid.
+    """
+    counts: np.ndarray
+    rating_sums: np.ndarray
+
+
+def build_company_aggregates(company_codes: np.ndarray, company_count: int,
+                             bucket_codes: np.ndarray, ratings: np.ndarray) -> CompanyAggregates:
+    """Build the per-company aggregates from the index's per-row codes."""
+    width = OTHER_BUCKET + 1
+    known = company_codes >= 0
+    cells = company_codes[known] * width + bucket_codes[known]
+    size = company_count * width
+    counts = np.bincount(cells, minlength=size)
+    rating_sums = np.bincount(cells, weights=rating_hundredths(ratings[known]), minlength=size)
+    return CompanyAggregates(
+        counts=counts.reshape(company_count, width),
+        rating_sums=rating_sums.reshape(company_count, width),
+    )
+
+
+def build_statistics(df: pd.DataFrame, index: "DatasetIndex", last_updated: Optional[str]) -> dict:
+    """
+    Build the /api/statistics payload for a dataset.
+
+    The result is meant for ``serialization.dumps_object``: the plan list is
+    already encoded as a RawJSON fragment.
+    """
+    # Remove NaN ratings for statistics
+    df_with_ratings = df[df['Rating By Ditto'].notna()]
+
+    # Company distribution
+    company_counts = df['Company'].value_counts()
+    company_counts = company_distribution(company_counts.index.tolist(), company_counts.to_numpy())
+
+    # Rating distribution - combine 0.0-1.9 into single red range, include N/A
+    ratings = df_with_ratings['Rating By Ditto']
+    rating_ranges = {
+        "4.0-5.0": int(((ratings >= 4.0) & (ratings <= 5.0)).sum()),
+        "3.0-3.9": int(((ratings >= 3.0) & (ratings < 4.0)).sum()),
+        "2.0-2.9": int(((ratings >= 2.0) & (ratings < 3.0)).sum()),
+        "0.0-1.9": int(((ratings >= 0.0) & (ratings < 2.0)).sum()),
+        "N/A": int(df['Rating By Ditto'].isna().sum()),
+    }
+
+    # Top companies by average rating (at least 2 rated plans)
+    hundredths = pd.Series(rating_hundredths(ratings.to_numpy()), index=ratings.index)
+    company_ratings = hundredths.groupby(df_with_ratings['Company']).agg(['sum', 'count'])
+    top_companies = top_companies_by_rating(
+        company_ratings.index.tolist(), company_ratings['sum'].to_numpy(), company_ratings['count'].to_numpy()
+    )
+
+    # Top rated plans - the head of the index's ranking (rated plans by rating,
+    # then plans without ratings), so the payload size does not grow with the dataset
+    top_plans = df.take(index.top_plans(stop=TOP_RATED_PLANS_LIMIT))[PLAN_COLUMNS]
+
+    return {
+        "total_plans": len(df),
+        "plans_with_ratings": len(df_with_ratings),
+        "total_companies": int(df['Company'].nunique()),
+        "average_rating": average_rating(hundredths.sum(), len(hundredths)),
+        "company_distribution": company_counts,
+        "rating_distribution": rating_ranges,
+        "top_companies_by_rating": top_companies,
+        "top_rated_plans": RawJSON(records_json(top_plans)),
+        "last_updated": last_updated
+    }
+
+
+def build_filtered_statistics(
+    df: pd.DataFrame,
+    index: "DatasetIndex",
+    aggregates: CompanyAggregates,
+    company_codes: np.ndarray,
+    bucket_codes: np.ndarray,
+    plan_positions: np.ndarray,
+    last_updated: Optional[str],
+) -> dict:
+    """
+    Build the /api/statistics payload for a subset of companies and buckets.
+
+    Counts and averages come from the per-company aggregates; the plan list
+    is a bounded head of the ranking. Companies are ordered, and averages
+    computed, by the same helpers as in build_statistics, so an unfiltered
+    request gives the same payload.
+
+    Args:
+        company_codes: Selected companies (index company codes)
+        bucket_codes: Selected rating buckets (indexes into BUCKET_LABELS)
+        plan_positions: Row positions of the matching plans, in dataset order
+    """
+    names = index.company_names
+    na_code = BUCKET_LABELS.index(NA_BUCKET)
+    company_mask = np.zeros(len(names), dtype=bool)
+    company_mask[company_codes] = True
+    bucket_mask = np.zeros(OTHER_BUCKET + 1, dtype=bool)
+    bucket_mask[bucket_codes] = True
+    counts = aggregates.counts * company_mask[:, None] * bucket_mask
+    rating_sums = aggregates.rating_sums * company_mask[:, None] * bucket_mask
+
+    per_company = counts.sum(axis=1)
+    rated_per_company = per_company - counts[:, na_code]
+    rating_sum_per_company = rating_sums.sum(axis=1)
+
+    rating_distribution = {label: int(n) for label, n in zip(BUCKET_LABELS, counts.sum(axis=0))}
+
+    # Head of the ranking (rated plans by rating, then unrated ones)
+    plan_order = index.top_plans(plan_positions, stop=TOP_RATED_PLANS_LIMIT)
+
+    plans_with_ratings = int(rated_per_company.sum())
+    return {
+        "total_plans": int(per_company.sum()),
+        "plans_with_ratings": plans_with_ratings,
+        "total_companies": int((per_company > 0).sum()),
+        "average_rating": average_rating(rating_sum_per_company.sum(), plans_with_ratings),
+        "company_distribution": company_distribution(names, per_company),
+        "rating_distribution": rating_distribution,
+        "top_companies_by_rating": top_companies_by_rating(names, rating_sum_per_company, rated_per_company),
+        "top_rated_plans": RawJSON(records_json(df.take(plan_order)[PLAN_COLUMNS])),
+        "last_updated": last_updated
+    }
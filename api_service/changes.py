@@ -0,0 +1,94 @@
+"""
+Dataset version diffs for the Ditto Insurance Data API change feed.
+
+When the DatasetStore loads a new dataset version it diffs it against the
+previous one, keyed by Plan URL, and keeps the last few diffs. A client
+that last synced at version V asks for the changes since V and gets the
+net effect of every diff after it (added, changed and removed plans)
+instead of the whole dataset.
+
+'Last Updated' is rewritten for every plan on every scrape, so it is not
+compared: a plan counts as changed when its company, policy name or
+rating differs.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import pandas as pd
+
+from serialization import records_json
+
+KEY_COLUMN = "Plan URL"
+COMPARED_COLUMNS = ["Company", "Policy Name", "Rating By Ditto"]
+
+
+@dataclass(frozen=True)
+class DatasetDiff:
+    """Changes from one dataset version to the next."""
+    from_version: str
+    to_version: str
+    # Plan URL -> full record in the new version
+    added: Dict[str, Dict[str, Any]]
+    changed: Dict[str, Dict[str, Any]]
+    removed: List[str]
+
+
+def _records_by_key(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Plan URL -> record (NaN -> None) for the rows of ``df``."""
+    return {record[KEY_COLUMN]: record for record in json.loads(records_json(df))}
+
+
+def diff_datasets(old: pd.DataFrame, new: pd.DataFrame, from_version: str, to_version: str) -> DatasetDiff:
+    """Diff two dataset versions by Plan URL in one vectorized merge."""
+    columns = [KEY_COLUMN] + COMPARED_COLUMNS
+    merged = pd.merge(
+        old[columns].drop_duplicates(KEY_COLUMN).astype(object),
+        new[columns].astype(object).assign(_position=range(len(new))).drop_duplicates(KEY_COLUMN),
+        on=KEY_COLUMN, how="outer", suffixes=("_old", ""), indicator=True,
+    )
+
+    both = merged["_merge"] == "both"
+    differs = pd.Series(False, index=merged.index)
+    for column in COMPARED_COLUMNS:
+        before, after = merged[f"{column}_old"], merged[column]
+        differs |= ~((before == after) | (before.isna() & after.isna()))
+
+    # Outer merges turn the position column into floats
+    added = merged.loc[merged["_merge"] == "right_only", "_position"].to_numpy(dtype="int64")
+    changed = merged.loc[both & differs, "_position"].to_numpy(dtype="int64")
+    return DatasetDiff(
+        from_version=from_version,
+        to_version=to_version,
+        added=_records_by_key(new.take(added)),
+        changed=_records_by_key(new.take(changed)),
+        removed=merged.loc[merged["_merge"] == "left_only", KEY_COLUMN].tolist(),
+    )
+
+
+def merge_diffs(diffs: Sequence[DatasetDiff]) -> Dict[str, Any]:
+    """
+    Net effect of consecutive diffs, as the /api/changes payload fields.
+
+    A plan added and later removed does not appear at all; a plan removed
+    and later re-added counts as changed.
+    """
+    # Plan URL -> ("added" | "changed" | "removed", record)
+    net: Dict[str, tuple] = {}
+    for diff in diffs:
+        for url, record in diff.added.items():
+            net[url] = ("changed" if net.get(url, (None,))[0] == "removed" else "added", record)
+        for url, record in diff.changed.items():
+            net[url] = ("added" if net.get(url, (None,))[0] == "added" else "changed", record)
+        for url in diff.removed:
+            if net.get(url, (None,))[0] == "added":
+                del net[url]
+            else:
+                net[url] = ("removed", None)
+
+    return {
+        "added": [record for kind, record in net.values() if kind == "added"],
+        "changed": [record for kind, record in net.values() if kind == "changed"],
+        "removed": [url for url, (kind, _) in net.items() if kind == "removed"],
+    }
@@ -0,0 +1,152 @@
+"""
+Response compression for the Ditto Insurance Data API.
+
+Every /api body is a pure function of the request and the dataset version,
+so each encoded body is compressed at most once per version: a snapshot's
+BodyCache keeps the identity body and its gzip / brotli variants, and
+requests for the same URL are answered with the stored bytes. Nothing is
+compressed on the request path once an entry is warm.
+
+brotli is optional; without it only gzip is offered.
+"""
+
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IDENTITY = "identity"
+
+# Bodies smaller than this are sent uncompressed (headers would dominate)
+MIN_COMPRESS_SIZE = int(os.getenv("API_MIN_COMPRESS_SIZE", "1024"))
+# Bodies are compressed once per dataset version, so the levels lean
+# towards size rather than speed
+GZIP_LEVEL = int(os.getenv("API_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("API_BROTLI_QUALITY", "5"))
+# Total bytes of cached bodies (all encodings) kept per dataset version
+BODY_CACHE_BYTES = int(os.getenv("API_BODY_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Offered encodings, most preferred first
+SUPPORTED_ENCODINGS = (("br",) if brotli is not None else ()) + ("gzip",)
+
+
+def negotiate(accept_encoding: Optional[str]) -> str:
+    """Pick the content-coding for an Accept-Encoding header (RFC 9110 12.5.3)."""
+    if not accept_encoding:
+        return IDENTITY
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = IDENTITY, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Encode ``body`` with ``encoding`` (one of SUPPORTED_ENCODINGS or identity)."""
+    if encoding == "gzip":
+        # mtime=0 keeps the output (and so the cached bytes) deterministic
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "br":
+        return brotli.compress(body, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+    return body
+
+
+def encode(body: bytes, encoding: str) -> Tuple[bytes, str]:
+    """``(body, encoding)`` as BodyCache.get would serve it, for bodies that are not cached."""
+    if encoding == IDENTITY or len(body) < MIN_COMPRESS_SIZE:
+        return body, IDENTITY
+    return compress(body, encoding), encoding
+
+
+def _entry_size(key: Hashable, body: bytes) -> int:
+    # Keys hold the request's parameters, which can be as large as the body
+    return len(body) + len(repr(key))
+
+
+class BodyCache:
+    """
+    Encoded response bodies of one dataset version, keyed by request.
+
+    ``get(key, encoding, build)`` returns ``(body, encoding)``: the identity
+    body comes from ``build()`` on first use, each compressed variant is
+    derived from it once. The encoding actually used may be identity when
+    the body is too small to be worth compressing. Entries are evicted least
+    recently used once the cache holds more than ``max_bytes`` (bodies and
+    keys).
+    """
+
+    def __init__(self, max_bytes: int = BODY_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[Hashable, str], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, encoding: str, build: Callable[[], bytes]) -> Tuple[bytes, str]:
+        body = self._lookup(key, IDENTITY)
+        if body is None:
+            body = build()
+            self.put(key, IDENTITY, body)
+        if encoding == IDENTITY or len(body) < MIN_COMPRESS_SIZE:
+            return body, IDENTITY
+
+        encoded = self._lookup(key, encoding)
+        if encoded is None:
+            # Concurrent misses may compress twice; both results are identical
+            encoded = compress(body, encoding)
+            self.put(key, encoding, encoded)
+        return encoded, encoding
+
+    def peek(self, key: Hashable, encoding: str) -> Optional[Tuple[bytes, str]]:
+        """What ``get()`` would return if nothing needs building or compressing, else None."""
+        body = self._lookup(key, IDENTITY)
+        if body is None:
+            return None
+        if encoding == IDENTITY or len(body) < MIN_COMPRESS_SIZE:
+            return body, IDENTITY
+        encoded = self._lookup(key, encoding)
+        return None if encoded is None else (encoded, encoding)
+
+    def put(self, key: Hashable, encoding: str, body: bytes):
+        """Store an encoded body (entries larger than the whole budget are not kept)."""
+        size = _entry_size(key, body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((key, encoding), None)
+            if previous is not None:
+                self._size -= _entry_size(key, previous)
+            self._entries[(key, encoding)] = body
+            self._size += size
+            while self._size > self.max_bytes:
+                (evicted_key, _), evicted = self._entries.popitem(last=False)
+                self._size -= _entry_size(evicted_key, evicted)
+
+    def _lookup(self, key: Hashable, encoding: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get((key, encoding))
+            if body is not None:
+                self._entries.move_to_end((key, encoding))
+            return body
@@ -0,0 +1,399 @@
+"""
+In-memory dataset store for the Ditto Insurance Data API.
+
+The scraped CSV is parsed once per file version and kept in memory as an
+immutable snapshot. Request handlers only ever read the current snapshot;
+a reload builds a complete new snapshot in a background thread and then
+publishes it with a single reference assignment, so a request either sees
+the old dataset or the new one, never a partially loaded one.
+
+The scraper publishes every run through a manifest
+(ditto_insurance_data.manifest.json, see dataset_manifest.py at the
+repository root) naming an immutable, versioned snapshot of the data files
+with their checksums. When the manifest exists, the store only watches it:
+a change to its (mtime, size, inode) triple triggers a reload of the files
+it names, which are verified against their checksums and never rewritten,
+so a load can never be torn. The snapshot's version is the manifest's
+version id.
+
+Without a manifest (datasets copied in by hand), the data file itself is
+watched and its (mtime, size, inode) triple doubles as the version.
+
+When pyarrow is installed and the scraper's typed Arrow IPC / Feather copy
+of the dataset is present (and not older than the CSV), it is loaded instead
+of the CSV: no text parsing and no dtype inference. The file is memory-mapped
+and its string columns are served zero-copy from the mapping, so every
+uvicorn worker on a node shares the same page-cache-backed buffers instead
+of holding a private copy. The scraper replaces the file atomically, so a
+mapping keeps pointing at the old version until its snapshot is dropped.
+Values are the same as pd.read_csv would have produced, so responses are
+identical either way.
+
+Each snapshot also owns the cache of encoded (and compressed) response
+bodies for its version; the unfiltered statistics body is compressed in
+every supported coding while the snapshot is built.
+
+Before a reloaded snapshot is published, it is diffed against the one it
+replaces (see changes.py); the last ``max_diffs`` diffs back the
+/api/changes feed.
+
+Inside the API, the store is ``watched``: a background task (watcher.py)
+calls ``refresh()`` in a worker thread whenever a new version may exist, and
+``get()`` only reads the current reference, so request handlers never stat,
+parse or index anything. An ``on_load`` hook lets the app precompute its own
+payloads on the loading thread before the snapshot is published.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+from aggregates import CompanyAggregates, build_company_aggregates, build_statistics
+from changes import DatasetDiff, diff_datasets
+from compression import SUPPORTED_ENCODINGS, BodyCache
+from indexes import DatasetIndex, build_index
+from serialization import dumps_object
+
+logger = logging.getLogger(__name__)
+
+# File identity used to detect new dataset versions: (mtime_ns, size, inode)
+FileKey = Tuple[int, int, int]
+
+COLUMNAR_SUFFIXES = (".arrow", ".feather")
+
+# The scraper writes timestamps in this format and ratings with two decimals
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+RATING_DECIMALS = 2
+
+# BodyCache key of the unfiltered /api/statistics body
+STATISTICS_KEY = "statistics"
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """
+    An immutable, fully loaded version of the dataset.
+
+    Payloads derived from the data (e.g. the serialized statistics body and
+    the filter indexes) are computed when the snapshot is built, so they are
+    ready before the snapshot becomes visible to requests and are discarded
+    with it.
+    """
+    version: str
+    df: pd.DataFrame
+    file_key: FileKey
+    loaded_at: float
+    statistics_body: bytes
+    index: DatasetIndex
+    company_aggregates: CompanyAggregates
+    # Encoded response bodies of this version, filled as requests come in
+    bodies: BodyCache = field(default_factory=BodyCache, repr=False, compare=False)
+
+    @property
+    def mtime(self) -> float:
+        """Modification time of the source file (seconds since epoch)."""
+        return self.file_key[0] / 1e9
+
+    @property
+    def last_updated(self) -> Optional[str]:
+        """Scrape timestamp of the dataset, as written by the scraper."""
+        if len(self.df) == 0:
+            return None
+        return self.df["Last Updated"].iloc[0]
+
+
+def _stat_key(path: str) -> Optional[FileKey]:
+    """Return the identity of the file at ``path``, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def read_dataset(path: str) -> pd.DataFrame:
+    """Read a CSV or columnar (Arrow IPC / Feather) dataset file."""
+    if path.endswith(COLUMNAR_SUFFIXES):
+        return _read_columnar(path)
+    return pd.read_csv(path)
+
+
+def _arrow_string_dtype(arrow_type):
+    """types_mapper for to_pandas: keep string columns as Arrow arrays (no copy)."""
+    if pa.types.is_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def _format_timestamps(column: "pa.ChunkedArray") -> "pa.ChunkedArray":
+    """Format timestamps as TIMESTAMP_FORMAT strings."""
+    # A scrape has a handful of distinct timestamps: format each one once
+    chunks = []
+    for chunk in pc.dictionary_encode(column).chunks:
+        formatted = pc.strftime(chunk.dictionary, format=TIMESTAMP_FORMAT)
+        chunks.append(pa.DictionaryArray.from_arrays(chunk.indices, formatted).cast(pa.string()))
+    return pa.chunked_array(chunks, type=pa.string())
+
+
+def _read_columnar(path: str) -> pd.DataFrame:
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    # Company is stored dictionary-encoded (category) and Last Updated as a
+    # timestamp; both are served as the strings the CSV holds
+    table = table.set_column(
+        table.schema.get_field_index("Company"), "Company",
+        table["Company"].cast(pa.string()),
+    )
+    table = table.set_column(
+        table.schema.get_field_index("Last Updated"), "Last Updated",
+        _format_timestamps(table["Last Updated"]),
+    )
+    df = table.to_pandas(types_mapper=_arrow_string_dtype)
+    # float32 on disk; back to the float64 values the CSV holds
+    df["Rating By Ditto"] = df["Rating By Ditto"].astype("float64").round(RATING_DECIMALS)
+    return df
+
+
+def _version_from_key(key: FileKey) -> str:
+    mtime_ns, size, inode = key
+    return f"{mtime_ns:x}-{size:x}-{inode:x}"
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class DatasetSource:
+    """A dataset version to load: its data file and the identity of the watched file."""
+    path: str
+    key: FileKey
+    version: str
+    sha256: Optional[str] = None
+
+
+class DatasetStore:
+    """
+    Process-wide holder of the current dataset snapshot.
+
+    ``get()`` is cheap: it returns the current snapshot and, at most once
+    every ``check_interval`` seconds, stats the manifest (or, without one,
+    the data file). When it has changed, a background thread loads the new version while requests keep
+    being served from the previous snapshot. Only the very first load (when
+    there is nothing to serve yet) happens on the calling thread.
+
+    Once ``watched`` is set, ``get()`` does no I/O at all and new versions
+    are picked up only by calls to ``refresh()`` from the watcher.
+    """
+
+    def __init__(self, path: str, columnar_path: Optional[str] = None, check_interval: float = 1.0,
+                 max_diffs: int = 48, manifest_path: Optional[str] = None,
+                 on_load: Optional[Callable[[DatasetSnapshot], None]] = None):
+        self.path = path
+        self.columnar_path = columnar_path
+        self.manifest_path = manifest_path
+        self.check_interval = check_interval
+        # Called with every new snapshot on the loading thread, before it is published
+        self.on_load = on_load
+        # Set when a watcher calls refresh(); get() then never touches the filesystem
+        self.watched = False
+        # Diffs between consecutive loaded versions, oldest first
+        self._diffs = deque(maxlen=max_diffs)
+        self._snapshot: Optional[DatasetSnapshot] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._reloading = False
+        # (path, identity, expected sha256) of the last data file that failed
+        # verification; it is not hashed again until one of them changes
+        self._rejected: Optional[Tuple[str, Optional[FileKey], str]] = None
+
+    def get(self) -> Optional[DatasetSnapshot]:
+        """Return the current snapshot, or None if no dataset is available."""
+        snapshot = self._snapshot
+        if self.watched:
+            return snapshot
+        if snapshot is None:
+            return self._initial_load()
+
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            key = self._watch_key()
+            if key is not None and key != snapshot.file_key:
+                self._schedule_reload()
+        return snapshot
+
+    def refresh(self) -> bool:
+        """
+        Load and publish a new dataset version if there is one; blocks until
+        it is published. Returns whether the snapshot was replaced.
+        """
+        snapshot = self._snapshot
+        key = self._watch_key()
+        if key is None or (snapshot is not None and key == snapshot.file_key):
+            return False
+        with self._lock:
+            if self._reloading:
+                return False
+            self._reloading = True
+        return self._reload()
+
+    def changes(self, since: str, until: str) -> Optional[List[DatasetDiff]]:
+        """
+        The consecutive diffs leading from version ``since`` to ``until``,
+        or None if they are not all retained (the client must resync).
+        """
+        if since == until:
+            return []
+        chain = []
+        version = until
+        # Diffs newer than ``until`` (published after the caller's snapshot) are skipped
+        for diff in reversed(list(self._diffs)):
+            if diff.to_version != version:
+                if chain:
+                    return None
+                continue
+            chain.append(diff)
+            version = diff.from_version
+            if version == since:
+                return chain[::-1]
+        return None
+
+    def _watch_key(self) -> Optional[FileKey]:
+        """Identity of the file announcing new versions: the manifest, else the data file."""
+        if self.manifest_path:
+            key = _stat_key(self.manifest_path)
+            if key is not None:
+                return key
+        return self._data_file()[1]
+
+    def _source(self) -> Optional[DatasetSource]:
+        """The dataset version to load, from the manifest when there is one."""
+        if self.manifest_path:
+            key = _stat_key(self.manifest_path)
+            if key is not None:
+                with open(self.manifest_path, encoding="utf-8") as f:
+                    manifest = json.load(f)
+                files = manifest["files"]
+                entry = files["columnar"] if "columnar" in files and pa is not None else files["csv"]
+                return DatasetSource(
+                    path=os.path.join(os.path.dirname(self.manifest_path), entry["path"]),
+                    key=key,
+                    version=manifest["version"],
+                    sha256=entry.get("sha256"),
+                )
+        path, key = self._data_file()
+        if key is None:
+            return None
+        return DatasetSource(path=path, key=key, version=_version_from_key(key))
+
+    def _data_file(self) -> Tuple[str, Optional[FileKey]]:
+        """The file to load and its identity: the columnar copy when usable, else the CSV."""
+        csv_key = _stat_key(self.path)
+        if self.columnar_path and pa is not None:
+            key = _stat_key(self.columnar_path)
+            # Skip a columnar file left behind by an older scrape
+            if key is not None and (csv_key is None or key[0] >= csv_key[0]):
+                return self.columnar_path, key
+        return self.path, csv_key
+
+    def _initial_load(self) -> Optional[DatasetSnapshot]:
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._load()
+                self._last_check = time.monotonic()
+            return self._snapshot
+
+    def _schedule_reload(self):
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, name="dataset-reload", daemon=True).start()
+
+    def _reload(self) -> bool:
+        try:
+            snapshot = self._load()
+            if snapshot is not None:
+                previous = self._snapshot
+                if previous is not None and previous.version != snapshot.version:
+                    try:
+                        self._diffs.append(diff_datasets(previous.df, snapshot.df, previous.version, snapshot.version))
+                    except Exception:
+                        # The gap makes clients older than this version resync
+                        logger.exception("Failed to diff dataset version %s", snapshot.version)
+                self._snapshot = snapshot
+                logger.info("Loaded dataset version %s (%d records)", snapshot.version, len(snapshot.df))
+                return True
+        except Exception:
+            logger.exception("Failed to reload dataset from %s", self.path)
+        finally:
+            with self._lock:
+                self._reloading = False
+        return False
+
+    def _load(self) -> Optional[DatasetSnapshot]:
+        """Read the data file and build a snapshot, or None if it is missing."""
+        source = self._source()
+        if source is None:
+            return None
+
+        if source.sha256 is not None:
+            checked = (source.path, _stat_key(source.path), source.sha256)
+            if checked == self._rejected:
+                return None
+            if _sha256_file(source.path) != source.sha256:
+                logger.error("Dataset %s does not match its manifest checksum, skipping", source.path)
+                self._rejected = checked
+                return None
+
+        df = read_dataset(source.path)
+
+        # Without a manifest the data file may be rewritten in place; if it
+        # changed while we were reading, the parse may be torn. Keep the old
+        # snapshot and let the next check pick up the finished file.
+        if self._watch_key() != source.key:
+            logger.warning("Dataset %s changed during load, retrying later", source.path)
+            return None
+
+        last_updated = df["Last Updated"].iloc[0] if len(df) > 0 else None
+        index = build_index(df)
+        statistics_body = dumps_object(build_statistics(df, index, last_updated))
+        snapshot = DatasetSnapshot(
+            version=source.version,
+            df=df,
+            file_key=source.key,
+            loaded_at=time.time(),
+            statistics_body=statistics_body,
+            index=index,
+            company_aggregates=build_company_aggregates(
+                index.company_codes, len(index.company_names), index.bucket_codes, index.ratings
+            ),
+        )
+        for encoding in SUPPORTED_ENCODINGS:
+            snapshot.bodies.get(STATISTICS_KEY, encoding, lambda: statistics_body)
+        if self.on_load is not None:
+            try:
+                self.on_load(snapshot)
+            except Exception:
+                # Whatever was not precomputed is built by the first request
+                logger.exception("Failed to precompute payloads for dataset version %s", snapshot.version)
+        return snapshot
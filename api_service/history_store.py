@@ -0,0 +1,97 @@
+"""
+Read-only access to the scraper's rating history for the Ditto Insurance
+Data API.
+
+The scraper appends every run to a SQLite database (rating_history.py at
+the repository root): plans, plus a ratings table that only stores a plan's
+first rating and every change, clustered on (plan_id, scraped_at) and
+indexed on scraped_at. Every query here is a range scan over one of those
+keys, so it stays fast however long the history grows.
+
+The file is opened read-only with one connection per thread; the scraper
+writes in WAL mode, so readers never block it and never see a partial run.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _time_range(since: Optional[str], until: Optional[str]) -> Tuple[str, list]:
+    """SQL conditions (and parameters) bounding r.scraped_at, both ends inclusive."""
+    sql, params = "", []
+    if since is not None:
+        sql += " AND r.scraped_at >= ?"
+        params.append(since)
+    if until is not None:
+        sql += " AND r.scraped_at <= ?"
+        params.append(until)
+    return sql, params
+
+
+class HistoryStore:
+    """Rating time-series queries against the history database at ``path``."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _query(self, sql: str, params) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self._conn().execute(sql, params)]
+
+    def plan_history(self, url: str, since: Optional[str] = None,
+                     until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rating changes of one plan, oldest first."""
+        bounds, params = _time_range(since, until)
+        return self._query(
+            "SELECT r.scraped_at, r.rating FROM plans p JOIN ratings r ON r.plan_id = p.id "
+            f"WHERE p.url = ?{bounds} ORDER BY r.scraped_at",
+            [url] + params,
+        )
+
+    def company_history(self, company: str, since: Optional[str] = None,
+                        until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rating changes of every plan of one company, by plan then time."""
+        bounds, params = _time_range(since, until)
+        return self._query(
+            "SELECT p.url AS plan_url, p.policy_name, r.scraped_at, r.rating "
+            "FROM plans p JOIN ratings r ON r.plan_id = p.id "
+            f"WHERE p.company = ?{bounds} "
+            "ORDER BY p.policy_name, p.url, r.scraped_at",
+            [company] + params,
+        )
+
+    def changes_since(self, since: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Ratings recorded after ``since`` for plans that already had one,
+        with the value they replaced, oldest first.
+        """
+        return self._query(
+            "SELECT p.url AS plan_url, p.company, p.policy_name, r.scraped_at, "
+            "  prev.rating AS previous_rating, r.rating "
+            "FROM ratings r INDEXED BY ratings_scraped_at "
+            "JOIN plans p ON p.id = r.plan_id "
+            "JOIN ratings prev ON prev.plan_id = r.plan_id AND prev.scraped_at = ("
+            "  SELECT MAX(scraped_at) FROM ratings WHERE plan_id = r.plan_id AND scraped_at < r.scraped_at) "
+            "WHERE r.scraped_at > ? ORDER BY r.scraped_at, p.url LIMIT ?",
+            (since, limit),
+        )
+
+    def runs(self, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Scrape runs recorded after ``since``, oldest first."""
+        return self._query(
+            "SELECT scraped_at, records FROM runs WHERE scraped_at > ? ORDER BY scraped_at",
+            (since or "",),
+        )
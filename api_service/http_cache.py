@@ -0,0 +1,90 @@
+"""
+HTTP caching helpers for the Ditto Insurance Data API.
+
+Every /api response is a pure function of the request URL and the dataset
+version, so the version doubles as a strong ETag and the data file's mtime
+as Last-Modified. Clients (and the nginx proxy cache in front of the API)
+revalidate with If-None-Match / If-Modified-Since and get a bodiless 304
+until the scraper publishes a new dataset.
+
+Each content-coding of a body is its own representation, so gzip and
+brotli responses carry the version tag with the coding appended. Any of a
+version's tags revalidates, whatever coding the client now asks for.
+"""
+
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict
+
+from fastapi import Request
+
+from compression import IDENTITY, SUPPORTED_ENCODINGS
+from dataset_store import DatasetSnapshot
+
+# How long browsers and nginx may reuse a response without revalidating.
+# The scraper runs every 30 minutes, so a short max-age keeps data fresh
+# while revalidation (304) covers the rest.
+CACHE_MAX_AGE = int(os.getenv("API_CACHE_MAX_AGE", "60"))
+CACHE_CONTROL = f"public, max-age={CACHE_MAX_AGE}, must-revalidate"
+
+
+def etag_for(snapshot: DatasetSnapshot, encoding: str = IDENTITY) -> str:
+    """Strong ETag for this dataset version in the given content-coding."""
+    if encoding == IDENTITY:
+        return f'"{snapshot.version}"'
+    return f'"{snapshot.version}-{encoding}"'
+
+
+def version_from_etag(etag: str) -> str:
+    """Dataset version named by an ETag from etag_for (or a bare version)."""
+    etag = etag.strip()
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    etag = etag.strip('"')
+    for encoding in SUPPORTED_ENCODINGS:
+        if etag.endswith(f"-{encoding}"):
+            return etag[:-len(encoding) - 1]
+    return etag
+
+
+def cache_headers(snapshot: DatasetSnapshot, encoding: str = IDENTITY) -> Dict[str, str]:
+    """Validator and Cache-Control headers for a response built from ``snapshot``."""
+    return {
+        "ETag": etag_for(snapshot, encoding),
+        "Last-Modified": formatdate(snapshot.mtime, usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+
+
+def _etag_matches(if_none_match: str, snapshot: DatasetSnapshot) -> bool:
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2)
+    if if_none_match.strip() == "*":
+        return True
+    etags = {etag_for(snapshot, encoding) for encoding in (IDENTITY,) + SUPPORTED_ENCODINGS}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, snapshot: DatasetSnapshot) -> bool:
+    """Whether the client's cached copy of ``snapshot`` is still current."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present
+        return _etag_matches(if_none_match, snapshot)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(snapshot.mtime) <= since
+
+    return False
@@ -0,0 +1,238 @@
+"""
+Per-version lookup indexes for the Ditto Insurance Data API.
+
+Built once per dataset snapshot by the DatasetStore so that /api/data
+filters never scan the whole frame:
+- company: each distinct company name maps to the sorted row positions of
+  its plans, and a suffix array over the lowercase names answers prefix and
+  substring queries without scanning rows
+- rating: row positions ordered by rating, so a min/max rating range is two
+  binary searches into the sorted ratings, plus the row positions of each
+  rating distribution bucket
+- top plans: the full "top rated plans" ranking (rated plans by rating,
+  then unrated ones) and each row's rank in it, so any page of the ranking,
+  filtered or not, is read without re-sorting the dataset
+- sort: per-column ranks, built on first use, so a page of sorted results
+  is an integer sort of the matching rows (or, for the whole dataset, a
+  slice of a cached order)
+
+A filtered request costs O(log n + candidates) instead of O(n) string
+matching and boolean masks.
+"""
+
+import bisect
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from aggregates import OTHER_BUCKET, rating_bucket_codes
+
+# Queries containing any of these are matched as regular expressions, like
+# Series.str.contains does; everything else is a plain substring
+REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+# A sort specification: (column, descending) pairs, most significant first
+SortKeys = Tuple[Tuple[str, bool], ...]
+
+
+@dataclass(frozen=True)
+class DatasetIndex:
+    """Immutable lookup structures for one dataset version."""
+    size: int
+    company_names: List[str]
+    company_lookup: Dict[str, int]
+    company_codes: np.ndarray
+    company_positions: List[np.ndarray]
+    name_suffixes: List[Tuple[str, int]]
+    ratings: np.ndarray
+    rating_order: np.ndarray
+    sorted_ratings: np.ndarray
+    bucket_codes: np.ndarray
+    bucket_positions: List[np.ndarray]
+    top_plan_order: np.ndarray
+    top_plan_rank: np.ndarray
+    # Filled lazily by rank() / sort(); plain dict writes are thread-safe
+    sort_ranks: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+    sort_orders: Dict[SortKeys, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def matching_companies(self, query: str) -> np.ndarray:
+        """Codes of the companies whose name contains ``query`` (case-insensitive)."""
+        if REGEX_METACHARACTERS.intersection(query):
+            pattern = re.compile(query, re.IGNORECASE)
+            codes = [code for code, name in enumerate(self.company_names) if pattern.search(name)]
+        else:
+            # Every suffix starting with the query marks a name containing it
+            query = query.lower()
+            start = bisect.bisect_left(self.name_suffixes, (query,))
+            codes = set()
+            for suffix, code in self.name_suffixes[start:]:
+                if not suffix.startswith(query):
+                    break
+                codes.add(code)
+        return np.array(sorted(codes), dtype=np.intp)
+
+    def rating_range(self, min_rating: Optional[float], max_rating: Optional[float]) -> np.ndarray:
+        """Row positions (in rating order) of the rated plans within the bounds."""
+        if (min_rating is not None and math.isnan(min_rating)) or \
+                (max_rating is not None and math.isnan(max_rating)):
+            return self.rating_order[:0]
+        lo = 0 if min_rating is None else np.searchsorted(self.sorted_ratings, min_rating, side="left")
+        hi = len(self.sorted_ratings) if max_rating is None else \
+            np.searchsorted(self.sorted_ratings, max_rating, side="right")
+        return self.rating_order[lo:max(lo, hi)]
+
+    def exact_companies(self, names: Iterable[str]) -> np.ndarray:
+        """Codes of the named companies (exact names; unknown names are ignored)."""
+        return np.array(sorted({self.company_lookup[name] for name in names if name in self.company_lookup}),
+                        dtype=np.intp)
+
+    def filter(
+        self,
+        company: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+        companies: Optional[np.ndarray] = None,
+        buckets: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Row positions matching the /api/data filters, in dataset order.
+
+        ``companies`` and ``buckets`` are sets of company codes and rating
+        bucket codes (see exact_companies and aggregates.BUCKET_LABELS).
+        Starts from the smallest candidate set and checks the other
+        conditions only on those rows.
+        """
+        # (candidate positions, in dataset order?, row check) per condition
+        conditions = []
+        if company:
+            codes = self.matching_companies(company)
+            conditions.append((_union(self.company_positions, codes), True,
+                               lambda rows, codes=codes: np.isin(self.company_codes[rows], codes)))
+        if companies is not None:
+            conditions.append((_union(self.company_positions, companies), True,
+                               lambda rows: np.isin(self.company_codes[rows], companies)))
+        if buckets is not None:
+            conditions.append((_union(self.bucket_positions, buckets), True,
+                               lambda rows: np.isin(self.bucket_codes[rows], buckets)))
+        if min_rating is not None or max_rating is not None:
+            def in_range(rows):
+                ratings = self.ratings[rows]
+                keep = np.ones(len(rows), dtype=bool)
+                if min_rating is not None:
+                    keep &= ratings >= min_rating
+                if max_rating is not None:
+                    keep &= ratings <= max_rating
+                return keep
+            conditions.append((self.rating_range(min_rating, max_rating), False, in_range))
+
+        if not conditions:
+            return np.arange(self.size)
+
+        smallest = min(range(len(conditions)), key=lambda i: len(conditions[i][0]))
+        rows, ordered, _ = conditions[smallest]
+        for i, (_, _, check) in enumerate(conditions):
+            if i != smallest:
+                rows = rows[check(rows)]
+        return rows if ordered else np.sort(rows)
+
+    def top_plans(self, positions: Optional[np.ndarray] = None, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Row positions in top-plans order, optionally only those in ``positions``.
+
+        With ``stop``, only the first ``stop`` entries of the ranking are
+        returned, selected in O(len(positions)) without a full sort.
+        """
+        if positions is None:
+            return self.top_plan_order[:stop]
+        ranks = self.top_plan_rank[positions]
+        if stop is not None and stop < len(ranks):
+            ranks = np.partition(ranks, stop)[:stop]
+        return self.top_plan_order[np.sort(ranks)]
+
+    def rank(self, df: pd.DataFrame, column: str) -> np.ndarray:
+        """Dense rank of every row by ``column``; missing values get -1."""
+        ranks = self.sort_ranks.get(column)
+        if ranks is None:
+            ranks, _ = pd.factorize(df[column], sort=True)
+            self.sort_ranks[column] = ranks
+        return ranks
+
+    def sort(self, df: pd.DataFrame, positions: np.ndarray, keys: SortKeys) -> np.ndarray:
+        """
+        Reorder row positions by ``keys``.
+
+        Missing values sort last in either direction and ties keep dataset
+        order. Sorting the whole dataset is cached per sort specification.
+        """
+        complete = len(positions) == self.size
+        if complete and keys in self.sort_orders:
+            return self.sort_orders[keys]
+
+        lexsort_keys = []
+        for column, descending in reversed(keys):  # np.lexsort: last key is primary
+            ranks = self.rank(df, column)[positions]
+            lexsort_keys.append(np.where(ranks < 0, self.size, -ranks if descending else ranks))
+        order = positions[np.lexsort(lexsort_keys)]
+
+        if complete:
+            self.sort_orders[keys] = order
+        return order
+
+
+def _union(positions: List[np.ndarray], codes: np.ndarray) -> np.ndarray:
+    """Sorted union of the position arrays selected by ``codes``."""
+    if len(codes) == 1:
+        return positions[codes[0]]
+    return np.sort(np.concatenate([positions[code] for code in codes] or [np.empty(0, dtype=np.intp)]))
+
+
+def _group_positions(codes: np.ndarray, count: int) -> List[np.ndarray]:
+    """Row positions of each code 0..count-1, in dataset order."""
+    # Stable sort keeps each group's positions in dataset order
+    by_code = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[by_code], np.arange(count + 1))
+    return [by_code[bounds[i]:bounds[i + 1]] for i in range(count)]
+
+
+def build_index(df: pd.DataFrame) -> DatasetIndex:
+    """Build the lookup indexes for a dataset."""
+    company_codes, company_names = pd.factorize(df["Company"])
+    company_names = [str(name) for name in company_names]
+    company_positions = _group_positions(company_codes, len(company_names))
+
+    name_suffixes = sorted(
+        (name.lower()[i:], code)
+        for code, name in enumerate(company_names)
+        for i in range(len(name))
+    )
+
+    ratings = df["Rating By Ditto"].to_numpy(dtype="float64", na_value=np.nan)
+    rated = np.flatnonzero(~np.isnan(ratings))
+    rating_order = rated[np.argsort(ratings[rated], kind="stable")]
+    bucket_codes = rating_bucket_codes(ratings)
+
+    # Rated plans by rating (descending, ties in dataset order), then unrated
+    # ones: argsort puts NaN last
+    top_plan_order = np.argsort(-ratings, kind="stable")
+    top_plan_rank = np.empty_like(top_plan_order)
+    top_plan_rank[top_plan_order] = np.arange(len(top_plan_order))
+
+    return DatasetIndex(
+        size=len(df),
+        company_names=company_names,
+        company_lookup={name: code for code, name in enumerate(company_names)},
+        company_codes=company_codes,
+        company_positions=company_positions,
+        name_suffixes=name_suffixes,
+        ratings=ratings,
+        rating_order=rating_order,
+        sorted_ratings=ratings[rating_order],
+        bucket_codes=bucket_codes,
+        bucket_positions=_group_positions(bucket_codes, OTHER_BUCKET + 1),
+        top_plan_order=top_plan_order,
+        top_plan_rank=top_plan_rank,
+    )
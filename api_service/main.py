@@ -10,21 +10,139 @@ This service provides REST API endpoints to:
 Endpoints:
     GET / - API information
     GET /health - Health check with data status
-    GET /api/data - Get insurance plans with optional filters
-    GET /api/statistics - Get aggregated statistics for charts
+    GET /api/data - Get insurance plans with optional filters, sorting,
+                    paging (offset/limit) and field projection
+    GET /api/export - Stream all matching plans as NDJSON or CSV (same
+                      filters, sorting and fields as /api/data)
+    GET /api/statistics - Get aggregated statistics for charts (optionally for
+                          a subset of companies / rating buckets)
+    GET /api/top-plans - Page through plans ranked by rating (optionally for
+                         a subset of companies / rating buckets)
     GET /api/companies - Get list of all insurance companies
+    GET /api/changes - Plans added / changed / removed since a dataset version
+    GET /api/history/plan - Rating changes of one plan over time
+    GET /api/history/company - Rating changes of every plan of a company
+    GET /api/history/changes - Rating changes recorded since a timestamp
+
+The dataset endpoints (/api/data, /api/export, /api/statistics,
+/api/top-plans, /api/companies, /api/changes) carry an ETag and
+Last-Modified derived from the dataset version and answer conditional
+requests with 304 Not Modified. Their bodies are negotiated as brotli /
+gzip (Accept-Encoding) and encoded and compressed once per dataset version
+and request, then served from the snapshot's cache. The /api/history
+endpoints read the rating history, which changes independently of the
+dataset version, so they carry no validators and are built per request.
+
+New dataset versions are picked up by a background watcher started in the
+app's lifespan (see watcher.py): it loads and precomputes the next snapshot
+in a worker thread and publishes it with one reference assignment, so
+handlers never wait on pandas I/O.
+
+Handlers themselves only do cheap work on the event loop (parsing, cache
+lookups). Building a body that is not cached yet, selecting rows for an
+export and querying the rating history run in a bounded worker pool (see
+workers.py); when API_WORKER_THREADS jobs are running and API_WORKER_QUEUE
+more are waiting, requests that need the pool get 503 with Retry-After.
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import pandas as pd
+from fastapi.responses import Response, StreamingResponse
 import os
 from typing import Optional, List
-from datetime import datetime
-import json
+import numpy as np
+
+from aggregates import BUCKET_LABELS, OTHER_BUCKET, PLAN_COLUMNS, build_filtered_statistics
+from changes import merge_diffs
+from compression import IDENTITY, SUPPORTED_ENCODINGS, encode, negotiate
+from dataset_store import STATISTICS_KEY, DatasetSnapshot, DatasetStore
+from history_store import HistoryStore
+from http_cache import cache_headers, is_not_modified, version_from_etag
+from serialization import RawJSON, csv_lines, dumps, dumps_object, ndjson_lines, records_json
+from watcher import watch_dataset
+from workers import Overloaded, WorkerPool
+
+# Data file path - can be overridden via environment variable
+# Default: /app/data/ditto_insurance_data.csv (inside container)
+DATA_FILE = os.getenv("DATA_FILE", "/app/data/ditto_insurance_data.csv")
+# Typed Arrow/Feather copy written by the scraper; preferred when pyarrow is installed
+COLUMNAR_DATA_FILE = os.getenv("COLUMNAR_DATA_FILE", os.path.splitext(DATA_FILE)[0] + ".arrow")
+
+# Manifest the scraper publishes each dataset version through; when present,
+# the API loads the immutable snapshot it names instead of the files above
+MANIFEST_FILE = os.getenv("MANIFEST_FILE", os.path.splitext(DATA_FILE)[0] + ".manifest.json")
+
+# SQLite rating history appended to by the scraper on every run
+HISTORY_FILE = os.getenv("HISTORY_FILE", os.path.splitext(DATA_FILE)[0] + "_history.sqlite")
+
+# Rows encoded per chunk of an /api/export stream
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
 
-app = FastAPI(title="Ditto Insurance Data API", version="1.0.0")
+# Dataset version diffs kept for /api/changes (the scraper runs every 30 minutes)
+CHANGE_FEED_VERSIONS = int(os.getenv("CHANGE_FEED_VERSIONS", "48"))
+
+# Worker threads for blocking dataset work, and how many jobs may wait for
+# one before requests are shed with 503. A queued job waits for the ones
+# ahead of it, so the queue is kept short (two jobs per thread): with a
+# deep queue an overloaded API still admits every request and each one
+# waits the whole backlog (see benchmarks/bench_api_concurrency.py)
+API_WORKER_THREADS = int(os.getenv("API_WORKER_THREADS", str(os.cpu_count() or 1)))
+API_WORKER_QUEUE = int(os.getenv("API_WORKER_QUEUE", str(2 * max(API_WORKER_THREADS, 1))))
+# Retry-After (seconds) sent with a 503 when the pool is full
+OVERLOAD_RETRY_AFTER = os.getenv("OVERLOAD_RETRY_AFTER", "1")
+
+# Seconds between dataset checks when file events are unavailable (and as a
+# safety net when they are)
+DATASET_POLL_INTERVAL = float(os.getenv("DATASET_POLL_INTERVAL", "5"))
+
+# Columns the dashboard sorts by; their sort ranks are computed with the snapshot
+WARM_SORT_COLUMNS = ["Rating By Ditto", "Company", "Policy Name"]
+
+COMPANIES_KEY = ("/api/companies",)
+
+def companies_body(snapshot: DatasetSnapshot) -> bytes:
+    companies = sorted(snapshot.df['Company'].unique().tolist())
+    return dumps({"companies": companies, "count": len(companies)})
+
+def warm_snapshot(snapshot: DatasetSnapshot):
+    """Precompute payloads of a new snapshot before it is published"""
+    for column in WARM_SORT_COLUMNS:
+        if column in snapshot.df.columns:
+            snapshot.index.rank(snapshot.df, column)
+    body = companies_body(snapshot)
+    for encoding in SUPPORTED_ENCODINGS:
+        snapshot.bodies.get(COMPANIES_KEY, encoding, lambda: body)
+
+# Parsed dataset shared by all requests; reloaded by the watcher when the
+# scraper publishes a new version
+store = DatasetStore(DATA_FILE, COLUMNAR_DATA_FILE, max_diffs=CHANGE_FEED_VERSIONS,
+                     manifest_path=MANIFEST_FILE, on_load=warm_snapshot)
+history = HistoryStore(HISTORY_FILE)
+pool = WorkerPool(API_WORKER_THREADS, API_WORKER_QUEUE)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the current version before serving, then let the watcher refresh it
+    store.watched = True
+    await asyncio.to_thread(store.refresh)
+    watcher = asyncio.create_task(
+        watch_dataset(store, [MANIFEST_FILE, DATA_FILE, COLUMNAR_DATA_FILE], DATASET_POLL_INTERVAL)
+    )
+    try:
+        yield
+    finally:
+        watcher.cancel()
+        try:
+            await watcher
+        except asyncio.CancelledError:
+            pass
+        pool.shutdown()
+
+app = FastAPI(title="Ditto Insurance Data API", version="1.0.0", lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -35,10 +153,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Data file path - can be overridden via environment variable
-# Default: /app/data/ditto_insurance_data.csv (inside container)
-DATA_FILE = os.getenv("DATA_FILE", "/app/data/ditto_insurance_data.csv")
-
 @app.get("/")
 async def root():
     return {"message": "Ditto Insurance Data API", "version": "1.0.0"}
@@ -47,136 +161,483 @@ async def root():
 async def health():
     """Health check endpoint"""
     try:
-        if os.path.exists(DATA_FILE):
-            df = pd.read_csv(DATA_FILE)
+        snapshot = store.get()
+        if snapshot is not None:
             return {
                 "status": "healthy",
-                "records": len(df),
-                "last_updated": df["Last Updated"].iloc[0] if len(df) > 0 else None
+                "records": len(snapshot.df),
+                "last_updated": snapshot.last_updated,
+                "data_version": snapshot.version
             }
         return {"status": "no_data", "message": "Data file not found"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+async def offload(fn, *args):
+    """Run blocking ``fn(*args)`` in the worker pool; 503 when the pool is full"""
+    try:
+        return await pool.run(fn, *args)
+    except Overloaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, retry later",
+            headers={"Retry-After": OVERLOAD_RETRY_AFTER},
+        )
+
+def not_modified(request: Request, snapshot: DatasetSnapshot) -> Response:
+    """Bodiless 304 for a client whose copy of ``snapshot`` is current"""
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    return Response(status_code=304, headers=cache_headers(snapshot, encoding))
+
+async def cached_response(request: Request, snapshot: DatasetSnapshot, key, build) -> Response:
+    """
+    JSON response with the body for ``key`` from the snapshot's body cache.
+
+    ``build()`` encodes the body on the first request for ``key`` in this
+    dataset version; later requests (in any encoding) reuse the stored bytes.
+    Cache hits are served on the event loop; building and compressing a
+    body runs in the worker pool. With ``key`` None the body is built for
+    this request only.
+    """
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    if key is None:
+        cached = await offload(lambda: encode(build(), encoding))
+    else:
+        cached = snapshot.bodies.peek(key, encoding)
+    if cached is None:
+        cached = await offload(snapshot.bodies.get, key, encoding, build)
+    body, encoding = cached
+    headers = cache_headers(snapshot, encoding)
+    if encoding != IDENTITY:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def frozen(value):
+    """Hashable form of a parsed parameter value"""
+    if isinstance(value, np.ndarray):
+        return tuple(value.tolist())
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+def request_key(request: Request, **params) -> Optional[tuple]:
+    """
+    Body cache key: the endpoint and its parsed, validated parameters, so
+    every spelling of the same request (parameter order, repeated or
+    reordered list values, unknown company names) shares one entry.
+
+    None (do not cache) when the query string carries a parameter the
+    endpoint does not take: it cannot change the body, but would let any
+    client fill the cache with distinct URLs.
+    """
+    if not request.query_params.keys() <= params.keys():
+        return None
+    return (request.url.path,) + tuple((name, frozen(value)) for name, value in sorted(params.items()))
+
+def parse_fields(fields: Optional[str], columns) -> Optional[List[str]]:
+    """Parse a comma-separated column list (e.g. "Company,Policy Name")"""
+    if not fields:
+        return None
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    return selected
+
+def parse_sort(sort: Optional[str], columns) -> tuple:
+    """Parse a comma-separated sort spec; a leading '-' sorts that column descending"""
+    if not sort:
+        return ()
+    keys = []
+    for name in sort.split(","):
+        name = name.strip()
+        descending = name.startswith("-")
+        name = name.lstrip("-").strip()
+        if name not in columns:
+            raise HTTPException(status_code=400, detail=f"Unknown sort field: {name}")
+        keys.append((name, descending))
+    return tuple(keys)
+
+def parse_buckets(rating_buckets: Optional[List[str]]) -> Optional[np.ndarray]:
+    """Map rating bucket labels (e.g. "4.0-5.0", "N/A") to bucket codes"""
+    if rating_buckets is None:
+        return None
+    unknown = [label for label in rating_buckets if label not in BUCKET_LABELS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown rating bucket(s): {', '.join(unknown)} (expected: {', '.join(BUCKET_LABELS)})",
+        )
+    return np.array(sorted({BUCKET_LABELS.index(label) for label in rating_buckets}), dtype=np.intp)
+
+def parse_companies(companies: Optional[List[str]], snapshot: DatasetSnapshot) -> Optional[np.ndarray]:
+    """Codes of the named companies (exact names; unknown names match nothing)"""
+    if companies is None:
+        return None
+    return snapshot.index.exact_companies(companies)
+
+def select_positions(
+    snapshot: DatasetSnapshot,
+    company: Optional[str],
+    min_rating: Optional[float],
+    max_rating: Optional[float],
+    company_codes: Optional[np.ndarray],
+    buckets: Optional[np.ndarray],
+    sort_keys: tuple,
+) -> np.ndarray:
+    """Row positions matching the /api/data filters, in ``sort_keys`` order"""
+    # Apply filters via the snapshot's company and rating indexes
+    positions = snapshot.index.filter(company, min_rating, max_rating, company_codes, buckets)
+    if sort_keys:
+        positions = snapshot.index.sort(snapshot.df, positions, sort_keys)
+    return positions
+
 @app.get("/api/data")
 async def get_data(
+    request: Request,
     company: Optional[str] = None,
     min_rating: Optional[float] = None,
     max_rating: Optional[float] = None,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    offset: int = Query(0, ge=0),
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    companies: Optional[List[str]] = Query(None),
+    rating_buckets: Optional[List[str]] = Query(None)
 ):
-    """Get insurance data with optional filters"""
+    """
+    Get insurance data with optional filters.
+
+    - company: case-insensitive substring of the company name
+    - companies: exact company names (repeatable), any of them matches
+    - rating_buckets: rating distribution buckets (repeatable, e.g. "4.0-5.0", "N/A")
+
+    - sort: comma-separated columns, '-' prefix for descending
+      (e.g. "-Rating By Ditto,Company"); missing ratings always sort last
+    - offset/limit: page of the (sorted) matches; total_matches counts them all
+    - fields: comma-separated columns to return (default: all)
+    """
     try:
-        if not os.path.exists(DATA_FILE):
+        snapshot = store.get()
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="Data file not found")
+        # Invalid parameters are a 400 even for a client holding a current ETag
+        columns = parse_fields(fields, snapshot.df.columns)
+        sort_keys = parse_sort(sort, snapshot.df.columns)
+        buckets = parse_buckets(rating_buckets)
+        if is_not_modified(request, snapshot):
+            return not_modified(request, snapshot)
+        
+        company_codes = parse_companies(companies, snapshot)
+        limit = limit or None
+        key = request_key(
+            request, company=company, min_rating=min_rating, max_rating=max_rating, limit=limit,
+            offset=offset, sort=sort_keys, fields=columns, companies=company_codes, rating_buckets=buckets,
+        )
         
-        df = pd.read_csv(DATA_FILE)
+        def build() -> bytes:
+            positions = select_positions(
+                snapshot, company, min_rating, max_rating, company_codes, buckets, sort_keys
+            )
+            total_matches = len(positions)
+            
+            positions = positions[offset:]
+            if limit:
+                positions = positions[:limit]
+            
+            # Only the requested page (and columns) is materialized and encoded
+            df = snapshot.df.take(positions)
+            if columns is not None:
+                df = df[columns]
+            
+            # Encode in one vectorized pass (NaN -> null) and send the bytes as-is
+            return dumps_object({
+                "total": len(df),
+                "total_matches": total_matches,
+                "offset": offset,
+                "data": RawJSON(records_json(df)),
+            })
         
-        # Apply filters
-        if company:
-            df = df[df['Company'].str.contains(company, case=False, na=False)]
+        return await cached_response(request, snapshot, key, build)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def export_chunk(snapshot: DatasetSnapshot, positions: np.ndarray, columns, format: str, header: bool) -> bytes:
+    """Encode the rows at ``positions`` as CSV or NDJSON"""
+    df = snapshot.df.take(positions)
+    if columns is not None:
+        df = df[columns]
+    if format == "csv":
+        return csv_lines(df, header=header)
+    return ndjson_lines(df)
+
+async def export_chunks(snapshot: DatasetSnapshot, positions: np.ndarray, columns, format: str):
+    """
+    Encode the rows at ``positions`` EXPORT_CHUNK_ROWS at a time, each chunk
+    in the worker pool. The export was admitted when its rows were selected,
+    so its chunks queue rather than being shed.
+    """
+    for start in range(0, max(len(positions), 1), EXPORT_CHUNK_ROWS):
+        chunk = await pool.run(
+            export_chunk, snapshot, positions[start:start + EXPORT_CHUNK_ROWS], columns, format, start == 0,
+            shed=False,
+        )
+        if chunk:
+            yield chunk
+
+@app.get("/api/export")
+async def export_data(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    company: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    companies: Optional[List[str]] = Query(None),
+    rating_buckets: Optional[List[str]] = Query(None)
+):
+    """
+    Stream every plan matching the /api/data filters as NDJSON (one object
+    per line) or CSV (with a header row).
+
+    Rows are encoded and sent in chunks of EXPORT_CHUNK_ROWS, so memory use
+    does not grow with the size of the export.
+    """
+    try:
+        snapshot = store.get()
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="Data file not found")
+        columns = parse_fields(fields, snapshot.df.columns)
+        sort_keys = parse_sort(sort, snapshot.df.columns)
+        buckets = parse_buckets(rating_buckets)
+        if is_not_modified(request, snapshot):
+            return not_modified(request, snapshot)
         
-        if min_rating is not None:
-            df = df[df['Rating By Ditto'] >= min_rating]
+        positions = await offload(
+            select_positions, snapshot, company, min_rating, max_rating,
+            parse_companies(companies, snapshot), buckets, sort_keys,
+        )
         
-        if max_rating is not None:
-            df = df[df['Rating By Ditto'] <= max_rating]
+        headers = cache_headers(snapshot)
+        headers["Content-Disposition"] = f'attachment; filename="ditto_insurance_data.{format}"'
+        return StreamingResponse(
+            export_chunks(snapshot, positions, columns, format),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers=headers,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/statistics")
+async def get_statistics(
+    request: Request,
+    companies: Optional[List[str]] = Query(None),
+    rating_buckets: Optional[List[str]] = Query(None)
+):
+    """
+    Get aggregated statistics for visualizations.
+
+    With companies and/or rating_buckets (same meaning as for /api/data), the
+    statistics describe only the matching plans.
+    """
+    try:
+        snapshot = store.get()
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="Data file not found")
+        buckets = parse_buckets(rating_buckets)
+        if is_not_modified(request, snapshot):
+            return not_modified(request, snapshot)
         
-        if limit:
-            df = df.head(limit)
+        if companies is None and rating_buckets is None:
+            # Computed, serialized and compressed once per dataset version by the store
+            return await cached_response(request, snapshot, STATISTICS_KEY, lambda: snapshot.statistics_body)
         
-        # Convert to JSON, handling NaN values
-        data = df.to_dict(orient='records')
+        company_codes = parse_companies(companies, snapshot)
+        key = request_key(request, companies=company_codes, rating_buckets=buckets)
         
-        # Replace NaN values with None for JSON compatibility
-        for record in data:
-            for key, value in record.items():
-                if pd.isna(value):
-                    record[key] = None
+        def build() -> bytes:
+            index = snapshot.index
+            return dumps_object(build_filtered_statistics(
+                snapshot.df,
+                index,
+                snapshot.company_aggregates,
+                company_codes if company_codes is not None else np.arange(len(index.company_names)),
+                buckets if buckets is not None else np.arange(OTHER_BUCKET + 1),
+                index.filter(companies=company_codes, buckets=buckets),
+                snapshot.last_updated,
+            ))
         
-        return {
-            "total": len(data),
-            "data": data
-        }
+        return await cached_response(request, snapshot, key, build)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/statistics")
-async def get_statistics():
-    """Get aggregated statistics for visualizations"""
+@app.get("/api/top-plans")
+async def get_top_plans(
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=1000),
+    companies: Optional[List[str]] = Query(None),
+    rating_buckets: Optional[List[str]] = Query(None)
+):
+    """
+    Get a page of plans ranked by rating (rated plans first, highest rating
+    first, then plans without a rating).
+    """
     try:
-        if not os.path.exists(DATA_FILE):
+        snapshot = store.get()
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="Data file not found")
+        buckets = parse_buckets(rating_buckets)
+        if is_not_modified(request, snapshot):
+            return not_modified(request, snapshot)
+        
+        company_codes = parse_companies(companies, snapshot)
+        key = request_key(request, offset=offset, limit=limit, companies=company_codes, rating_buckets=buckets)
         
-        df = pd.read_csv(DATA_FILE)
-        
-        # Remove NaN ratings for statistics
-        df_with_ratings = df[df['Rating By Ditto'].notna()]
-        
-        # Company distribution
-        company_counts = df['Company'].value_counts().to_dict()
-        
-        # Rating distribution - combine 0.0-1.9 into single red range, include N/A
-        rating_ranges = {
-            "4.0-5.0": len(df_with_ratings[(df_with_ratings['Rating By Ditto'] >= 4.0) & (df_with_ratings['Rating By Ditto'] <= 5.0)]),
-            "3.0-3.9": len(df_with_ratings[(df_with_ratings['Rating By Ditto'] >= 3.0) & (df_with_ratings['Rating By Ditto'] < 4.0)]),
-            "2.0-2.9": len(df_with_ratings[(df_with_ratings['Rating By Ditto'] >= 2.0) & (df_with_ratings['Rating By Ditto'] < 3.0)]),
-            "0.0-1.9": len(df_with_ratings[(df_with_ratings['Rating By Ditto'] >= 0.0) & (df_with_ratings['Rating By Ditto'] < 2.0)]),
-            "N/A": len(df[df['Rating By Ditto'].isna()]),
-        }
-        
-        # Top companies by average rating
-        company_avg_ratings = df_with_ratings.groupby('Company')['Rating By Ditto'].agg(['mean', 'count']).reset_index()
-        company_avg_ratings = company_avg_ratings[company_avg_ratings['count'] >= 2]  # At least 2 plans
-        company_avg_ratings = company_avg_ratings.sort_values('mean', ascending=False).head(10)
-        top_companies = {
-            row['Company']: round(row['mean'], 2) 
-            for _, row in company_avg_ratings.iterrows()
-        }
-        
-        # Top rated plans - return ALL plans sorted by rating (include N/A ratings at the end)
-        # First, get plans with ratings sorted by rating
-        plans_with_ratings_df = df_with_ratings.sort_values('Rating By Ditto', ascending=False)[['Company', 'Policy Name', 'Rating By Ditto', 'Plan URL']]
-        plans_with_ratings = plans_with_ratings_df.to_dict(orient='records')
-        
-        # Then, get plans without ratings (N/A)
-        plans_without_ratings_df = df[df['Rating By Ditto'].isna()][['Company', 'Policy Name', 'Rating By Ditto', 'Plan URL']]
-        plans_without_ratings = plans_without_ratings_df.to_dict(orient='records')
-        
-        # Combine: rated plans first, then N/A plans
-        top_plans = plans_with_ratings + plans_without_ratings
-        
-        # Replace NaN values with None for JSON serialization
-        import numpy as np
-        for plan in top_plans:
-            if pd.isna(plan.get('Rating By Ditto')):
-                plan['Rating By Ditto'] = None
-        
-        return {
-            "total_plans": len(df),
-            "plans_with_ratings": len(df_with_ratings),
-            "total_companies": df['Company'].nunique(),
-            "average_rating": round(df_with_ratings['Rating By Ditto'].mean(), 2),
-            "company_distribution": company_counts,
-            "rating_distribution": rating_ranges,
-            "top_companies_by_rating": top_companies,
-            "top_rated_plans": top_plans,
-            "last_updated": df["Last Updated"].iloc[0] if len(df) > 0 else None
-        }
+        def build() -> bytes:
+            index = snapshot.index
+            if company_codes is None and buckets is None:
+                total_matches = index.size
+                positions = index.top_plans(stop=offset + limit)
+            else:
+                matches = index.filter(companies=company_codes, buckets=buckets)
+                total_matches = len(matches)
+                positions = index.top_plans(matches, stop=offset + limit)
+            
+            plans = snapshot.df.take(positions[offset:])[PLAN_COLUMNS]
+            return dumps_object({
+                "total_matches": total_matches,
+                "offset": offset,
+                "plans": RawJSON(records_json(plans)),
+            })
+        
+        return await cached_response(request, snapshot, key, build)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/companies")
-async def get_companies():
+async def get_companies(request: Request):
     """Get list of all companies"""
     try:
-        if not os.path.exists(DATA_FILE):
+        snapshot = store.get()
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="Data file not found")
+        if is_not_modified(request, snapshot):
+            return not_modified(request, snapshot)
+        
+        # Precomputed by warm_snapshot; the endpoint takes no parameters
+        return await cached_response(request, snapshot, COMPANIES_KEY, lambda: companies_body(snapshot))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/changes")
+async def get_changes(request: Request, since: str):
+    """
+    Plans added, changed or removed since dataset version ``since`` (the
+    data_version from /health or the ETag of an earlier response), keyed by
+    Plan URL. Added and changed plans carry their full current record.
+
+    If the diffs back to ``since`` are no longer kept (or the version is
+    unknown), the response has "resync": true and the client should reload
+    /api/data.
+    """
+    try:
+        snapshot = store.get()
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="Data file not found")
+        if is_not_modified(request, snapshot):
+            return not_modified(request, snapshot)
+        
+        diffs = store.changes(version_from_etag(since), snapshot.version)
+        # Only versions the store knows are cached: any other ``since`` gets
+        # the same small resync body
+        key = request_key(request, since=since) if diffs is not None else None
+        
+        def build() -> bytes:
+            if diffs is None:
+                return dumps({"since": since, "version": snapshot.version, "resync": True})
+            return dumps({"since": since, "version": snapshot.version, "resync": False, **merge_diffs(diffs)})
+        
+        return await cached_response(request, snapshot, key, build)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# History endpoints query SQLite and encode the result in the worker pool,
+# so SQLite reads never block the event loop
+
+def history_store() -> HistoryStore:
+    if not history.available():
+        raise HTTPException(status_code=404, detail="Rating history not found")
+    return history
+
+@app.get("/api/history/plan")
+async def get_plan_history(plan_url: str, since: Optional[str] = None, until: Optional[str] = None):
+    """
+    Rating of one plan over time: one point per change (and its first
+    rating), oldest first. since/until are "YYYY-MM-DD HH:MM:SS" bounds.
+    """
+    try:
+        rating_history = history_store()
+        
+        def build() -> bytes:
+            points = rating_history.plan_history(plan_url, since, until)
+            return dumps({"plan_url": plan_url, "points": points})
+        
+        return Response(content=await offload(build), media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/history/company")
+async def get_company_history(company: str, since: Optional[str] = None, until: Optional[str] = None):
+    """Rating over time of every plan of a company (exact name), grouped by plan"""
+    try:
+        rating_history = history_store()
+        
+        def build() -> bytes:
+            plans = []
+            for row in rating_history.company_history(company, since, until):
+                if not plans or plans[-1]["plan_url"] != row["plan_url"]:
+                    plans.append({"plan_url": row["plan_url"], "policy_name": row["policy_name"], "points": []})
+                plans[-1]["points"].append({"scraped_at": row["scraped_at"], "rating": row["rating"]})
+            return dumps({"company": company, "plans": plans})
+        
+        return Response(content=await offload(build), media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/history/changes")
+async def get_rating_changes(since: str, limit: int = Query(1000, ge=1, le=10000)):
+    """
+    Ratings that changed after ``since`` (at most ``limit``), each with the
+    rating it replaced, oldest first, plus the scrape runs in that period.
+    """
+    try:
+        rating_history = history_store()
         
-        df = pd.read_csv(DATA_FILE)
-        companies = sorted(df['Company'].unique().tolist())
+        def build() -> bytes:
+            changes = rating_history.changes_since(since, limit)
+            return dumps({"since": since, "changes": changes, "runs": rating_history.runs(since)})
         
-        return {"companies": companies, "count": len(companies)}
+        return Response(content=await offload(build), media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
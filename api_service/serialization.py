@@ -0,0 +1,66 @@
+"""
+JSON serialization helpers for the Ditto Insurance Data API.
+
+Responses are encoded straight to bytes and returned as raw Responses, which
+skips FastAPI's jsonable_encoder walk over every record. DataFrames are
+encoded column-wise by pandas in a single pass, with NaN written as null,
+instead of converting to a list of dicts and patching NaN cell by cell.
+The same holds for the line-oriented export formats (NDJSON and CSV),
+which are encoded one chunk of rows at a time.
+"""
+
+import json
+from typing import Any, Dict
+
+import pandas as pd
+
+
+class RawJSON:
+    """A pre-encoded JSON fragment to embed verbatim in a response body."""
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize ``content`` to compact UTF-8 JSON bytes."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def records_json(df: pd.DataFrame) -> bytes:
+    """Encode a DataFrame as a JSON array of row objects (NaN -> null)."""
+    return df.to_json(orient="records", force_ascii=False, date_format="iso").encode("utf-8")
+
+
+def ndjson_lines(df: pd.DataFrame) -> bytes:
+    """Encode a DataFrame as newline-delimited JSON objects (NaN -> null)."""
+    if len(df) == 0:
+        return b""
+    lines = df.to_json(orient="records", lines=True, force_ascii=False, date_format="iso")
+    return lines.rstrip("\n").encode("utf-8") + b"\n"
+
+
+def csv_lines(df: pd.DataFrame, header: bool) -> bytes:
+    """Encode a DataFrame as CSV rows (NaN -> empty field), like the scraper writes them."""
+    return df.to_csv(index=False, header=header, lineterminator="\n").encode("utf-8")
+
+
+def dumps_object(fields: Dict[str, Any]) -> bytes:
+    """
+    Serialize a JSON object whose values may be RawJSON fragments.
+
+    Used to wrap an already encoded records array (see ``records_json``)
+    in a response envelope without decoding it again.
+    """
+    parts = []
+    for key, value in fields.items():
+        encoded = value.data if isinstance(value, RawJSON) else dumps(value)
+        parts.append(dumps(key) + b":" + encoded)
+    return b"{" + b",".join(parts) + b"}"
@@ -0,0 +1,65 @@
+"""
+Background dataset watcher for the Ditto Insurance Data API.
+
+Runs for the lifetime of the app (see the lifespan hook in main.py) and
+calls DatasetStore.refresh() whenever a new dataset version may have been
+published. Refreshing stats the manifest and, on a change, loads the new
+version and precomputes its payloads; all of that blocks, so it runs in a
+worker thread and the event loop only awaits it.
+
+Change detection uses watchfiles (inotify on Linux; installed with
+uvicorn[standard]) on the directories holding the watched files, since the
+scraper publishes by renaming new files into place. Without watchfiles, or
+if a directory cannot be watched (e.g. the data volume is not mounted yet),
+the watcher polls instead. Even with inotify it refreshes every
+``poll_interval`` seconds, to cover events that never arrive (network
+filesystems, Kubernetes volume updates).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Iterable
+
+from dataset_store import DatasetStore
+
+try:
+    from watchfiles import awatch
+except ImportError:
+    awatch = None
+
+logger = logging.getLogger(__name__)
+
+
+async def _refresh(store: DatasetStore):
+    try:
+        await asyncio.to_thread(store.refresh)
+    except Exception:
+        logger.exception("Dataset refresh failed")
+
+
+async def _poll(store: DatasetStore, poll_interval: float):
+    while True:
+        await asyncio.sleep(poll_interval)
+        await _refresh(store)
+
+
+async def watch_dataset(store: DatasetStore, paths: Iterable[str], poll_interval: float = 5.0):
+    """Refresh ``store`` whenever one of ``paths`` changes, until cancelled."""
+    watched = {os.path.abspath(path) for path in paths if path}
+    directories = sorted({os.path.dirname(path) for path in watched if os.path.isdir(os.path.dirname(path))})
+    if awatch is None or not directories:
+        logger.info("Polling for dataset changes every %.1fs", poll_interval)
+        await _poll(store, poll_interval)
+        return
+
+    logger.info("Watching %s for dataset changes", ", ".join(directories))
+    try:
+        async for changes in awatch(*directories, rust_timeout=int(poll_interval * 1000),
+                                    yield_on_timeout=True, recursive=False):
+            # An empty set is a timeout: refresh anyway (a cheap stat)
+            if not changes or any(os.path.abspath(path) in watched for _, path in changes):
+                await _refresh(store)
+    except (OSError, RuntimeError):
+        logger.exception("Cannot watch %s, falling back to polling", ", ".join(directories))
+        await _poll(store, poll_interval)
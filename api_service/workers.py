@@ -0,0 +1,81 @@
+"""
+Bounded worker pool for blocking dataset work in the Ditto Insurance Data API.
+
+Handlers are ``async def`` and run on the event loop, so anything that
+takes real time (filtering and sorting the DataFrame, encoding and
+compressing a body that is not cached yet, SQLite history queries) is
+handed to a fixed pool of worker threads instead. Cache hits stay on the
+loop: they are a dictionary lookup.
+
+Admission is bounded: at most ``size`` jobs run and ``queue_depth`` more
+wait. Beyond that ``run()`` raises Overloaded straight away and the API
+answers 503 with Retry-After, so under overload latency stays bounded and
+clients back off, instead of every request queueing behind the backlog.
+
+Threads rather than processes: jobs read the in-memory snapshot, which a
+process pool would have to pickle (or reload) per worker, and numpy /
+pandas / zlib release the GIL for much of the heavy lifting.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class Overloaded(Exception):
+    """The pool is running ``size`` jobs and ``queue_depth`` more are waiting."""
+
+
+class WorkerPool:
+    """
+    Thread pool with bounded admission.
+
+    With ``size`` 0, jobs run inline on the caller (the event loop), without
+    admission control; this is only meant for comparison benchmarks.
+    """
+
+    def __init__(self, size: int, queue_depth: int):
+        self.size = size
+        self.queue_depth = queue_depth
+        self.stats = Counter()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="api-worker") if size else None
+
+    @property
+    def pending(self) -> int:
+        """Jobs running or waiting"""
+        return self._pending
+
+    async def run(self, fn: Callable[..., T], *args, shed: bool = True) -> T:
+        """
+        Run ``fn(*args)`` in the pool and return its result; raises
+        Overloaded when full. With ``shed`` False the job is always queued:
+        for the rest of a response that was already admitted (an export
+        stream cannot turn into a 503 halfway through).
+        """
+        if self._executor is None:
+            self.stats["inline"] += 1
+            return fn(*args)
+        with self._lock:
+            if shed and self._pending >= self.size + self.queue_depth:
+                self.stats["rejected"] += 1
+                raise Overloaded()
+            self._pending += 1
+            self.stats["accepted"] += 1
+        # The slot is released when the job finishes, even if the client has gone
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Asyncio engine for the Ditto Insurance Scraper
+
+Runs the same provider page -> plan links -> plan pages pipeline as
+DittoInsuranceScraper, but as coroutines on a single aiohttp session:
+- Every provider is processed concurrently, so a slow provider does not
+  stall the others
+- Keep-alive connections to the site are pooled and reused
+- In-flight requests are bounded by a semaphore (--workers) and spaced by
+  the same adaptive per-host rate limiter and retry policy as the threaded
+  engine
+- HTML parsing runs in worker threads so fetches continue meanwhile
+
+Records are written to the sink in provider/plan order, each provider as
+soon as it and every provider before it are done, so the output matches the
+sequential scraper.
+
+Usage:
+    python scrape_ditto.py --engine async --workers 8
+    python scrape_ditto.py --engine async --base-url http://127.0.0.1:8080/health-insurance/
+"""
+
+import asyncio
+import time
+
+import aiohttp
+
+from rate_control import parse_retry_after
+from scrape_ditto import DittoInsuranceScraper, FALLBACK_PLANS, HEADERS, KNOWN_PROVIDERS
+
+
+class AsyncDittoInsuranceScraper(DittoInsuranceScraper):
+    """
+    DittoInsuranceScraper variant that fetches pages with asyncio/aiohttp.
+
+    Extraction, record building and export are inherited unchanged; only
+    fetching and scheduling differ.
+    """
+
+    async def get_page_async(self, http, url, return_status=False):
+        """
+        Async counterpart of get_page.
+
+        Args:
+            http (aiohttp.ClientSession): Shared client session
+            url (str): URL to fetch
+            return_status (bool): If True, return (html, status_code) tuple
+
+        Returns:
+            str or tuple: HTML content, or (html, status_code) if return_status=True
+                          Returns None on error
+        """
+        # Page cache reads and writes are file I/O, kept off the event loop
+        request_headers = await asyncio.to_thread(self._conditional_headers, url)
+        attempt = 0
+        while True:
+            attempt += 1
+            async with self._in_flight:
+                delay = self.rate_limiter.reserve(url)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                started = time.monotonic()
+                try:
+                    async with http.get(url, headers=request_headers) as response:
+                        status_code = response.status
+                        headers = response.headers
+                        text = await response.text(errors='replace')
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    status_code, headers, text = None, {}, None
+            retry_after = parse_retry_after(headers.get('Retry-After'))
+            self.rate_limiter.record(url, status_code, time.monotonic() - started, retry_after)
+
+            # Back off outside the semaphore so other requests keep flowing
+            backoff = self.retry_policy.next_delay(attempt, status_code, retry_after)
+            if backoff is None:
+                break
+            await asyncio.sleep(backoff)
+
+        if status_code is None:
+            return (None, None) if return_status else None
+        html, status_code = await asyncio.to_thread(self._cache_response, url, status_code, text, headers)
+        if return_status:
+            return html, status_code
+        if status_code >= 400:
+            return None
+        return html
+
+    async def _fetch_plan_links_async(self, http, idx, total, provider):
+        """Async counterpart of _fetch_plan_links"""
+        provider_name, provider_url = self._start_provider(idx, total, provider)
+        provider_html, status_code = await self.get_page_async(http, provider_url, return_status=True)
+
+        if not self._listing_blocked(provider_html, status_code):
+            plan_links = await asyncio.to_thread(self._plan_links_from_listing, provider_html, provider_url)
+            return (provider_name, plan_links) if plan_links is not None else None
+
+        if provider not in FALLBACK_PLANS:
+            self._report_blocked_listing(provider_html)
+            return None
+
+        print(f"  ⚠ Provider listing page blocked, trying to discover plans from known plan page...")
+        known_plan_url, candidate_urls = self._fallback_plan_urls(provider)
+        known_plan_html = await self.get_page_async(http, known_plan_url)
+        discovered_plans = []
+        if known_plan_html:
+            pages = await asyncio.gather(*(self.get_page_async(http, url) for url in candidate_urls))
+            discovered_plans = [url for url, html in zip(candidate_urls, pages)
+                                if html and '404' not in html.lower()[:500]]
+        self._report_fallback(known_plan_html, discovered_plans)
+        return (provider_name, discovered_plans) if discovered_plans else None
+
+    async def _scrape_plan_async(self, http, provider_name, plan_idx, total, plan_name, plan_url):
+        """Async counterpart of _scrape_plan"""
+        self._start_plan(plan_idx, total, plan_name, plan_url)
+        plan_html = await self.get_page_async(http, plan_url)
+        if not plan_html:
+            self._report_failed_plan()
+            return None
+        return await asyncio.to_thread(self._plan_record, provider_name, plan_name, plan_url, plan_html)
+
+    async def _scrape_provider_async(self, http, idx, total, provider):
+        """
+        Scrape one provider end to end.
+
+        Returns:
+            tuple or None: (plan_count, records) in plan order, or None if skipped
+        """
+        listing = await self._fetch_plan_links_async(http, idx, total, provider)
+        if listing is None:
+            return None
+        provider_name, plan_links = listing
+        records = await asyncio.gather(*(self._scrape_plan_async(http, *job)
+                                         for job in self.plan_jobs(provider_name, plan_links)))
+        return len(plan_links), records
+
+    async def scrape_async(self, providers=None):
+        """Main scraping coroutine"""
+        if providers is None:
+            providers = KNOWN_PROVIDERS
+
+        self._print_start(providers)
+        providers = self._pending_providers(providers)
+        self._in_flight = asyncio.Semaphore(self.workers)
+        connector = aiohttp.TCPConnector(limit=self.workers, limit_per_host=self.workers)
+        timeout = aiohttp.ClientTimeout(total=30)
+        total_plans = 0
+        async with aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=timeout) as http:
+            tasks = [asyncio.ensure_future(self._scrape_provider_async(http, idx, len(providers), provider))
+                     for idx, provider in enumerate(providers, 1)]
+            # Providers run concurrently; commit them in order as they finish
+            for provider, task in zip(providers, tasks):
+                result = await task
+                if result is None:
+                    self.commit_provider(provider, [])
+                    continue
+                plan_count, records = result
+                total_plans += plan_count
+                self.commit_provider(provider, records)
+
+        self._print_summary(providers, total_plans)
+
+    def scrape(self, providers=None):
+        """Run scrape_async to completion"""
+        asyncio.run(self.scrape_async(providers))
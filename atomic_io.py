@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Atomic file writes for the Ditto Insurance Scraper
+
+Files that other processes read while the scraper runs (page cache
+metadata, sink checkpoints, the dataset manifest) are written to a
+temporary file in the same directory and renamed into place, so a reader
+sees either the old file or the new one, never a partial write.
+"""
+
+import os
+import tempfile
+
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Mode of files created with open(): mkstemp's 0600 would hide published
+# files (e.g. the dataset manifest) from readers running as another user
+FILE_MODE = 0o666 & ~_umask()
+
+
+def atomic_write(path, data):
+    """Write bytes to path via a temp file + rename, so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        os.fchmod(fd, FILE_MODE)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+API concurrency benchmark
+
+Starts the API (uvicorn, one worker process) on a synthetic dataset (see
+bench_dataset_load.synthetic_dataset) and hits it with many concurrent
+keep-alive clients. Each client mixes cheap requests (/health and the
+precomputed /api/companies body) with expensive ones (/api/data with a
+filter, sort and page no other request asks for, so every one is a body
+cache miss that filters, sorts and encodes).
+
+Two server configurations are compared:
+- inline: API_WORKER_THREADS=0, dataset work runs on the event loop (the
+          old behaviour: one slow request stalls every connection)
+- pool:   dataset work runs in the bounded worker pool; requests beyond
+          its queue get 503
+
+Reports, per request kind, latency percentiles in milliseconds, plus
+throughput and the number of 503s.
+
+Requires the API's dependencies (api_service/requirements.txt).
+
+Usage:
+    python benchmarks/bench_api_concurrency.py
+    python benchmarks/bench_api_concurrency.py --clients 200 --requests 20 --rows 100000 --threads 4 --queue 8
+"""
+
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_dataset_load import synthetic_dataset  # noqa: E402
+
+LIGHT_PATHS = ['/health', '/api/companies']
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_file, port, threads, queue):
+    data_dir = os.path.dirname(data_file)
+    env = dict(
+        os.environ,
+        DATA_FILE=data_file,
+        COLUMNAR_DATA_FILE=os.path.join(data_dir, 'missing.arrow'),
+        MANIFEST_FILE=os.path.join(data_dir, 'missing.manifest.json'),
+        HISTORY_FILE=os.path.join(data_dir, 'missing.sqlite'),
+        API_WORKER_THREADS=str(threads),
+    )
+    if queue is not None:
+        env['API_WORKER_QUEUE'] = str(queue)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port), '--log-level', 'warning',
+         '--backlog', '4096'],
+        cwd=os.path.join(ROOT, 'api_service'), env=env,
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/health')
+            if b'healthy' in conn.getresponse().read():
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError('API did not come up')
+
+
+def heavy_path(rng, rows):
+    """An /api/data page no other request asks for (always a body cache miss)"""
+    sort = quote(rng.choice(['-Rating By Ditto,Company', 'Company,-Rating By Ditto', 'Policy Name']))
+    return (f"/api/data?sort={sort}&min_rating={rng.randint(0, 300) / 100}"
+            f"&offset={rng.randrange(rows // 2)}&limit=50")
+
+
+def run_client(port, requests, heavy_share, rows, seed):
+    """One keep-alive client; returns [(kind, status, seconds), ...]"""
+    rng = random.Random(seed)
+    results = []
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    for _ in range(requests):
+        heavy = rng.random() < heavy_share
+        path = heavy_path(rng, rows) if heavy else rng.choice(LIGHT_PATHS)
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except OSError:
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+            status = None
+        results.append(('heavy' if heavy else 'light', status, time.perf_counter() - start))
+    conn.close()
+    return results
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API tail latency under concurrent clients')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=20, help='Requests per client')
+    parser.add_argument('--heavy-share', type=float, default=0.2, help='Fraction of cache-missing /api/data requests')
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1, help='API_WORKER_THREADS for the pool run')
+    parser.add_argument('--queue', type=int, default=None,
+                        help='API_WORKER_QUEUE for the pool run (default: the API default, 2 x threads)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'ditto_insurance_data.csv')
+        synthetic_dataset(args.rows).to_csv(data_file, index=False)
+
+        print(f"{args.clients} clients x {args.requests} requests, {args.heavy_share:.0%} heavy, {args.rows:,} rows")
+        print(f"{'mode':<8} {'kind':<6} {'ok':>6} {'503':>5} {'failed':>6} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'req/s':>7}")
+        for mode, threads in (('inline', 0), ('pool', args.threads)):
+            port = free_port()
+            server = start_server(data_file, port, threads, args.queue)
+            try:
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=args.clients) as executor:
+                    runs = executor.map(run_client, [port] * args.clients, [args.requests] * args.clients,
+                                        [args.heavy_share] * args.clients, [args.rows] * args.clients,
+                                        range(args.clients))
+                    results = [result for run in runs for result in run]
+                seconds = time.perf_counter() - start
+            finally:
+                server.terminate()
+                server.wait()
+
+            for kind in ('light', 'heavy'):
+                latencies = [latency for k, status, latency in results if k == kind and status == 200]
+                shed = sum(1 for k, status, _ in results if k == kind and status == 503)
+                failed = sum(1 for k, status, _ in results if k == kind and status not in (200, 503))
+                if not latencies:
+                    print(f"{mode:<8} {kind:<6} {0:>6} {shed:>5} {failed:>6}")
+                    continue
+                print(f"{mode:<8} {kind:<6} {len(latencies):>6} {shed:>5} {failed:>6} "
+                      f"{percentile(latencies, 0.5):>8.1f} {percentile(latencies, 0.95):>8.1f} "
+                      f"{percentile(latencies, 0.99):>8.1f} {max(latencies) * 1000:>8.1f} "
+                      f"{len(results) / seconds:>7.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Response compression benchmark
+
+Builds the /api/data and /api/statistics bodies for a synthetic dataset
+(see bench_dataset_load.synthetic_dataset) and reports, per body and
+content-coding:
+- bytes on the wire
+- CPU per request when the body is compressed on every request
+  (what a compression middleware does)
+- CPU per request when the precompressed body is served from the
+  snapshot's BodyCache (api_service/compression.py)
+
+Usage:
+    python benchmarks/bench_compression.py
+    python benchmarks/bench_compression.py --rows 10000 --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'api_service'))
+
+from bench_dataset_load import synthetic_dataset  # noqa: E402
+from aggregates import build_statistics  # noqa: E402
+from compression import IDENTITY, SUPPORTED_ENCODINGS, BodyCache, compress  # noqa: E402
+from indexes import build_index  # noqa: E402
+from serialization import RawJSON, dumps_object, records_json  # noqa: E402
+
+
+def cpu_ms(fn, repeat):
+    """Mean CPU milliseconds per call of fn()"""
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API response compression')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    df = synthetic_dataset(args.rows)
+    index = build_index(df)
+    bodies = {
+        '/api/data': dumps_object({
+            'total': len(df), 'total_matches': len(df), 'offset': 0, 'data': RawJSON(records_json(df)),
+        }),
+        '/api/data?limit=100': dumps_object({
+            'total': 100, 'total_matches': len(df), 'offset': 0, 'data': RawJSON(records_json(df.head(100))),
+        }),
+        '/api/statistics': dumps_object(build_statistics(df, index, df['Last Updated'].iloc[0])),
+    }
+
+    print(f"{'body':<22} {'encoding':<9} {'bytes':>12} {'ratio':>6} {'per-request ms':>15} {'cached ms':>10}")
+    for name, body in bodies.items():
+        cache = BodyCache(max_bytes=1 << 40)
+        for encoding in (IDENTITY,) + SUPPORTED_ENCODINGS:
+            encoded, _ = cache.get(name, encoding, lambda: body)
+            on_demand = cpu_ms(lambda: compress(body, encoding), args.repeat)
+            cached = cpu_ms(lambda: cache.get(name, encoding, lambda: body), args.repeat)
+            print(f"{name:<22} {encoding:<9} {len(encoded):>12,} {len(body) / len(encoded):>5.1f}x "
+                  f"{on_demand:>15.3f} {cached:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Dataset load benchmark
+
+Writes synthetic datasets shaped like the scraper output as CSV, converts
+each to the typed Arrow IPC / Feather file (DittoInsuranceScraper.
+save_to_columnar), then times how long the API's DatasetStore takes to read
+each into the DataFrame it serves (api_service/dataset_store.read_dataset).
+
+Usage:
+    python benchmarks/bench_dataset_load.py
+    python benchmarks/bench_dataset_load.py --rows 1000 100000 --repeat 5
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'api_service'))
+
+from scrape_ditto import DittoInsuranceScraper, KNOWN_PROVIDERS  # noqa: E402
+from dataset_store import read_dataset  # noqa: E402
+
+
+def synthetic_dataset(rows, seed=7):
+    """A scraper-shaped DataFrame with ~10% unrated plans"""
+    rng = np.random.default_rng(seed)
+    companies = np.array([p.replace('-', ' ').title() for p in KNOWN_PROVIDERS], dtype=object)
+    slugs = np.array(KNOWN_PROVIDERS, dtype=object)
+    company_idx = rng.integers(0, len(companies), rows)
+    plan_ids = np.arange(rows).astype(str).astype(object)
+    ratings = rng.integers(0, 501, rows) / 100
+    ratings[rng.random(rows) < 0.1] = np.nan
+    return pd.DataFrame({
+        'Company': companies[company_idx],
+        'Policy Name': 'Health Plan ' + plan_ids,
+        'Rating By Ditto': ratings,
+        'Plan URL': 'https://joinditto.in/health-insurance/' + slugs[company_idx] + '/plan-' + plan_ids + '/',
+        'Last Updated': '2024-01-15 10:30:00',
+    })
+
+
+def best_of(fn, repeat):
+    """Best-of-repeat seconds for fn()"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CSV vs columnar dataset loading')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    scraper = DittoInsuranceScraper(delay=0)
+    print(f"{'rows':>10} {'csv MB':>8} {'arrow MB':>9} {'csv ms':>9} {'arrow ms':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            csv_path = os.path.join(tmp, f'data_{rows}.csv')
+            arrow_path = os.path.join(tmp, f'data_{rows}.arrow')
+            df = synthetic_dataset(rows)
+            df.to_csv(csv_path, index=False)
+            with contextlib.redirect_stdout(io.StringIO()):
+                if scraper.save_to_columnar(csv_path, arrow_path) is None:
+                    sys.exit("pyarrow is not installed")
+
+            # Same values; the columnar load keeps strings as (memory-mapped) Arrow arrays
+            pd.testing.assert_frame_equal(read_dataset(arrow_path), read_dataset(csv_path), check_dtype=False)
+            csv_s = best_of(lambda: read_dataset(csv_path), args.repeat)
+            arrow_s = best_of(lambda: read_dataset(arrow_path), args.repeat)
+            print(f"{rows:>10} {os.path.getsize(csv_path) / 1e6:>8.1f} {os.path.getsize(arrow_path) / 1e6:>9.1f} "
+                  f"{csv_s * 1000:>9.1f} {arrow_s * 1000:>9.1f} {csv_s / arrow_s:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Per-page parse + extract benchmark
+
+Compares the time to turn fixture plan and provider pages
+(benchmarks/stub_site.py) into ratings and plan links:
+- before: raw HTML handed to each extractor, parsed with html.parser
+- after:  each page parsed once with lxml directly
+          (ParsedPage) and shared by the extractors
+
+Usage:
+    python benchmarks/bench_extraction.py
+    python benchmarks/bench_extraction.py --pages 200 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrape_ditto import DittoInsuranceScraper, ParsedPage, _fast_rating  # noqa: E402
+from stub_site import build_pages  # noqa: E402
+
+
+def time_per_page(fn, pages, repeat):
+    """Best-of-repeat mean milliseconds per page"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path, html in pages:
+            fn(path, html)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parse + extraction per page')
+    parser.add_argument('--pages', type=int, default=100, help='Plan pages to process')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    scraper = DittoInsuranceScraper(delay=0)
+    all_pages = build_pages(providers=max(1, args.pages // 12 + 1))
+    plan_pages = [(p, h) for p, h in all_pages.items() if p.count('/') == 4][:args.pages]
+    provider_pages = [(p, h) for p, h in all_pages.items() if p.count('/') == 3]
+
+    def rating_bs4(path, html):
+        return scraper._rating_cascade(ParsedPage(html, parser='html.parser'))[0]
+
+    def rating_lxml(path, html):
+        return scraper._rating_cascade(ParsedPage(html, parser='lxml'))[0]
+
+    def rating_fast(path, html):
+        return scraper.extract_rating(html)
+
+    def links_bs4(path, html):
+        return scraper.extract_plan_links(ParsedPage(html, parser='html.parser'), scraper.base_url + path)
+
+    def links_lxml(path, html):
+        return scraper.extract_plan_links(ParsedPage(html, parser='lxml'), scraper.base_url + path)
+
+    for (path, html) in plan_pages:
+        assert rating_bs4(path, html) == rating_lxml(path, html) == rating_fast(path, html), path
+
+    print(f"{'page type':<16} {'pages':>6} {'bs4 ms':>8} {'lxml ms':>8} {'fast ms':>8} {'speedup':>8}")
+    marker_pages = [(p, h) for p, h in plan_pages if _fast_rating(h) is not None]
+    for name, pages, fns in [
+        ('plan (all)', plan_pages, (rating_bs4, rating_lxml, rating_fast)),
+        ('plan (marker)', marker_pages, (rating_bs4, rating_lxml, rating_fast)),
+        ('provider (links)', provider_pages, (links_bs4, links_lxml)),
+    ]:
+        times = [time_per_page(fn, pages, args.repeat) for fn in fns]
+        cells = ''.join(f"{t:>9.2f}" for t in times) + ' ' * 9 * (3 - len(times))
+        print(f"{name:<16} {len(pages):>6}{cells} {times[0] / times[-1]:>7.1f}x")
+
+    scraper.rating_strategy_counts.clear()
+    for path, html in plan_pages:
+        scraper.extract_rating(html)
+    strategies = ', '.join(f"{k}: {v}" for k, v in scraper.rating_strategy_counts.most_common())
+    print(f"Rating strategies: {strategies}")
+
+
+if __name__ == '__main__':
+    main()
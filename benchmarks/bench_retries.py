@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Retry / adaptive rate benchmark
+
+Scrapes the local stub site (benchmarks/stub_site.py) with injected 503s
+and a 429 rate limit, and compares:
+- fixed:    a constant per-host rate (--rate) that responses never
+            change, and no retries: one transient error loses the page
+- adaptive: AdaptiveRateLimiter starting at --rate, allowed to grow up to
+            --max-rate while the site is healthy, backing off on 429/503,
+            with jittered retries
+
+Reports wall time, records collected (out of the plans on the site) and
+how many requests the stub throttled or failed.
+
+Usage:
+    python benchmarks/bench_retries.py
+    python benchmarks/bench_retries.py --error-rate 0.2 --max-rps 30 --rate 5 --max-rate 40
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_control import THROTTLE_STATUSES, AdaptiveRateLimiter  # noqa: E402
+from scrape_ditto import DittoInsuranceScraper  # noqa: E402
+from stub_site import StubSite, build_pages, provider_slugs  # noqa: E402
+
+
+class FixedRateLimiter(AdaptiveRateLimiter):
+    """Requests to a host spaced 1/rate apart; responses (and Retry-After) are only counted"""
+
+    def record(self, url, status_code, latency, retry_after=None):
+        if status_code in THROTTLE_STATUSES or status_code is None:
+            with self._lock:
+                self.stats['throttled' if status_code in THROTTLE_STATUSES else 'failed'] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark retries and adaptive rate limiting')
+    parser.add_argument('--providers', type=int, default=8)
+    parser.add_argument('--plans', type=int, default=12, help='Plans per provider')
+    parser.add_argument('--latency', type=float, default=0.02, help='Stub response latency (s)')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='Fraction of 503 responses')
+    parser.add_argument('--max-rps', type=float, default=40, help='Stub 429 threshold (requests/s)')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=5, help='Initial requests/s')
+    parser.add_argument('--max-rate', type=float, default=60, help='Adaptive rate ceiling')
+    args = parser.parse_args()
+
+    configs = [
+        ('fixed', dict(retries=0), FixedRateLimiter(args.rate)),
+        ('adaptive', dict(max_rate=args.max_rate, retries=3, retry_budget=1000), None),
+    ]
+    providers = provider_slugs(args.providers)
+    expected = args.providers * args.plans
+    print(f"{'mode':<10} {'seconds':>8} {'records':>10} {'requests':>9} {'429s':>6} {'503s':>6}")
+    for name, options, limiter in configs:
+        with StubSite(build_pages(args.providers, args.plans), latency=args.latency,
+                      error_rate=args.error_rate, max_rps=args.max_rps) as site:
+            scraper = DittoInsuranceScraper(delay=0, workers=args.workers, rate=args.rate,
+                                            base_url=site.base_url, **options)
+            if limiter is not None:
+                scraper.rate_limiter = limiter
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraper.scrape(providers)
+            seconds = time.perf_counter() - start
+            print(f"{name:<10} {seconds:>8.2f} {len(scraper.data):>4}/{expected:<5} {site.requests:>9} "
+                  f"{site.throttled:>6} {site.errors:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Scraper engine benchmark
+
+Scrapes the local stub site (benchmarks/stub_site.py) with the sequential,
+threaded and asyncio engines, reports wall time and checks that every
+engine produced the same records as the sequential run.
+
+Usage:
+    python benchmarks/bench_scraper.py
+    python benchmarks/bench_scraper.py --providers 22 --plans 12 --latency 0.1 --workers 8
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrape_ditto import DittoInsuranceScraper  # noqa: E402
+from stub_site import StubSite, build_pages, provider_slugs  # noqa: E402
+
+
+def _comparable(records):
+    # Last Updated is a wall-clock timestamp and differs between runs
+    return [{k: v for k, v in record.items() if k != 'Last Updated'} for record in records]
+
+
+def run_engine(scraper, providers):
+    """Scrape quietly; return (seconds, records)"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.scrape(providers)
+    return time.perf_counter() - start, _comparable(scraper.data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scraper engines against a local stub site')
+    parser.add_argument('--providers', type=int, default=22)
+    parser.add_argument('--plans', type=int, default=12, help='Plans per provider')
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub response latency (s)')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, help='Per-host request rate limit (default: unlimited)')
+    args = parser.parse_args()
+
+    providers = provider_slugs(args.providers)
+    with StubSite(build_pages(args.providers, args.plans), latency=args.latency) as site:
+        engines = [
+            ('sequential', lambda: DittoInsuranceScraper(delay=0, rate=args.rate, base_url=site.base_url)),
+            (f'threads x{args.workers}', lambda: DittoInsuranceScraper(
+                delay=0, workers=args.workers, rate=args.rate, base_url=site.base_url)),
+        ]
+        try:
+            from async_scraper import AsyncDittoInsuranceScraper
+            engines.append((f'async x{args.workers}', lambda: AsyncDittoInsuranceScraper(
+                delay=0, workers=args.workers, rate=args.rate, base_url=site.base_url)))
+        except ImportError:
+            print("aiohttp not installed, skipping async engine")
+
+        baseline = None
+        print(f"{'engine':<14} {'seconds':>8} {'records':>8}  output")
+        for name, make in engines:
+            seconds, records = run_engine(make(), providers)
+            if baseline is None:
+                baseline = records
+            same = 'identical' if records == baseline else 'DIFFERS'
+            print(f"{name:<14} {seconds:>8.2f} {len(records):>8}  {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Local stub of the joinditto.in health-insurance pages
+
+Serves generated fixture HTML shaped like the real site (provider listing
+pages linking to plan pages that carry a "X.XXRated by Ditto" rating), so
+the scraper engines can be exercised and benchmarked without touching the
+live site. Responses carry an ETag and honour If-None-Match with 304, like
+a well-behaved origin (--no-etags serves plain 200s, like an origin that
+ignores conditional requests).
+
+Faults can be injected to exercise the scraper's retries and adaptive rate
+limiting: --error-rate answers that fraction of requests with a 503, and
+--max-rps answers requests beyond that many per second with 429 and a
+Retry-After header, like a rate-limiting origin.
+
+Usage:
+    python benchmarks/stub_site.py --port 8080 --latency 0.05
+    python benchmarks/stub_site.py --error-rate 0.1 --max-rps 20
+    python scrape_ditto.py --base-url http://127.0.0.1:8080/health-insurance/ \\
+        --providers provider-0 provider-1
+
+Or from Python:
+    with StubSite(build_pages()) as site:
+        scraper = DittoInsuranceScraper(base_url=site.base_url)
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILLER = "<p>" + "Compare cashless hospitals, waiting periods and claim settlement ratios. " * 30 + "</p>\n"
+
+
+def provider_slugs(count):
+    """Provider slugs served by build_pages(providers=count)"""
+    return [f"provider-{p}" for p in range(count)]
+
+
+def _rating_block(rng, plan_title):
+    """Rating markup in one of the formats seen on real plan pages"""
+    roll = rng.random()
+    if roll < 0.1:
+        return "<div>Rating coming soon</div>"
+    if roll < 0.2:
+        # Plan name ending in a number, glued to the rating ("360" + "3.76")
+        return (f'<h2>{plan_title} 360</h2>'
+                f'<div class="score">{plan_title} 360{rng.uniform(1, 5):.2f}Rated by Ditto Insurance</div>')
+    if roll < 0.3:
+        return f'<p>Our verdict - Ditto: {rng.uniform(0, 5):.2f}</p>'
+    return (f'<div class="rating-card"><span class="rating-value">{rng.uniform(0, 5):.2f}</span>'
+            f'<span>Rated by Ditto</span></div>')
+
+
+def build_pages(providers=22, plans_per_provider=12, seed=7):
+    """
+    Build the fixture site.
+
+    Returns:
+        dict: URL path -> HTML body
+    """
+    rng = random.Random(seed)
+    pages = {}
+    for slug in provider_slugs(providers):
+        links = []
+        for i in range(plans_per_provider):
+            plan = f"plan-{slug}-{i}"
+            links.append(f'<a href="/health-insurance/{slug}/{plan}/">Plan {i}</a>')
+            pages[f"/health-insurance/{slug}/{plan}/"] = (
+                f"<html><head><title>{plan}</title></head><body>"
+                f"<nav><a href=\"/health-insurance/\">Health insurance</a></nav>"
+                f"{FILLER * 8}{_rating_block(rng, plan.title())}{FILLER * 30}"
+                f"</body></html>"
+            )
+        links.append(f'<a href="/health-insurance/{slug}/reviews/">Reviews</a>')
+        links.append(f'<a href="/health-insurance/{slug}/faq/#top">FAQ</a>')
+        pages[f"/health-insurance/{slug}/"] = (
+            "<html><body>" + FILLER * 5 + "\n".join(links) + FILLER * 5 + "</body></html>"
+        )
+    return pages
+
+
+class StubSite:
+    """
+    Threaded HTTP server serving a dict of pages on 127.0.0.1.
+
+    Args:
+        pages (dict): URL path -> HTML body (may be modified while serving)
+        latency (float): Seconds to wait before answering each request
+        port (int): Port to bind (0 picks a free one)
+        etags (bool): Send ETags and answer If-None-Match with 304
+        error_rate (float): Fraction of requests answered with 503
+        max_rps (float): Requests per second above which to answer 429 (None: no limit)
+        seed (int): Seed for the injected errors
+    """
+
+    def __init__(self, pages, latency=0.0, port=0, etags=True, error_rate=0.0, max_rps=None, seed=7):
+        self.pages = pages
+        self.latency = latency
+        self.etags = etags
+        self.error_rate = error_rate
+        self.max_rps = max_rps
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.throttled = 0
+        self._rng = random.Random(seed)
+        self._window = (0, 0)  # (second, requests in it)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/health-insurance/"
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with site._lock:
+                    site.requests += 1
+                if site.latency:
+                    time.sleep(site.latency)
+                if not site.inject_fault(self):
+                    site.respond(self)
+
+        return Handler
+
+    def inject_fault(self, handler):
+        """Answer with an injected 429 or 503 if one is due; return whether it did"""
+        with self._lock:
+            second = int(time.monotonic())
+            window, count = self._window
+            count = count + 1 if window == second else 1
+            self._window = (second, count)
+            if self.max_rps is not None and count > self.max_rps:
+                self.throttled += 1
+                status, headers = 429, {"Retry-After": "1"}
+            elif self._rng.random() < self.error_rate:
+                self.errors += 1
+                status, headers = 503, {}
+            else:
+                return False
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", "0")
+        handler.end_headers()
+        return True
+
+    def respond(self, handler):
+        """Write the response for handler.path"""
+        body = self.pages.get(handler.path)
+        status = 200 if body is not None else 404
+        data = (body if body is not None else "<html><body>404 Page not found</body></html>").encode("utf-8")
+        etag = f'"{hashlib.sha1(data).hexdigest()}"'
+        if self.etags and status == 200 and handler.headers.get("If-None-Match") == etag:
+            with self._lock:
+                self.not_modified += 1
+            handler.send_response(304)
+            handler.send_header("ETag", etag)
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+        handler.send_response(status)
+        if self.etags and status == 200:
+            handler.send_header("ETag", etag)
+        handler.send_header("Content-Type", "text/html; charset=utf-8")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="stub-site", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local stub of the Ditto site')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--providers', type=int, default=22)
+    parser.add_argument('--plans', type=int, default=12, help='Plans per provider')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds per response')
+    parser.add_argument('--no-etags', action='store_true', help='Ignore conditional requests')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--max-rps', type=float, help='Answer 429 above this many requests per second')
+    args = parser.parse_args()
+
+    site = StubSite(build_pages(args.providers, args.plans), latency=args.latency, port=args.port,
+                    etags=not args.no_etags, error_rate=args.error_rate, max_rps=args.max_rps)
+    print(f"Serving {len(site.pages)} pages at {site.base_url}")
+    try:
+        site.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Atomic, versioned publishing of the scraped dataset
+
+The scraper writes each output file to a temporary name and renames it into
+place, then publishes the run as an immutable snapshot:
+
+    <base>.versions/<version>/ditto_insurance_data.csv    (hard links to the
+    <base>.versions/<version>/ditto_insurance_data.arrow   published files)
+    <base>.manifest.json                                   points at them
+
+The manifest (written last, also via rename) carries the version id, row
+count, per-file SHA-256 checksums and sizes, and the column schema. Readers
+such as the API watch only the manifest and load the files it names; those
+files are never rewritten, so a reader can never see a half-written
+dataset, and caches can key on the version id. The newest KEEP_VERSIONS
+snapshots are kept.
+
+Usage:
+    python scrape_ditto.py --output ditto_insurance_data.csv   # publishes automatically
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from atomic_io import atomic_write
+
+MANIFEST_SUFFIX = '.manifest.json'
+VERSIONS_SUFFIX = '.versions'
+KEEP_VERSIONS = 5
+
+
+def sha256_file(path, chunk_size=1 << 20):
+    """Hex SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path_for(csv_path):
+    """Default manifest path for a dataset CSV"""
+    return os.path.splitext(csv_path)[0] + MANIFEST_SUFFIX
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _prune(versions_dir, keep):
+    """Delete all but the newest ``keep`` snapshots (version ids sort by time)"""
+    versions = sorted(name for name in os.listdir(versions_dir) if not name.startswith('.'))
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(versions_dir, name), ignore_errors=True)
+
+
+def publish_dataset(csv_path, rows, schema, columnar_path=None, manifest_path=None, keep=KEEP_VERSIONS):
+    """
+    Snapshot the published dataset files and atomically update the manifest.
+
+    Args:
+        csv_path (str): Published CSV (already renamed into place)
+        rows (int): Number of data rows
+        schema (list): [{'name': column, 'type': type name}, ...]
+        columnar_path (str): Published Arrow/Feather copy, if one was written
+        manifest_path (str): Manifest to write (default: next to csv_path)
+        keep (int): Snapshots to keep
+
+    Returns:
+        dict: The manifest
+    """
+    manifest_path = manifest_path or manifest_path_for(csv_path)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    csv_sha256 = sha256_file(csv_path)
+    now = time.time()
+    # Microseconds keep version ids (and so snapshot pruning) in publish order
+    version = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))}{int(now % 1 * 1e6):06d}-{csv_sha256[:12]}"
+
+    versions_dir = os.path.splitext(os.path.abspath(csv_path))[0] + VERSIONS_SUFFIX
+    # Build the snapshot under a hidden name, then rename it into place
+    tmp_dir = os.path.join(versions_dir, f".tmp-{version}")
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    files = {}
+    for kind, path, sha256 in (('csv', csv_path, csv_sha256),
+                               ('columnar', columnar_path, None)):
+        if not path or not os.path.exists(path):
+            continue
+        name = os.path.basename(path)
+        _link_or_copy(path, os.path.join(tmp_dir, name))
+        files[kind] = {
+            'path': os.path.relpath(os.path.join(versions_dir, version, name), base_dir),
+            'sha256': sha256 or sha256_file(path),
+            'bytes': os.path.getsize(path),
+        }
+    os.replace(tmp_dir, os.path.join(versions_dir, version))
+
+    manifest = {
+        'version': version,
+        'published_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now)),
+        'rows': rows,
+        'schema': schema,
+        'files': files,
+    }
+    atomic_write(manifest_path, json.dumps(manifest, indent=2).encode('utf-8'))
+    _prune(versions_dir, keep)
+    print(f"Published dataset version {version} ({rows} rows) in {manifest_path}")
+    return manifest
@@ -58,9 +58,9 @@ document.addEventListener('DOMContentLoaded', async () => {
     await loadTopPlans();
     console.log('📊 After loadTopPlans() - Rating:', currentRatingFilter);
     
-    console.log('📊 Starting loadAllData() with filters - Rating:', currentRatingFilter);
-    await loadAllData();
-    console.log('📊 After loadAllData() - Rating:', currentRatingFilter);
+    console.log('📊 Starting loadDataTable() with filters - Rating:', currentRatingFilter);
+    await loadDataTable();
+    console.log('📊 After loadDataTable() - Rating:', currentRatingFilter);
     
     // Set up filter handlers
     document.getElementById('searchInput').addEventListener('input', handleSearch);
@@ -73,7 +73,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     });
     
     document.getElementById('topPlansNext').addEventListener('click', () => {
-        const totalPages = Math.ceil(allTopPlans.length / topPlansPerPage);
+        const totalPages = Math.ceil(topPlansTotal / topPlansPerPage);
         if (currentTopPlansPage < totalPages) {
             goToTopPlansPage(currentTopPlansPage + 1);
         }
@@ -83,7 +83,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     document.getElementById('topPlansPerPage').addEventListener('change', (e) => {
         topPlansPerPage = parseInt(e.target.value);
         currentTopPlansPage = 1; // Reset to first page
-        renderTopPlansPage();
+        loadTopPlans();
     });
     
     // Set up pagination handlers for data table
@@ -94,7 +94,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     });
     
     document.getElementById('dataTableNext').addEventListener('click', () => {
-        const totalPages = Math.ceil(filteredData.length / dataTablePerPage);
+        const totalPages = Math.ceil(dataTableTotal() / dataTablePerPage);
         if (currentDataTablePage < totalPages) {
             goToDataTablePage(currentDataTablePage + 1);
         }
@@ -104,7 +104,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     document.getElementById('dataTablePerPage').addEventListener('change', (e) => {
         dataTablePerPage = parseInt(e.target.value);
         currentDataTablePage = 1; // Reset to first page
-        renderDataTablePage();
+        refreshDataTablePage();
     });
 });
 
@@ -178,6 +178,7 @@ async function loadStatistics() {
         
         // Store original data for reset
         originalCompanyDistribution = {...stats.company_distribution};
+        tableCompanyDistribution = {...stats.company_distribution};
         originalTopCompanies = {...stats.top_companies_by_rating};
         originalRatingDistribution = {...stats.rating_distribution};
         
@@ -626,106 +627,39 @@ function filterByRatingRange(ratingRange) {
     });
 }
 
-// Optimized filter application function - called by both rating and company filters
-function applyFilters() {
-    // Start with all data
-    let baseData = allData;
-    
-    // Apply company filter first (if any) - use Set for O(1) lookup
-    if (currentCompanyFilter.length > 0) {
-        const companySet = new Set(currentCompanyFilter);
-        baseData = baseData.filter(plan => companySet.has(plan.Company));
-    }
-    
-    // Apply rating filter(s) - if any rating ranges selected, filter by them
-    if (currentRatingFilter.length > 0) {
-        // Pre-compile rating range checks for better performance
-        const rangeChecks = currentRatingFilter.map(range => {
-            if (range === 'N/A') {
-                return (rating) => rating === null || rating === undefined || isNaN(rating);
-            } else {
-                const [minStr, maxStr] = range.split('-');
-                const minRating = parseFloat(minStr);
-                const maxRating = parseFloat(maxStr);
-                const isExclusive = maxStr.includes('.9');
-                const maxBound = isExclusive ? (Math.floor(maxRating) + 1) : maxRating;
-                
-                return (rating) => {
-                    if (rating === null || rating === undefined || isNaN(rating)) {
-                        return false;
-                    }
-                    if (isExclusive) {
-                        return rating >= minRating && rating < maxBound;
-                    } else {
-                        return rating >= minRating && rating <= maxBound;
-                    }
-                };
-            }
-        });
-        
-        filteredData = baseData.filter(plan => {
-            const rating = plan['Rating By Ditto'];
-            return rangeChecks.some(check => check(rating));
-        });
-    } else {
-        filteredData = [...baseData];
-    }
+// Apply the rating and company filters - called by both rating and company filters
+// Filtering and the filtered statistics are computed by the API; only the visible
+// table page and the filtered top plans / company averages are downloaded
+async function applyFilters() {
+    currentDataTablePage = 1;
+    currentTopPlansPage = 1;
+    const [, , stats] = await Promise.all([
+        usesServerPaging() ? fetchDataPage() : Promise.resolve(),
+        fetchTopPlansPage(),
+        fetchStatistics(filterParams())
+    ]);
     
     // Batch DOM updates using requestAnimationFrame
     requestAnimationFrame(() => {
+        // Plan numbers in the table follow the filtered per-company counts
+        tableCompanyDistribution = stats ? {...stats.company_distribution} : {...originalCompanyDistribution};
+        
         // Update tables
-        currentDataTablePage = 1;
-        updateDataTable();
+        if (usesServerPaging()) {
+            renderDataTablePage();
+        }
         updateCounts();
+        renderTopPlansPage();
         
-        // Sort top plans (only once)
-        const topFilteredPlans = [...filteredData].sort((a, b) => {
-            const ratingA = a['Rating By Ditto'];
-            const ratingB = b['Rating By Ditto'];
-            if (ratingA === null || ratingA === undefined || isNaN(ratingA)) return 1;
-            if (ratingB === null || ratingB === undefined || isNaN(ratingB)) return -1;
-            return ratingB - ratingA;
-        });
-        
-        updateTopPlansTable(topFilteredPlans);
+        if (stats) {
+            updateCompanyRatingChart(stats.top_companies_by_rating);
+        }
         
         // Update charts (only the ones that need updating)
         console.log('applyFilters: Updating charts - Rating filter:', currentRatingFilter, 'Company filter:', currentCompanyFilter);
-        console.log('applyFilters: originalRatingDistribution keys:', Object.keys(originalRatingDistribution));
         updateRatingChart(originalRatingDistribution, currentRatingFilter);
         updateCompanyDistributionChart(originalCompanyDistribution, currentCompanyFilter);
         
-        // Calculate filtered top companies (only if needed)
-        const companyRatings = {};
-        filteredData.forEach(plan => {
-            const company = plan.Company;
-            const rating = plan['Rating By Ditto'];
-            if (rating !== null && rating !== undefined) {
-                if (!companyRatings[company]) {
-                    companyRatings[company] = [];
-                }
-                companyRatings[company].push(rating);
-            }
-        });
-        
-        const filteredTopCompanies = {};
-        Object.entries(companyRatings).forEach(([company, ratings]) => {
-            if (ratings.length >= 2) {
-                const avgRating = ratings.reduce((sum, r) => sum + r, 0) / ratings.length;
-                filteredTopCompanies[company] = Math.round(avgRating * 100) / 100;
-            }
-        });
-        
-        const sortedTopCompanies = Object.entries(filteredTopCompanies)
-            .sort((a, b) => b[1] - a[1])
-            .slice(0, 10)
-            .reduce((acc, [company, rating]) => {
-                acc[company] = rating;
-                return acc;
-            }, {});
-        
-        updateCompanyRatingChart(sortedTopCompanies);
-        
         // Update filter indicator
         if (currentRatingFilter.length > 0 || currentCompanyFilter.length > 0) {
             showFilterIndicator(
@@ -739,6 +673,27 @@ function applyFilters() {
     });
 }
 
+// Query parameters for the active company / rating filters (repeated keys)
+function filterParams() {
+    const params = new URLSearchParams();
+    currentCompanyFilter.forEach(company => params.append('companies', company));
+    currentRatingFilter.forEach(range => params.append('rating_buckets', range));
+    return params;
+}
+
+// Fetch (filtered) statistics; returns null on error
+async function fetchStatistics(params) {
+    try {
+        const query = params.toString();
+        const response = await fetch(`${API_BASE_URL}/statistics${query ? `?${query}` : ''}`);
+        if (!response.ok) throw new Error(`Failed to fetch statistics: ${response.status}`);
+        return await response.json();
+    } catch (error) {
+        console.error('Error loading filtered statistics:', error);
+        return null;
+    }
+}
+
 // Filter data by company (toggle functionality) - Optimized for performance
 function filterByCompany(companyName) {
     // Toggle company selection
@@ -758,16 +713,6 @@ function filterByCompany(companyName) {
     });
 }
 
-// Update top plans table with custom data
-function updateTopPlansTable(plans) {
-    // Store all plans for pagination
-    allTopPlans = [...plans];
-    currentTopPlansPage = 1; // Reset to first page
-    
-    // Render first page
-    renderTopPlansPage();
-}
-
 // Render top plans for current page
 function renderTopPlansPage() {
     const tbody = document.getElementById('topPlansBody');
@@ -775,17 +720,16 @@ function renderTopPlansPage() {
     
     tbody.innerHTML = '';
     
-    if (allTopPlans.length === 0) {
+    if (topPlansTotal === 0) {
         tbody.innerHTML = '<tr><td colspan="4" class="loading">No plans found</td></tr>';
         document.getElementById('topPlansPagination').style.display = 'none';
         return;
     }
     
-    // Calculate pagination
-    const totalPages = Math.ceil(allTopPlans.length / topPlansPerPage);
+    // Calculate pagination (the API returned only the current page)
+    const totalPages = Math.ceil(topPlansTotal / topPlansPerPage);
     const startIndex = (currentTopPlansPage - 1) * topPlansPerPage;
-    const endIndex = Math.min(startIndex + topPlansPerPage, allTopPlans.length);
-    const currentPagePlans = allTopPlans.slice(startIndex, endIndex);
+    const currentPagePlans = topPlansPageRows;
     
     // Render current page plans
     currentPagePlans.forEach((plan, localIndex) => {
@@ -946,11 +890,11 @@ function updateTopPlansPagination(totalPages) {
 
 // Navigate to specific page
 function goToTopPlansPage(page) {
-    const totalPages = Math.ceil(allTopPlans.length / topPlansPerPage);
+    const totalPages = Math.ceil(topPlansTotal / topPlansPerPage);
     if (page < 1 || page > totalPages) return;
     
     currentTopPlansPage = page;
-    renderTopPlansPage();
+    loadTopPlans();
     
     // Scroll to top of table
     const tableCard = document.querySelector('#topPlansTable').closest('.table-card');
@@ -1017,6 +961,7 @@ function resetAllFilters() {
     
     // Restore original data
     filteredData = [...allData];
+    tableCompanyDistribution = {...originalCompanyDistribution};
     
     // Reset pagination
     currentDataTablePage = 1;
@@ -1026,6 +971,7 @@ function resetAllFilters() {
     updateCounts();
     
     // Restore original top plans
+    currentTopPlansPage = 1;
     loadTopPlans();
     
     // Restore original charts
@@ -1420,22 +1366,24 @@ async function loadCompanies() {
     }
 }
 
-// Load top rated plans
+// Fetch the current page of the top rated plans ranking for the active filters
+async function fetchTopPlansPage() {
+    const params = filterParams();
+    params.set('offset', (currentTopPlansPage - 1) * topPlansPerPage);
+    params.set('limit', topPlansPerPage);
+    const response = await fetch(`${API_BASE_URL}/top-plans?${params}`);
+    if (!response.ok) throw new Error('Failed to fetch top plans');
+    
+    const result = await response.json();
+    topPlansPageRows = Array.isArray(result.plans) ? result.plans : [];
+    topPlansTotal = result.total_matches ?? topPlansPageRows.length;
+}
+
+// Load top rated plans (current page)
 async function loadTopPlans() {
     try {
-        const url = `${API_BASE_URL}/statistics`;
-        const response = await fetch(url);
-        if (!response.ok) throw new Error('Failed to fetch top plans');
-        
-        const stats = await response.json();
-        
-        // Store original top plans for reset functionality
-        originalTopPlans = [...stats.top_rated_plans];
-        
-        // Only update if no filters are active
-        if (currentRatingFilter.length === 0 && currentCompanyFilter.length === 0) {
-            updateTopPlansTable(stats.top_rated_plans);
-        }
+        await fetchTopPlansPage();
+        renderTopPlansPage();
     } catch (error) {
         console.error('Error loading top plans:', error);
         const tbody = document.getElementById('topPlansBody');
@@ -1447,11 +1395,12 @@ async function loadTopPlans() {
 
 // Load all data for main table
 let allData = [];
+let allDataLoaded = false; // Full dataset is only fetched once the search box needs it
 let filteredData = [];
-let originalTopPlans = []; // Store original top plans for reset
 let currentRatingFilter = []; // Track current rating range filters (array for multi-select)
 let currentCompanyFilter = []; // Track current company filters (array for multi-select)
 let originalCompanyDistribution = {}; // Store original company distribution
+let tableCompanyDistribution = {}; // Per-company plan counts behind the data table (filtered)
 let originalTopCompanies = {}; // Store original top companies data
 let originalRatingDistribution = {}; // Store original rating distribution
 
@@ -1510,8 +1459,9 @@ function clearSavedFilters() {
     }
 }
 
-// Pagination for Top Plans
-let allTopPlans = []; // Store all top plans
+// Pagination for Top Plans (paged by the API)
+let topPlansPageRows = []; // Plans of the current page
+let topPlansTotal = 0; // Plans in the (filtered) ranking
 let currentTopPlansPage = 1; // Current page for top plans
 let topPlansPerPage = 10; // Records per page (user selectable)
 
@@ -1519,6 +1469,81 @@ let topPlansPerPage = 10; // Records per page (user selectable)
 let currentDataTablePage = 1; // Current page for data table
 let dataTablePerPage = 10; // Records per page (user selectable, default 10)
 
+// Server-side pagination and filtering: unless the search box is used, only the visible page is fetched
+const DATA_TABLE_FIELDS = ['Company', 'Policy Name', 'Rating By Ditto', 'Plan URL'];
+let serverPageRows = []; // Rows of the current page, as returned by the API
+let serverTotalRows = 0; // Total plans reported by the API
+
+// Whether the data table is paged by the API (search runs client-side)
+function usesServerPaging() {
+    const searchTerm = document.getElementById('searchInput')?.value || '';
+    return !searchTerm;
+}
+
+// Total rows behind the data table
+function dataTableTotal() {
+    return usesServerPaging() ? serverTotalRows : filteredData.length;
+}
+
+// Load the data table (first page), applying filters restored from sessionStorage
+async function loadDataTable() {
+    if (currentRatingFilter.length > 0 || currentCompanyFilter.length > 0) {
+        console.log('🔄 Restoring filters after data load - Rating:', currentRatingFilter, 'Company:', currentCompanyFilter);
+        await applyFilters();
+    } else {
+        await loadDataPage();
+    }
+    
+    // Remove loading from data table
+    const tableCard = document.getElementById('dataTableBody')?.closest('.table-card');
+    const loading = tableCard?.querySelector('.loading');
+    if (loading) loading.remove();
+}
+
+// Fetch the current data table page (offset/limit) for the active filters,
+// with just the displayed columns
+async function fetchDataPage() {
+    const params = filterParams();
+    params.set('offset', (currentDataTablePage - 1) * dataTablePerPage);
+    params.set('limit', dataTablePerPage);
+    params.set('fields', DATA_TABLE_FIELDS.join(','));
+    const response = await fetch(`${API_BASE_URL}/data?${params}`);
+    if (!response.ok) {
+        throw new Error(`Failed to fetch data: ${response.status} ${response.statusText}`);
+    }
+    
+    const result = await response.json();
+    serverPageRows = Array.isArray(result.data) ? result.data : [];
+    serverTotalRows = result.total_matches ?? serverPageRows.length;
+}
+
+// Fetch and show the current data table page
+async function loadDataPage() {
+    try {
+        await fetchDataPage();
+        
+        // A search may have started while the page was loading
+        if (usesServerPaging()) {
+            renderDataTablePage();
+        }
+    } catch (error) {
+        console.error('Error loading data page:', error);
+        const tbody = document.getElementById('dataTableBody');
+        if (tbody) {
+            tbody.innerHTML = `<tr><td colspan="5" class="loading" style="color: #ef4444;">Error loading data: ${error.message || 'Unknown error'}</td></tr>`;
+        }
+    }
+}
+
+// Show the current page: fetched from the API, or sliced from the filtered rows
+function refreshDataTablePage() {
+    if (usesServerPaging()) {
+        loadDataPage();
+    } else {
+        renderDataTablePage();
+    }
+}
+
 async function loadAllData() {
     try {
         const url = `${API_BASE_URL}/data`;
@@ -1546,6 +1571,7 @@ async function loadAllData() {
         }
         
         filteredData = [...allData]; // Create a copy for filtering
+        allDataLoaded = true;
         
         console.log(`loadAllData: Loaded ${allData.length} plans, filteredData.length = ${filteredData.length}`);
         if (allData.length > 0) {
@@ -1562,56 +1588,6 @@ async function loadAllData() {
         updateDataTable();
         updateCounts();
         
-        // Apply saved filters if any exist (this will update charts and tables with filtered data)
-        // IMPORTANT: Re-check filters here in case they were modified during async operations
-        const savedRatingFilter = sessionStorage.getItem(STORAGE_KEYS.RATING_FILTER);
-        const savedCompanyFilter = sessionStorage.getItem(STORAGE_KEYS.COMPANY_FILTER);
-        
-        // Re-load filters to ensure they're current (in case they were reset during async operations)
-        if (savedRatingFilter) {
-            try {
-                currentRatingFilter = JSON.parse(savedRatingFilter);
-                console.log('🔄 Re-loaded rating filters from sessionStorage in loadAllData:', currentRatingFilter);
-            } catch (e) {
-                console.warn('Failed to re-parse rating filter:', e);
-            }
-        }
-        if (savedCompanyFilter) {
-            try {
-                currentCompanyFilter = JSON.parse(savedCompanyFilter);
-                console.log('🔄 Re-loaded company filters from sessionStorage in loadAllData:', currentCompanyFilter);
-            } catch (e) {
-                console.warn('Failed to re-parse company filter:', e);
-            }
-        }
-        
-        if (currentRatingFilter.length > 0 || currentCompanyFilter.length > 0) {
-            console.log('🔄 Restoring filters after data load:');
-            console.log('   Rating filters:', currentRatingFilter, '(length:', currentRatingFilter.length, ')');
-            console.log('   Company filters:', currentCompanyFilter, '(length:', currentCompanyFilter.length, ')');
-            console.log('   All data loaded:', allData.length, 'plans');
-            console.log('   Original rating distribution keys:', Object.keys(originalRatingDistribution));
-            
-            // Use setTimeout to ensure all data is ready before applying filters
-            setTimeout(() => {
-                console.log('📊 Applying restored filters...');
-                console.log('   Before applyFilters - currentRatingFilter:', currentRatingFilter);
-                console.log('   Before applyFilters - currentCompanyFilter:', currentCompanyFilter);
-                applyFilters();
-                console.log('   After applyFilters - currentRatingFilter:', currentRatingFilter);
-                console.log('   After applyFilters - currentCompanyFilter:', currentCompanyFilter);
-            }, 200);
-        } else {
-            console.log('No saved filters to restore');
-            // Even if no filters, ensure charts show correct state
-            if (Object.keys(originalRatingDistribution).length > 0) {
-                updateRatingChart(originalRatingDistribution, currentRatingFilter);
-            }
-            if (Object.keys(originalCompanyDistribution).length > 0) {
-                updateCompanyDistributionChart(originalCompanyDistribution, currentCompanyFilter);
-            }
-        }
-        
         // Remove loading from data table
         const tbody = document.getElementById('dataTableBody');
         if (tbody) {
@@ -1643,7 +1619,7 @@ function updateDataTable() {
     currentDataTablePage = 1;
     
     // Render first page
-    renderDataTablePage();
+    refreshDataTablePage();
 }
 
 // Render data table for current page
@@ -1656,10 +1632,12 @@ function renderDataTablePage() {
     
     tbody.innerHTML = '';
     
-    console.log(`renderDataTablePage: filteredData.length = ${filteredData.length}, currentDataTablePage = ${currentDataTablePage}, dataTablePerPage = ${dataTablePerPage}`);
-    console.log(`renderDataTablePage: filteredData sample:`, filteredData.slice(0, 2));
+    const serverPaged = usesServerPaging();
+    const totalRows = dataTableTotal();
+    
+    console.log(`renderDataTablePage: totalRows = ${totalRows} (server paged: ${serverPaged}), currentDataTablePage = ${currentDataTablePage}, dataTablePerPage = ${dataTablePerPage}`);
     
-    if (!Array.isArray(filteredData) || filteredData.length === 0) {
+    if (totalRows === 0) {
         console.warn('renderDataTablePage: No data to display');
         tbody.innerHTML = '<tr><td colspan="5" class="loading">No data found</td></tr>';
         const paginationContainer = document.getElementById('dataTablePagination');
@@ -1669,18 +1647,10 @@ function renderDataTablePage() {
     }
     
     // Calculate pagination
-    const totalPages = Math.ceil(filteredData.length / dataTablePerPage);
+    const totalPages = Math.ceil(totalRows / dataTablePerPage);
     const startIndex = (currentDataTablePage - 1) * dataTablePerPage;
-    const endIndex = Math.min(startIndex + dataTablePerPage, filteredData.length);
-    const currentPageData = filteredData.slice(startIndex, endIndex);
-    
-    console.log(`Pagination: totalPages=${totalPages}, startIndex=${startIndex}, endIndex=${endIndex}, currentPageData.length=${currentPageData.length}`);
-    
-    if (currentPageData.length === 0) {
-        console.warn('renderDataTablePage: No data for current page');
-        tbody.innerHTML = '<tr><td colspan="5" class="loading">No data for this page</td></tr>';
-        return;
-    }
+    const endIndex = Math.min(startIndex + dataTablePerPage, totalRows);
+    const currentPageData = serverPaged ? serverPageRows : filteredData.slice(startIndex, endIndex);
     
     console.log(`Pagination: totalPages=${totalPages}, startIndex=${startIndex}, endIndex=${endIndex}, currentPageData.length=${currentPageData.length}`);
     
@@ -1694,19 +1664,31 @@ function renderDataTablePage() {
     const companyMap = new Map(); // company -> company number
     const companyPlanCount = new Map(); // company -> current plan number
     
-    // First pass: assign company numbers based on full filtered data
-    filteredData.forEach((plan) => {
-        if (!companyMap.has(plan.Company)) {
-            companyMap.set(plan.Company, companyMap.size + 1);
-            companyPlanCount.set(plan.Company, 0);
+    if (serverPaged) {
+        // The dataset is sorted by company, so numbers follow from the per-company
+        // plan counts: plans of a company before startIndex are its earlier plans
+        let companyStart = 0;
+        Object.keys(tableCompanyDistribution).sort().forEach((company) => {
+            const count = tableCompanyDistribution[company];
+            companyMap.set(company, companyMap.size + 1);
+            companyPlanCount.set(company, Math.max(0, Math.min(startIndex, companyStart + count) - companyStart));
+            companyStart += count;
+        });
+    } else {
+        // First pass: assign company numbers based on full filtered data
+        filteredData.forEach((plan) => {
+            if (!companyMap.has(plan.Company)) {
+                companyMap.set(plan.Company, companyMap.size + 1);
+                companyPlanCount.set(plan.Company, 0);
+            }
+        });
+        
+        // Second pass: count plans per company up to startIndex
+        for (let i = 0; i < startIndex; i++) {
+            const plan = filteredData[i];
+            const currentCount = companyPlanCount.get(plan.Company);
+            companyPlanCount.set(plan.Company, currentCount + 1);
         }
-    });
-    
-    // Second pass: count plans per company up to startIndex
-    for (let i = 0; i < startIndex; i++) {
-        const plan = filteredData[i];
-        const currentCount = companyPlanCount.get(plan.Company);
-        companyPlanCount.set(plan.Company, currentCount + 1);
     }
     
     // Render current page data
@@ -1736,7 +1718,7 @@ function renderDataTablePage() {
         const companyNum = companyMap.get(plan.Company);
         
         // Increment plan number for this company
-        const currentCount = companyPlanCount.get(plan.Company);
+        const currentCount = companyPlanCount.get(plan.Company) || 0;
         const planNum = currentCount + 1;
         companyPlanCount.set(plan.Company, planNum);
         
@@ -1875,11 +1857,11 @@ function updateDataTablePagination(totalPages) {
 
 // Navigate to specific page for data table
 function goToDataTablePage(page) {
-    const totalPages = Math.ceil(filteredData.length / dataTablePerPage);
+    const totalPages = Math.ceil(dataTableTotal() / dataTablePerPage);
     if (page < 1 || page > totalPages) return;
     
     currentDataTablePage = page;
-    renderDataTablePage();
+    refreshDataTablePage();
     
     // Scroll to top of table
     const tableCard = document.querySelector('#dataTable').closest('.table-card');
@@ -1894,13 +1876,13 @@ function updateCounts() {
     const totalEl = document.getElementById('totalCount');
     
     // Calculate what's actually showing on current page
-    const totalPages = Math.ceil(filteredData.length / dataTablePerPage);
+    const totalRows = dataTableTotal();
     const startIndex = (currentDataTablePage - 1) * dataTablePerPage;
-    const endIndex = Math.min(startIndex + dataTablePerPage, filteredData.length);
-    const showingCount = filteredData.length > 0 ? (endIndex - startIndex) : 0;
+    const endIndex = Math.min(startIndex + dataTablePerPage, totalRows);
+    const showingCount = totalRows > 0 ? (endIndex - startIndex) : 0;
     
     if (showingEl) showingEl.textContent = showingCount;
-    if (totalEl) totalEl.textContent = filteredData.length;
+    if (totalEl) totalEl.textContent = totalRows;
 }
 
 // Apply filters (removed - filter section removed from UI)
@@ -1928,9 +1910,14 @@ function resetFilters() {
 }
 
 // Handle search
-function handleSearch() {
+async function handleSearch() {
     const searchTerm = document.getElementById('searchInput')?.value.toLowerCase() || '';
     
+    // Search runs client-side on the full dataset; fetch it on first use
+    if (searchTerm && !allDataLoaded) {
+        await loadAllData();
+    }
+    
     if (!searchTerm) {
         filteredData = allData;
     } else {
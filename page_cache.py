@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Persistent page cache for the Ditto Insurance Scraper
+
+Keeps the body of every fetched page on disk, keyed by URL, together with
+its HTTP validators (ETag / Last-Modified) and whatever the scraper
+extracted from it (plan links, rating). On the next run the scraper sends
+If-None-Match / If-Modified-Since, and a 304 Not Modified lets it reuse both
+the cached body and the previous extraction result without parsing again.
+
+Servers that ignore conditional requests still mostly return byte-identical
+pages, so every body's SHA-256 digest is stored too: a 200 whose digest
+matches the cached one keeps the previous extraction results as well.
+
+Extraction results are stored with the extractor version that produced
+them and only reused by the same version, so a scraper whose extraction
+logic changed re-parses cached pages instead of reusing stale answers.
+
+Layout (one pair of files per URL, named by the URL's SHA-256):
+    <cache_dir>/<aa>/<sha256>.json   metadata: url, validators, digest,
+                                     extractor_version, extracted
+    <cache_dir>/<aa>/<sha256>.html   page body
+
+Usage:
+    python scrape_ditto.py --cache-dir .scrape_cache
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+
+from atomic_io import atomic_write
+
+
+class PageCache:
+    """
+    On-disk cache of page bodies, validators and extraction results.
+
+    Safe to share between the scraper's worker threads. Counters for the
+    run summary are kept in self.stats:
+    - not_modified: conditional requests answered with 304
+    - downloaded: full responses whose content changed (cache misses)
+    - unchanged: full responses identical to the cached copy
+    - reused: extraction results taken from the cache instead of re-parsing
+    """
+
+    def __init__(self, cache_dir, extractor_version=None):
+        """
+        Args:
+            cache_dir (str): Directory to keep cached pages in (created if missing)
+            extractor_version: Version of the caller's extraction logic;
+                               results stored by another version are ignored
+        """
+        self.cache_dir = cache_dir
+        self.extractor_version = extractor_version
+        os.makedirs(cache_dir, exist_ok=True)
+        self.stats = Counter()
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _path(self, url, suffix):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + suffix)
+
+    def _meta(self, url):
+        """Cached metadata for url (loaded from disk on first use), or None"""
+        with self._lock:
+            if url in self._entries:
+                return self._entries[url]
+        try:
+            with open(self._path(url, '.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+        with self._lock:
+            return self._entries.setdefault(url, meta)
+
+    def _save_meta(self, url, meta):
+        with self._lock:
+            self._entries[url] = meta
+        path = self._path(url, '.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, json.dumps(meta).encode('utf-8'))
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since headers for a cached url"""
+        meta = self._meta(url)
+        headers = {}
+        if meta and os.path.exists(self._path(url, '.html')):
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def body(self, url):
+        """Cached body for url, or None"""
+        if self._meta(url) is None:
+            return None
+        try:
+            with open(self._path(url, '.html'), encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """
+        Cache a freshly downloaded page.
+
+        If the body is identical to the cached copy (same digest), the
+        previous extraction results are kept; otherwise they are dropped.
+
+        Returns:
+            bool: True if the content is unchanged since it was cached
+        """
+        data = body.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        meta = self._meta(url)
+        unchanged = bool(meta) and meta.get('digest') == digest
+        if unchanged:
+            self.count('unchanged')
+            extracted = self._extracted(meta)
+        else:
+            self.count('downloaded')
+            path = self._path(url, '.html')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, data)
+            extracted = {}
+        self._save_meta(url, {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'digest': digest,
+            'extractor_version': self.extractor_version,
+            'extracted': extracted,
+        })
+        return unchanged
+
+    def not_modified(self, url):
+        """Record a 304 for url and return its cached body (None if it is gone)"""
+        body = self.body(url)
+        if body is not None:
+            self.count('not_modified')
+        return body
+
+    def extracted(self, url, key):
+        """
+        Previously extracted value for (url, key).
+
+        Returns:
+            tuple: (True, value) if cached, else (False, None)
+        """
+        extracted = self._extracted(self._meta(url))
+        if key in extracted:
+            return True, extracted[key]
+        return False, None
+
+    def store_extracted(self, url, key, value):
+        """Remember a JSON-serialisable extraction result for a cached url"""
+        meta = self._meta(url)
+        if meta is None:
+            return
+        meta = dict(meta, extractor_version=self.extractor_version,
+                    extracted=dict(self._extracted(meta), **{key: value}))
+        self._save_meta(url, meta)
+
+    def _extracted(self, meta):
+        """Extraction results in meta made by this extractor version"""
+        if not meta or meta.get('extractor_version') != self.extractor_version:
+            return {}
+        return meta.get('extracted', {})
+
+    def count(self, name):
+        """Increment one of the self.stats counters"""
+        with self._lock:
+            self.stats[name] += 1
+
+    def summary(self):
+        return (f"{self.stats['not_modified']} not modified, {self.stats['unchanged']} unchanged, "
+                f"{self.stats['downloaded']} downloaded, {self.stats['reused']} extraction(s) reused")
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Adaptive rate limiting and retries for the Ditto Insurance Scraper
+
+AdaptiveRateLimiter is a per-host token bucket whose refill rate follows
+the server's health (AIMD, as in TCP congestion control):
+- every fast successful response adds a little to the rate, up to max_rate
+- a slow response (above target_latency) trims it by 10%
+- 429 Too Many Requests / 503 Service Unavailable halve it (down to
+  min_rate), and a Retry-After header pauses the host until it expires
+
+A host's rate is cut at most once per cooldown window (a round trip, or
+one request interval at the reduced rate if that is longer): when several
+workers hit the same overload burst, their failures count as one signal
+instead of compounding into a /2^n cut. After a throttling cut, fast
+responses bring the rate back to where it was before the cut within
+``recovery_time`` seconds (as TCP CUBIC returns to its last window), and
+only then resume the additive climb; an isolated 503 costs a moment of
+throughput instead of a slow climb back from half the rate.
+
+RetryPolicy retries transient failures (connection errors, timeouts, 429
+and 5xx) with jittered exponential backoff ("full jitter"), at most
+max_retries times per request and max_budget times per run, so a bad
+outage fails fast instead of multiplying the run time.
+
+Both are shared by all worker threads (and the asyncio engine) and are
+exercised against benchmarks/stub_site.py, which can inject 5xx errors
+and throttle with 429 + Retry-After.
+
+Usage:
+    python scrape_ditto.py --rate 2 --max-rate 8 --retries 3 --retry-budget 50
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+THROTTLE_STATUSES = frozenset({429, 503})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _HostState:
+    __slots__ = ('rate', 'tat', 'paused_until', 'cooldown_until', 'peak', 'floor', 'cut_at')
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tat = 0.0  # theoretical arrival time of the next request
+        self.paused_until = 0.0
+        self.cooldown_until = 0.0  # no further rate cut before this time
+        # Rate before and after the last throttling cut, and when it happened
+        self.peak = 0.0
+        self.floor = 0.0
+        self.cut_at = 0.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-host token bucket with an adaptive refill rate.
+
+    Request start times to a host are spaced 1/rate seconds apart (bursts
+    of up to ``burst`` requests are allowed after idle time), no matter how
+    many workers are waiting. ``record()`` feeds each response back so the
+    rate tracks what the server can take.
+    """
+
+    def __init__(self, rate=None, max_rate=None, min_rate=0.2, burst=1,
+                 target_latency=1.0, increase=0.1, recovery_time=2.0):
+        """
+        Args:
+            rate (float): Initial requests per second per host (None: unlimited
+                          until the server throttles)
+            max_rate (float): Ceiling for the adapted rate (default: 4x rate)
+            min_rate (float): Floor for the adapted rate
+            burst (int): Requests allowed back to back after an idle period
+            target_latency (float): Responses slower than this (seconds) reduce the rate
+            increase (float): Requests/second added per fast successful response
+            recovery_time (float): Seconds to climb back to the rate before a
+                                   throttling cut
+        """
+        self.initial_rate = rate
+        self.max_rate = max_rate if max_rate is not None else (rate * 4 if rate else None)
+        self.min_rate = min_rate
+        self.burst = max(1, burst)
+        self.target_latency = target_latency
+        self.increase = increase
+        self.recovery_time = recovery_time
+        self.stats = Counter()
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlparse(url).netloc
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.initial_rate)
+        return state
+
+    def reserve(self, url):
+        """Reserve the next request slot for url's host; return seconds to wait."""
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            start = max(now, state.paused_until)
+            if state.rate:
+                interval = 1.0 / state.rate
+                # GCRA: up to burst requests may start at once after idle time
+                start = max(start, state.tat - (self.burst - 1) * interval)
+                state.tat = max(state.tat, start) + interval
+        return start - now
+
+    def wait(self, url):
+        """Block until a request to url's host is allowed."""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, url, status_code, latency, retry_after=None):
+        """
+        Adapt url's host rate to a response.
+
+        Args:
+            url (str): Requested URL
+            status_code (int): Response status, or None if the request failed
+            latency (float): Seconds from sending the request to the response
+            retry_after (float): Parsed Retry-After header, if any
+        """
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            if status_code in THROTTLE_STATUSES or status_code is None:
+                self.stats['throttled' if status_code in THROTTLE_STATUSES else 'failed'] += 1
+                # An unlimited host gets a rate as soon as it pushes back
+                rate = state.rate or self.max_rate or self.initial_rate or 1.0 / max(latency, 0.01)
+                recovering = now - state.cut_at < self.recovery_time
+                if self._decrease(state, rate / 2, latency, now) and state.rate < rate:
+                    # A cut in the middle of a recovery still aims for the earlier peak
+                    state.peak = max(rate, state.peak) if recovering else rate
+                    state.floor, state.cut_at = state.rate, now
+                if retry_after:
+                    state.paused_until = max(state.paused_until, now + retry_after)
+            elif state.rate:
+                if latency > self.target_latency:
+                    # A slow server gets no fast recovery: it is the rate that is too high
+                    if self._decrease(state, state.rate * 0.9, latency, now):
+                        state.peak = 0.0
+                elif status_code < 500:
+                    ceiling = self.max_rate or state.rate + self.increase
+                    step = self.increase
+                    if state.rate < state.peak:
+                        progress = min(1.0, (now - state.cut_at) / self.recovery_time)
+                        step = max(step, state.floor + (state.peak - state.floor) * progress - state.rate)
+                    state.rate = min(ceiling, state.rate + step)
+
+    def _decrease(self, state, rate, latency, now):
+        """
+        Cut state's rate to ``rate``, unless it was already cut in this
+        cooldown window; returns whether it was cut.
+        """
+        if now < state.cooldown_until:
+            return False
+        state.rate = max(self.min_rate, rate)
+        # Responses to requests sent before the cut still reflect the old rate
+        state.cooldown_until = now + max(latency, 1.0 / state.rate)
+        return True
+
+    def rate(self, url):
+        """Current requests/second for url's host (None: unlimited)"""
+        with self._lock:
+            return self._host(url).rate
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff with a per-request limit and a per-run budget.
+
+    Safe to share between worker threads. Counters for the run summary are
+    kept in self.stats (retries, gave_up, budget_exhausted).
+    """
+
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=30.0, max_budget=50, rng=None):
+        """
+        Args:
+            max_retries (int): Retries per request after the first attempt
+            base_delay (float): Backoff before the first retry (seconds, before jitter)
+            max_delay (float): Upper bound for any single backoff
+            max_budget (int): Retries allowed across the whole run
+            rng (random.Random): Source of jitter (for reproducible tests)
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = max_budget
+        self.rng = rng or random.Random()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def retryable(status_code):
+        """Whether a response status (None: connection error / timeout) is worth retrying"""
+        return status_code is None or status_code in RETRY_STATUSES
+
+    def next_delay(self, attempt, status_code, retry_after=None):
+        """
+        Backoff before retry number ``attempt`` (1-based), or None to give up.
+
+        Consumes one unit of the run's retry budget when a retry is allowed.
+        """
+        if not self.retryable(status_code):
+            return None
+        with self._lock:
+            if attempt > self.max_retries:
+                self.stats['gave_up'] += 1
+                return None
+            if self.budget <= 0:
+                self.stats['budget_exhausted'] += 1
+                return None
+            self.budget -= 1
+            self.stats['retries'] += 1
+            jitter = self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            return min(self.max_delay, max(retry_after, jitter))
+        return jitter
+
+    def summary(self):
+        return (f"{self.stats['retries']} retried, {self.stats['gave_up']} gave up, "
+                f"{self.stats['budget_exhausted']} over budget ({self.budget} left)")
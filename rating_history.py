@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Historical rating store for the Ditto Insurance Scraper
+
+Each scrape overwrites the CSV, so the rating history of every plan is kept
+in an embedded SQLite database that every run appends to:
+
+    plans    one row per plan URL (company, policy name)
+    ratings  (plan, scraped_at) -> rating, stored only when a plan is first
+             seen or its rating differs from its latest stored value
+    runs     one row per scrape run (timestamp, record count)
+
+Because unchanged ratings are not written again, the store grows with the
+number of rating changes rather than runs x plans. ratings is a WITHOUT
+ROWID table clustered on (plan_id, scraped_at), so a plan's series is one
+range scan; a secondary index on scraped_at answers "changes since".
+Timestamps are the scraper's 'YYYY-MM-DD HH:MM:SS' strings, which sort
+chronologically.
+
+The API reads the same file (api_service/history_store.py).
+
+Usage:
+    python scrape_ditto.py --history ditto_rating_history.sqlite
+"""
+
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    company TEXT NOT NULL,
+    policy_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plans_company ON plans (company);
+CREATE TABLE IF NOT EXISTS ratings (
+    plan_id INTEGER NOT NULL REFERENCES plans (id),
+    scraped_at TEXT NOT NULL,
+    rating REAL,
+    PRIMARY KEY (plan_id, scraped_at)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ratings_scraped_at ON ratings (scraped_at);
+CREATE TABLE IF NOT EXISTS runs (
+    scraped_at TEXT PRIMARY KEY,
+    records INTEGER NOT NULL
+);
+"""
+
+# Latest stored rating of every plan
+LATEST_RATINGS = """
+SELECT r.plan_id, r.rating FROM ratings r
+JOIN (SELECT plan_id, MAX(scraped_at) AS scraped_at FROM ratings GROUP BY plan_id) latest
+  USING (plan_id, scraped_at)
+"""
+
+
+def _same_rating(a, b):
+    return a == b or (a is None and b is None)
+
+
+class RatingHistory:
+    """Append-only rating history in a SQLite database file."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): SQLite database file (created if missing)
+        """
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def append(self, records):
+        """
+        Record one scrape run.
+
+        Args:
+            records (iterable of dict): Scraper records ('Company', 'Policy Name',
+                'Rating By Ditto', 'Plan URL', 'Last Updated')
+
+        Returns:
+            int: Number of ratings written (new plans and changed ratings)
+        """
+        written = 0
+        count = 0
+        last_scraped = None
+        with self.conn:
+            latest = dict(self.conn.execute(LATEST_RATINGS))
+            for record in records:
+                count += 1
+                rating = record['Rating By Ditto']
+                if rating is not None and rating != rating:  # NaN
+                    rating = None
+                scraped_at = record['Last Updated']
+                last_scraped = max(last_scraped or scraped_at, scraped_at)
+
+                self.conn.execute(
+                    'INSERT INTO plans (url, company, policy_name) VALUES (?, ?, ?) '
+                    'ON CONFLICT (url) DO UPDATE SET company = excluded.company, '
+                    'policy_name = excluded.policy_name',
+                    (record['Plan URL'], record['Company'], record['Policy Name']),
+                )
+                plan_id = self.conn.execute('SELECT id FROM plans WHERE url = ?',
+                                            (record['Plan URL'],)).fetchone()[0]
+                if plan_id in latest and _same_rating(latest[plan_id], rating):
+                    continue
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO ratings (plan_id, scraped_at, rating) VALUES (?, ?, ?)',
+                    (plan_id, scraped_at, rating),
+                )
+                latest[plan_id] = rating
+                written += 1
+            if last_scraped is not None:
+                self.conn.execute('INSERT OR REPLACE INTO runs (scraped_at, records) VALUES (?, ?)',
+                                  (last_scraped, count))
+        return written
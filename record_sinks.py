@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Record sinks for the Ditto Insurance Scraper
+
+Scraped records flow into a sink as soon as they are collected, instead of
+piling up in memory until the run ends. File-backed sinks checkpoint after
+every provider: the records written so far are flushed to disk and
+<spool>.checkpoint records which providers are complete and how much of
+the spool they cover. After a crash, --resume truncates the spool back to
+the last checkpoint and the scraper skips the completed providers.
+
+Sinks:
+    MemorySink    plain list (library default, no durability)
+    CSVSink       CSV spool, one row per record
+    NDJSONSink    one JSON object per line
+    SQLiteSink    records table, one transaction per checkpoint
+    ColumnarSink  one Arrow IPC segment per checkpoint (requires pyarrow)
+
+The final, sorted dataset is produced from the spool by external_sort():
+sorted runs of at most run_size records are spilled to temporary files and
+merged with a heap, so memory stays bounded by the run size rather than the
+number of plans.
+
+Usage:
+    python scrape_ditto.py --sink ndjson --spool ditto.spool.ndjson
+    python scrape_ditto.py --sink ndjson --spool ditto.spool.ndjson --resume
+"""
+
+import csv
+import glob
+import heapq
+import io
+import json
+import os
+import sqlite3
+import tempfile
+
+from atomic_io import atomic_write
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+RECORD_FIELDS = ['Company', 'Policy Name', 'Rating By Ditto', 'Plan URL', 'Last Updated']
+RATING_FIELD = 'Rating By Ditto'
+
+# Records per sorted run held in memory by external_sort
+SORT_RUN_SIZE = 50_000
+
+
+def _rating_or_none(value):
+    if value is None or value != value:  # NaN
+        return None
+    return float(value)
+
+
+class RecordSink:
+    """
+    Append-only store of scraped records with per-provider checkpoints.
+
+    Iterating a sink yields the records in write order.
+    """
+
+    def __init__(self):
+        self._providers = []
+        self._rows = 0
+
+    def write(self, record):
+        """Append one record (a dict with RECORD_FIELDS)"""
+        raise NotImplementedError
+
+    def checkpoint(self, provider):
+        """Mark provider as complete; everything written so far survives a crash"""
+        self._providers.append(provider)
+
+    def completed_providers(self):
+        """Providers completed by this run (and, when resuming, the interrupted one)"""
+        return set(self._providers)
+
+    def finish(self):
+        """The run completed: a later run starts over instead of resuming"""
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        return self._rows
+
+    def __iter__(self):
+        raise NotImplementedError
+
+
+class MemorySink(RecordSink):
+    """Records kept in a list; nothing survives the process"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+        self._rows += 1
+
+    def __iter__(self):
+        return iter(self.records)
+
+
+class _SpoolSink(RecordSink):
+    """
+    File-backed sink with a JSON checkpoint next to the spool.
+
+    Subclasses make everything written so far durable in _commit() and
+    return whatever they need to roll back to that point; _open() gets it
+    back on resume.
+    """
+
+    def __init__(self, path, resume=False):
+        super().__init__()
+        self.path = path
+        self.checkpoint_path = f"{path}.checkpoint"
+        state = None
+        if resume and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                state = json.load(f)
+            self._providers = state['providers']
+            self._rows = state['rows']
+        self._open(state)
+
+    def _open(self, state):
+        raise NotImplementedError
+
+    def _commit(self):
+        raise NotImplementedError
+
+    def checkpoint(self, provider):
+        position = self._commit()
+        super().checkpoint(provider)
+        atomic_write(self.checkpoint_path, json.dumps({
+            'providers': self._providers,
+            'rows': self._rows,
+            'position': position,
+        }).encode('utf-8'))
+
+    def finish(self):
+        self._commit()
+        if os.path.exists(self.checkpoint_path):
+            os.unlink(self.checkpoint_path)
+
+
+class _LineSink(_SpoolSink):
+    """Spool of one encoded line per record; rolled back by truncating the file"""
+
+    header = b''
+
+    def _open(self, state):
+        if state is None:
+            self._file = open(self.path, 'wb')
+            self._file.write(self.header)
+        else:
+            self._file = open(self.path, 'r+b')
+            self._file.truncate(state['position'])
+            self._file.seek(0, os.SEEK_END)
+
+    def _commit(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def write(self, record):
+        self._file.write(self.encode(record))
+        self._rows += 1
+
+    def close(self):
+        self._file.close()
+
+    def __iter__(self):
+        self._file.flush()
+        with open(self.path, 'rb') as f:
+            f.seek(len(self.header))
+            for line in f:
+                yield self.decode(line)
+
+
+class CSVSink(_LineSink):
+    """Records as CSV rows, in the column order of the output file"""
+
+    header = (','.join(RECORD_FIELDS) + '\n').encode('utf-8')
+
+    def encode(self, record):
+        buffer = io.StringIO()
+        rating = _rating_or_none(record[RATING_FIELD])
+        row = [record[field] if field != RATING_FIELD else ('' if rating is None else rating)
+               for field in RECORD_FIELDS]
+        csv.writer(buffer, lineterminator='\n').writerow(row)
+        return buffer.getvalue().encode('utf-8')
+
+    def decode(self, line):
+        row = next(csv.reader([line.decode('utf-8')]))
+        record = dict(zip(RECORD_FIELDS, row))
+        record[RATING_FIELD] = float(record[RATING_FIELD]) if record[RATING_FIELD] else None
+        return record
+
+
+class NDJSONSink(_LineSink):
+    """Records as newline-delimited JSON objects"""
+
+    def encode(self, record):
+        record = dict(record, **{RATING_FIELD: _rating_or_none(record[RATING_FIELD])})
+        return json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+
+    def decode(self, line):
+        return json.loads(line)
+
+
+class SQLiteSink(_SpoolSink):
+    """Records in a SQLite table; each checkpoint commits one transaction"""
+
+    COLUMNS = ['company', 'policy_name', 'rating', 'plan_url', 'last_updated']
+
+    def _open(self, state):
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS records (seq INTEGER PRIMARY KEY, '
+            'company TEXT, policy_name TEXT, rating REAL, plan_url TEXT, last_updated TEXT)'
+        )
+        # Rows past the checkpoint (committed just before a crash) are rolled back
+        self._conn.execute('DELETE FROM records WHERE seq > ?', (0 if state is None else state['rows'],))
+        self._conn.commit()
+
+    def _commit(self):
+        self._conn.commit()
+        return self._rows
+
+    def write(self, record):
+        self._rows += 1
+        self._conn.execute(
+            'INSERT INTO records VALUES (?, ?, ?, ?, ?, ?)',
+            (self._rows, record['Company'], record['Policy Name'], _rating_or_none(record[RATING_FIELD]),
+             record['Plan URL'], record['Last Updated']),
+        )
+
+    def close(self):
+        self._conn.close()
+
+    def __iter__(self):
+        cursor = self._conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM records ORDER BY seq")
+        for row in cursor:
+            yield dict(zip(RECORD_FIELDS, row))
+
+
+class ColumnarSink(_SpoolSink):
+    """
+    Records as Arrow IPC (Feather) segments in the directory ``path``.
+
+    Each checkpoint writes the records buffered since the previous one as a
+    new segment; rolling back deletes the segments past the checkpoint.
+    """
+
+    SCHEMA = None if pa is None else pa.schema([
+        ('Company', pa.string()),
+        ('Policy Name', pa.string()),
+        ('Rating By Ditto', pa.float64()),
+        ('Plan URL', pa.string()),
+        ('Last Updated', pa.string()),
+    ])
+
+    def _open(self, state):
+        if pa is None:
+            raise RuntimeError("pyarrow is required for the columnar sink")
+        os.makedirs(self.path, exist_ok=True)
+        self._segments = 0 if state is None else state['position']
+        for segment in self._segment_paths()[self._segments:]:
+            os.unlink(segment)
+        self._buffer = []
+
+    def _segment_paths(self):
+        return sorted(glob.glob(os.path.join(self.path, '*.arrow')))
+
+    def _commit(self):
+        if self._buffer:
+            table = pa.Table.from_pylist(self._buffer, schema=self.SCHEMA)
+            segment = os.path.join(self.path, f"{self._segments:06d}.arrow")
+            feather.write_feather(table, f"{segment}.tmp", compression='uncompressed')
+            os.replace(f"{segment}.tmp", segment)
+            self._segments += 1
+            self._buffer = []
+        return self._segments
+
+    def write(self, record):
+        self._buffer.append(dict(record, **{RATING_FIELD: _rating_or_none(record[RATING_FIELD])}))
+        self._rows += 1
+
+    def __iter__(self):
+        for segment in self._segment_paths():
+            for batch in feather.read_table(segment).to_batches():
+                yield from batch.to_pylist()
+        yield from self._buffer
+
+
+SINKS = {
+    'csv': CSVSink,
+    'ndjson': NDJSONSink,
+    'sqlite': SQLiteSink,
+    'arrow': ColumnarSink,
+}
+
+
+def _spill(run):
+    """Write a sorted run of (seq, record) pairs to a temporary file"""
+    f = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+    for seq, record in run:
+        f.write(json.dumps([seq, record], ensure_ascii=False) + '\n')
+    f.seek(0)
+    return f
+
+
+def external_sort(records, key, run_size=SORT_RUN_SIZE):
+    """
+    Yield records ordered by key(record), ties in input order.
+
+    At most run_size records are held in memory: full runs are sorted and
+    spilled to temporary files, then all runs are merged with a heap.
+    """
+    def entry_key(entry):
+        return key(entry[1]), entry[0]
+
+    runs = []
+    run = []
+    try:
+        for seq, record in enumerate(records):
+            run.append((seq, record))
+            if len(run) >= run_size:
+                runs.append(_spill(sorted(run, key=entry_key)))
+                run = []
+        run.sort(key=entry_key)
+        if not runs:
+            for _, record in run:
+                yield record
+            return
+        spilled = [(tuple(json.loads(line)) for line in f) for f in runs]
+        for _, record in heapq.merge(*spilled, iter(run), key=entry_key):
+            yield record
+    finally:
+        for f in runs:
+            f.close()
+
+
+def write_csv(records, filename):
+    """Write records to a CSV file with RECORD_FIELDS as the header; returns the row count"""
+    rows = 0
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(RECORD_FIELDS)
+        for record in records:
+            rating = _rating_or_none(record[RATING_FIELD])
+            writer.writerow([record[field] if field != RATING_FIELD else ('' if rating is None else rating)
+                             for field in RECORD_FIELDS])
+            rows += 1
+    return rows
@@ -7,9 +7,24 @@ Usage:
     python scrape_ditto.py                          # Scrape all providers
     python scrape_ditto.py --providers tata-aig hdfc-ergo  # Scrape specific providers
     python scrape_ditto.py --company "HDFC" --min-rating 4.0  # Filter results
+    python scrape_ditto.py --workers 4 --rate 2      # Fetch concurrently, max 2 requests/sec
+    python scrape_ditto.py --engine async --workers 8  # asyncio engine (requires aiohttp)
+    python scrape_ditto.py --cache-dir .scrape_cache  # Re-use unchanged pages between runs
+    python scrape_ditto.py --rate 2 --max-rate 8 --retries 3  # Adaptive rate, retry transient errors
+    python scrape_ditto.py --sink sqlite --resume     # Resume an interrupted run from its spool
+
+Besides the CSV, a typed Arrow IPC (Feather v2) copy of the dataset is written
+next to it (ditto_insurance_data.arrow) when pyarrow is installed, and every
+run's ratings are appended to a SQLite rating history
+(ditto_insurance_data_history.sqlite, see rating_history.py).
+
+Output files are replaced atomically, snapshotted and announced in
+ditto_insurance_data.manifest.json (see dataset_manifest.py), which is what
+the API watches for new versions.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import pandas as pd
 import re
@@ -17,8 +32,21 @@ import time
 from datetime import datetime
 import argparse
 import json
+import os
 from urllib.parse import urljoin, urlparse
 import sys
+import threading
+from functools import lru_cache
+from bisect import bisect_right
+from collections import Counter, deque
+from html import unescape
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from dataset_manifest import manifest_path_for, publish_dataset
+from page_cache import PageCache
+from rate_control import AdaptiveRateLimiter, RetryPolicy, parse_retry_after
+from record_sinks import RATING_FIELD, RECORD_FIELDS, SINKS, MemorySink, external_sort, write_csv
+from rating_history import RatingHistory
 
 BASE_URL = "https://joinditto.in/health-insurance/"
 HEADERS = {
@@ -52,6 +80,286 @@ KNOWN_PROVIDERS = [
     'edelweiss',  # Zuno (erstwhile Edelweiss) - uses edelweiss in URL
 ]
 
+# Map URL path to display name (e.g., edelweiss -> Zuno, max-bupa -> Niva Bupa)
+PROVIDER_DISPLAY_NAMES = {
+    'edelweiss': 'Zuno',
+    'max-bupa': 'Niva Bupa',
+    'new-india-assurance': 'New India Assurance',
+    'sbi': 'SBI',
+    'reliance': 'Reliance',
+    'hdfc-ergo': 'HDFC Ergo',
+    'tata-aig': 'TATA AIG',
+}
+
+# Version of the extraction logic (extract_plan_links, extract_rating and
+# what they call). Bump it whenever a change can alter their results: the
+# page cache drops results extracted by any other version, so pages that
+# have not changed are parsed again instead of serving the old answer
+EXTRACTOR_VERSION = 1
+
+# Providers whose listing page is blocked, with common plan slugs to probe instead
+FALLBACK_PLANS = {
+    'edelweiss': ['health-insurance-silver', 'health-insurance-gold', 'health-insurance-platinum'],
+}
+
+# lxml (in requirements_scraper.txt) is used directly when installed; it is
+# several times faster than building a BeautifulSoup tree
+try:
+    import lxml.html
+    from lxml import etree
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# pyarrow (in requirements_scraper.txt) is optional; without it only the CSV is written
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+# Declared column types of the columnar output, so readers never infer dtypes
+COLUMNAR_SCHEMA = pa.schema([
+    ('Company', pa.dictionary(pa.int32(), pa.string())),
+    ('Policy Name', pa.string()),
+    ('Rating By Ditto', pa.float32()),
+    ('Plan URL', pa.string()),
+    ('Last Updated', pa.timestamp('s')),
+]) if pa is not None else None
+
+# Rows of the output printed at a time by main()
+OUTPUT_PRINT_ROWS = 10_000
+
+# Bytes of the sorted CSV converted per record batch of the columnar output
+COLUMNAR_BLOCK_BYTES = 4 << 20
+
+# Column types of the CSV output (as pandas reads them), recorded in the manifest
+CSV_SCHEMA = [{'name': name, 'type': 'float64' if name == RATING_FIELD else 'object'}
+              for name in RECORD_FIELDS]
+
+# Pages to exclude (not actual insurance plans)
+EXCLUDED_PAGES = frozenset({'reviews', 'review', 'faq', 'faqs', 'about', 'contact', 'terms',
+                            'privacy', 'claims', 'claim', 'renewal', 'compare', 'comparison'})
+
+# Rating patterns, compiled once at import (see extract_rating for the cascade)
+DITTO_RATING_PATTERNS = [re.compile(pattern, re.I) for pattern in (
+    r'(\d+\.\d{1,2})Rated\s+by\s+Ditto',  # Number directly before "Rated by Ditto"
+    r'(\d+\.\d{1,2})\s+Rated\s+by\s+Ditto',  # Number with space before
+    r'rated\s+by\s+ditto[:\s]+(\d+\.?\d*)',  # "Rated by Ditto: 3.44"
+    r'(\d+\.?\d*)\s+rated\s+by\s+ditto',  # "3.44 rated by ditto"
+    r'ditto[:\s]+(\d+\.?\d*)',  # "Ditto: 3.44"
+    r'(\d+\.?\d*)\s+ditto',  # "3.44 ditto"
+)]
+GLUED_RATING_PATTERN = re.compile(r'(\d+)([1-5]\.\d{1,2})Rated\s+by\s+Ditto', re.I)
+GLUED_RATING_SUFFIX_PATTERN = re.compile(r'(\d*[1-5]\.\d{1,2})Rated\s+by\s+Ditto', re.I)
+TRAILING_RATING_PATTERN = re.compile(r'([1-5]\.\d{1,2})$')
+RATING_CLASS_PATTERN = re.compile(r'rating|score|ditto', re.I)
+RATING_ELEMENT_TAGS = ('div', 'span', 'p', 'h1', 'h2', 'h3')
+
+# Raw-HTML fast path (see _fast_rating): how far before the marker to look,
+# and the rating as the last thing in the visible text before it
+RATED_BY_DITTO_MARKER = re.compile(r'Rated\s+by\s+Ditto', re.I)
+FAST_RATING_WINDOW = 400
+TAG_PATTERN = re.compile(r'<[^>]*>')
+FAST_RATING_PATTERN = re.compile(r'(\d+\.\d{1,2})\s*$')
+HEAD_END_PATTERN = re.compile(r'</head\s*>|<body[\s>]', re.I)
+NUMBER_PATTERN = re.compile(r'(\d+\.?\d*)')
+DECIMAL_PATTERN = re.compile(r'\b(\d+\.\d{1,2})\b')
+
+
+@lru_cache(maxsize=None)
+def _plan_link_pattern(provider_name):
+    """Compiled /health-insurance/{provider}/{plan}/ link pattern for a provider"""
+    return re.compile(rf'/health-insurance/{re.escape(provider_name)}/([^/#\?]+)/?$')
+
+
+# Elements whose text BeautifulSoup's get_text() leaves out
+NON_TEXT_TAGS = frozenset({'script', 'style', 'template'})
+# Their opening and closing tags in raw HTML (tag names are case-insensitive)
+NON_TEXT_BLOCK_PATTERN = re.compile(rf"<({'|'.join(sorted(NON_TEXT_TAGS))})\b", re.I)
+NON_TEXT_BLOCK_END_PATTERNS = {tag: re.compile(rf'</{tag}\b', re.I) for tag in NON_TEXT_TAGS}
+
+
+def _lxml_text(element):
+    """
+    Text of an lxml element, matching BeautifulSoup's get_text(): script,
+    style and template contents and comments are left out.
+    """
+    parts = []
+    walker = etree.iterwalk(element, events=('start', 'end', 'comment', 'pi'))
+    for event, node in walker:
+        if event == 'start':
+            if node.tag in NON_TEXT_TAGS:
+                walker.skip_subtree()
+            elif node.text:
+                parts.append(node.text)
+        elif node is not element and node.tail:
+            # 'end' of a child element, or a comment / processing instruction
+            parts.append(node.tail)
+    return ''.join(parts)
+
+
+class ParsedPage:
+    """
+    An HTML page parsed at most once and shared by every extractor.
+    
+    Uses lxml directly when it is installed, and BeautifulSoup otherwise
+    (or when lxml rejects the document). Parsing is deferred until an
+    extractor needs the tree, so extractors that only scan the raw HTML
+    (see _fast_rating) never pay for it. The page text and its lowercase
+    form are likewise computed on first use.
+    """
+    def __init__(self, html, parser=None):
+        """
+        Args:
+            html (str): Page HTML
+            parser (str): 'lxml' or a BeautifulSoup parser name (default: HTML_PARSER)
+        """
+        self.html = html
+        self.parser = parser or HTML_PARSER
+        self._root = None
+        self._soup = None
+        self._parsed = False
+        self._text = None
+        self._text_lower = None
+    
+    @classmethod
+    def of(cls, html):
+        """Return html if it is already a ParsedPage, else wrap it"""
+        return html if isinstance(html, cls) else cls(html)
+    
+    def _parse(self):
+        if self._parsed:
+            return
+        parser = self.parser
+        if parser == 'lxml':
+            try:
+                self._root = lxml.html.document_fromstring(self.html)
+            except (etree.ParserError, ValueError):
+                parser = 'html.parser'
+        if self._root is None:
+            self._soup = BeautifulSoup(self.html, parser)
+        self._parsed = True
+    
+    @property
+    def root(self):
+        """lxml document root, or None when parsed with BeautifulSoup"""
+        self._parse()
+        return self._root
+    
+    @property
+    def soup(self):
+        """BeautifulSoup tree, or None when parsed with lxml"""
+        self._parse()
+        return self._soup
+    
+    @property
+    def text(self):
+        """Visible text of the whole page"""
+        if self._text is None:
+            root = self.root
+            self._text = _lxml_text(root) if root is not None else self.soup.get_text()
+        return self._text
+    
+    @property
+    def text_lower(self):
+        if self._text_lower is None:
+            self._text_lower = self.text.lower()
+        return self._text_lower
+    
+    def hrefs(self):
+        """href of every <a> element with one, in document order"""
+        root = self.root
+        if root is not None:
+            return [a.get('href') for a in root.iter('a') if a.get('href') is not None]
+        return [a.get('href', '') for a in self.soup.find_all('a', href=True)]
+    
+    def texts_by_class(self, tags, class_pattern):
+        """Text of each element among tags whose class matches class_pattern"""
+        root = self.root
+        if root is not None:
+            return [_lxml_text(el) for el in root.iter(*tags)
+                    if class_pattern.search(el.get('class', ''))]
+        return [el.get_text() for el in self.soup.find_all(list(tags), class_=class_pattern)]
+
+
+def _non_text_blocks(html):
+    """(start, end) spans of the script, style and template blocks in raw HTML"""
+    spans = []
+    position = 0
+    while True:
+        opened = NON_TEXT_BLOCK_PATTERN.search(html, position)
+        if opened is None:
+            return spans
+        closed = NON_TEXT_BLOCK_END_PATTERNS[opened.group(1).lower()].search(html, opened.end())
+        position = closed.start() if closed else len(html)
+        spans.append((opened.start(), position))
+
+
+def _marker_outside_text(html, start, blocks):
+    """Whether the marker at start is not page text (inside a tag, comment or one of blocks)"""
+    if html.rfind('<', 0, start) > html.rfind('>', 0, start):
+        return True
+    i = bisect_right(blocks, (start, len(html))) - 1
+    return i >= 0 and start < blocks[i][1]
+
+
+def _fast_rating(html):
+    """
+    Read the rating straight from the raw HTML around the "Rated by Ditto"
+    markers, without parsing the page.
+    
+    Covers the usual "<span>4.59</span><span>Rated by Ditto</span>" markup:
+    the text in a bounded window before a marker, with tags stripped, must
+    end in a 0-5 decimal. Markers that are not page text (attributes such
+    as a meta description, comments, scripts, styles) are skipped. Like the
+    cascade, a number glued to the marker wins over one separated by
+    whitespace, and otherwise the first match in the page does. Whenever
+    the cascade could pick a different number (the winning marker is in
+    <head>, e.g. the title, or its number may lie beyond the window), this
+    returns None so the caller falls back to the full-text cascade.
+    """
+    head = HEAD_END_PATTERN.search(html)
+    head_end = head.start() if head else 0
+    spaced = None  # (rating, in <head>) of the first marker with a spaced number
+    blocks = None  # found on the first marker
+    for marker in RATED_BY_DITTO_MARKER.finditer(html):
+        start = marker.start()
+        if blocks is None:
+            blocks = _non_text_blocks(html)
+        if _marker_outside_text(html, start, blocks):
+            continue
+        
+        window_start = max(0, start - FAST_RATING_WINDOW)
+        window = html[window_start:start]
+        if window_start and '>' in window:
+            # The window may begin inside a tag
+            window = window[window.index('>') + 1:]
+        text = unescape(TAG_PATTERN.sub('', window))
+        if window_start and not text.strip():
+            # Only markup in the window: the text before the marker is further back
+            return None
+        match = FAST_RATING_PATTERN.search(text)
+        if match is None:
+            continue
+        rating = float(match.group(1))
+        if not 0 <= rating <= 5:
+            continue
+        
+        in_head = start < head_end
+        if match.end(1) == len(text):
+            # Glued number: the cascade's first choice, in document order
+            return None if in_head else rating
+        if spaced is None:
+            spaced = (rating, in_head)
+    
+    if spaced is None or spaced[1]:
+        return None
+    return spaced[0]
+
+
 class DittoInsuranceScraper:
     """
     Main scraper class for extracting insurance plan data from Ditto website.
@@ -60,23 +368,60 @@ class DittoInsuranceScraper:
     - Fetching provider and plan pages
     - Extracting plan links from provider pages
     - Extracting ratings from plan pages
-    - Storing and exporting data to CSV
+    - Streaming records into a sink (see record_sinks.py) and exporting
+      them to CSV
     """
-    def __init__(self, delay=1):
+    def __init__(self, delay=1, workers=1, rate=None, base_url=BASE_URL, cache_dir=None,
+                 max_rate=None, retries=3, retry_budget=50, sink=None):
         """
         Initialize the scraper.
         
         Args:
             delay (float): Delay between HTTP requests in seconds (default: 1)
+            workers (int): Number of concurrent fetch threads (default: 1)
+            rate (float): Initial requests per second per host; defaults to 1/delay
+            base_url (str): Root of the health-insurance section to scrape
+            cache_dir (str): Directory for the persistent page cache (None: no cache)
+            max_rate (float): Ceiling for the adaptive per-host rate (default: 4x rate)
+            retries (int): Retries per page for transient errors (5xx, 429, timeouts)
+            retry_budget (int): Retries allowed across the whole run
+            sink (RecordSink): Where scraped records go (default: in memory);
+                               providers it has already completed are skipped
         """
         self.delay = delay
+        self.base_url = base_url
+        self.workers = max(1, workers)
+        if rate is None and delay > 0:
+            rate = 1.0 / delay
+        self.rate_limiter = AdaptiveRateLimiter(rate, max_rate=max_rate)
+        self.retry_policy = RetryPolicy(max_retries=retries, max_budget=retry_budget)
         self.session = requests.Session()
         self.session.headers.update(HEADERS)
-        self.data = []  # Store scraped plan data
+        # One pooled keep-alive connection per worker thread
+        adapter = HTTPAdapter(pool_maxsize=max(10, self.workers))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.sink = sink if sink is not None else MemorySink()
+        self.page_cache = PageCache(cache_dir, EXTRACTOR_VERSION) if cache_dir else None
+        # Pages unchanged since the last run (304 or same content digest);
+        # their cached extraction results are reused
+        self._unchanged_urls = set()
+        # How each rating was found (fast_path, ditto_text, ..., not_found)
+        self.rating_strategy_counts = Counter()
+        self._stats_lock = threading.Lock()
         
+    @property
+    def data(self):
+        """Scraped records, read back from the sink"""
+        return list(self.sink)
+    
     def get_page(self, url, return_status=False):
         """
-        Fetch a web page with error handling and rate limiting.
+        Fetch a web page with error handling, adaptive rate limiting and retries.
+        
+        Transient failures (connection errors, timeouts, 429 and 5xx) are
+        retried with jittered exponential backoff, honouring Retry-After,
+        within the per-page and per-run limits of self.retry_policy.
         
         Args:
             url (str): URL to fetch
@@ -86,17 +431,77 @@ class DittoInsuranceScraper:
             str or tuple: HTML content, or (html, status_code) if return_status=True
                           Returns None on error
         """
-        try:
-            time.sleep(self.delay)
-            response = self.session.get(url, timeout=30)
-            if return_status:
-                return response.text, response.status_code
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            if return_status:
-                return None, getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None
+        attempt = 0
+        while True:
+            attempt += 1
+            self.rate_limiter.wait(url)
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, timeout=30, headers=self._conditional_headers(url))
+            except requests.RequestException:
+                response = None
+            status_code = response.status_code if response is not None else None
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+            self.rate_limiter.record(url, status_code, time.monotonic() - started, retry_after)
+            
+            backoff = self.retry_policy.next_delay(attempt, status_code, retry_after)
+            if backoff is None:
+                break
+            time.sleep(backoff)
+        
+        if response is None:
+            return (None, None) if return_status else None
+        html, status_code = self._cache_response(url, status_code, response.text, response.headers)
+        if return_status:
+            return html, status_code
+        if status_code >= 400:
             return None
+        return html
+    
+    def _conditional_headers(self, url):
+        """Validators of the cached copy of url, if any"""
+        if self.page_cache is None:
+            return None
+        return self.page_cache.conditional_headers(url)
+    
+    def _cache_response(self, url, status_code, text, headers):
+        """
+        Feed a response through the page cache.
+        
+        A 304 is answered from the cached body and marks the page unchanged.
+        A 200 replaces the cached copy, and also marks the page unchanged if
+        its content digest matches the copy cached by the previous run.
+        
+        Returns:
+            tuple: (html, status_code) to hand to the caller
+        """
+        if self.page_cache is None:
+            return text, status_code
+        if status_code == 304:
+            body = self.page_cache.not_modified(url)
+            if body is not None:
+                self._unchanged_urls.add(url)
+            return body, status_code
+        if status_code == 200:
+            if self.page_cache.store(url, text, headers.get('ETag'), headers.get('Last-Modified')):
+                self._unchanged_urls.add(url)
+        return text, status_code
+    
+    def _extract(self, url, key, extractor):
+        """
+        Run extractor() for the page at url, or reuse the result cached for
+        it when the page is unchanged since the previous run.
+        """
+        if self.page_cache is None:
+            return extractor()
+        if url in self._unchanged_urls:
+            found, value = self.page_cache.extracted(url, key)
+            if found:
+                self.page_cache.count('reused')
+                return value
+        value = extractor()
+        self.page_cache.store_extracted(url, key, value)
+        return value
     
     def extract_plan_links(self, html, provider_url):
         """
@@ -105,46 +510,63 @@ class DittoInsuranceScraper:
         Filters out non-plan pages like reviews, FAQs, etc.
         
         Args:
-            html (str): HTML content of the provider page
+            html (str or ParsedPage): Provider page HTML, or the already parsed page
             provider_url (str): Base URL of the provider
             
         Returns:
             list: Sorted list of unique plan URLs
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        plan_links = []
+        page = ParsedPage.of(html)
+        plan_links = set()
         provider_name = urlparse(provider_url).path.strip('/').split('/')[-1]
-        
-        # Pages to exclude (not actual insurance plans)
-        exclude_pages = {'reviews', 'review', 'faq', 'faqs', 'about', 'contact', 'terms', 
-                        'privacy', 'claims', 'claim', 'renewal', 'compare', 'comparison'}
+        # Match pattern: /health-insurance/{provider}/{plan}/
+        plan_pattern = _plan_link_pattern(provider_name)
         
         # Find all links
-        links = soup.find_all('a', href=True)
-        
-        for link in links:
-            href = link.get('href', '')
+        for href in page.hrefs():
             # Skip anchor links, javascript, etc.
             if href.startswith('#') or href.startswith('javascript:') or 'mailto:' in href:
                 continue
             
-            # Match pattern: /health-insurance/{provider}/{plan}/
-            pattern = rf'/health-insurance/{re.escape(provider_name)}/([^/#\?]+)/?$'
-            match = re.search(pattern, href)
+            match = plan_pattern.search(href)
             if match:
                 plan = match.group(1).lower()
                 # Filter out common non-plan patterns and excluded pages
                 if (plan and len(plan) > 2 and plan not in ['', 'health-insurance'] 
-                    and plan not in exclude_pages):
-                    full_url = urljoin(BASE_URL, href.split('#')[0].split('?')[0])
-                    if full_url not in plan_links and '#' not in full_url:
-                        plan_links.append(full_url)
+                    and plan not in EXCLUDED_PAGES):
+                    full_url = urljoin(self.base_url, href.split('#')[0].split('?')[0])
+                    if '#' not in full_url:
+                        plan_links.add(full_url)
         
-        return sorted(list(set(plan_links)))
+        return sorted(plan_links)
     
     def extract_rating(self, html):
         """
-        Extract the Ditto rating from a plan page using multiple regex patterns.
+        Extract the Ditto rating from a plan page.
+        
+        Tries a targeted scan of the raw HTML around the "Rated by Ditto"
+        marker first, and only parses the page and runs the full regex
+        cascade (see _rating_cascade) when that fails. The strategy that
+        produced each result is counted in self.rating_strategy_counts.
+        
+        Args:
+            html (str or ParsedPage): Plan page HTML, or the already parsed page
+            
+        Returns:
+            float or None: Rating value (0-5) or None if not found
+        """
+        page = ParsedPage.of(html)
+        rating = _fast_rating(page.html)
+        strategy = 'fast_path'
+        if rating is None:
+            rating, strategy = self._rating_cascade(page)
+        with self._stats_lock:
+            self.rating_strategy_counts[strategy] += 1
+        return rating
+    
+    def _rating_cascade(self, page):
+        """
+        Extract the Ditto rating from the page text using multiple regex patterns.
         
         Handles various formats like:
         - "4.59Rated by Ditto Insurance"
@@ -153,33 +575,22 @@ class DittoInsuranceScraper:
         - Edge cases where plan names end with numbers
         
         Args:
-            html (str): HTML content of the plan page
+            page (ParsedPage): Plan page
             
         Returns:
-            float or None: Rating value (0-5) or None if not found
+            tuple: (rating or None, name of the pattern group that matched)
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        page_text = soup.get_text()
+        page_text = page.text
         
         # Pattern 1: Look for number directly before "Rated by Ditto" (most common pattern)
         # Example: "4.59Rated by Ditto Insurance" or "3.44Rated by Ditto"
-        # Also handle cases like "3603.76Rated" where plan name ends with number
-        ditto_rating_patterns = [
-            r'(\d+\.\d{1,2})Rated\s+by\s+Ditto',  # Number directly before "Rated by Ditto"
-            r'(\d+\.\d{1,2})\s+Rated\s+by\s+Ditto',  # Number with space before
-            r'rated\s+by\s+ditto[:\s]+(\d+\.?\d*)',  # "Rated by Ditto: 3.44"
-            r'(\d+\.?\d*)\s+rated\s+by\s+ditto',  # "3.44 rated by ditto"
-            r'ditto[:\s]+(\d+\.?\d*)',  # "Ditto: 3.44"
-            r'(\d+\.?\d*)\s+ditto',  # "3.44 ditto"
-        ]
-        
-        for pattern in ditto_rating_patterns:
-            matches = re.findall(pattern, page_text, re.I)
-            for match in matches:
+        for pattern in DITTO_RATING_PATTERNS:
+            # finditer stops at the first valid rating instead of collecting every match
+            for match in pattern.finditer(page_text):
                 try:
-                    rating = float(match)
+                    rating = float(match.group(1))
                     if 0 <= rating <= 5:
-                        return rating
+                        return rating, 'ditto_text'
                 except ValueError:
                     continue
         
@@ -188,10 +599,7 @@ class DittoInsuranceScraper:
         # Look for pattern: [any digits][decimal number between 0-5]Rated by Ditto
         # We need to find a decimal number (like 3.76) that appears right before "Rated by Ditto"
         # even if there's a number before it (like 360)
-        complex_pattern = r'(\d+)([1-5]\.\d{1,2})Rated\s+by\s+Ditto'
-        matches = re.finditer(complex_pattern, page_text, re.I)
-        for match in matches:
-            prefix_num = match.group(1)
+        for match in GLUED_RATING_PATTERN.finditer(page_text):
             rating_str = match.group(2)  # This should be like "3.76"
             try:
                 rating = float(rating_str)
@@ -201,19 +609,17 @@ class DittoInsuranceScraper:
                     end = min(len(page_text), match.end() + 50)
                     context = page_text[start:end].lower()
                     if 'ditto' in context:
-                        return rating
+                        return rating, 'glued_number'
             except ValueError:
                 continue
         
         # Also try: any number ending with a decimal rating pattern before "Rated by Ditto"
         # This handles cases like "3603.76" where we want "3.76"
-        complex_pattern2 = r'(\d*[1-5]\.\d{1,2})Rated\s+by\s+Ditto'
-        matches2 = re.finditer(complex_pattern2, page_text, re.I)
-        for match in matches2:
+        for match in GLUED_RATING_SUFFIX_PATTERN.finditer(page_text):
             full_match = match.group(1)
             # Extract the last decimal number (rating) from the match
             # If it's something like "3603.76", extract "3.76"
-            decimal_match = re.search(r'([1-5]\.\d{1,2})$', full_match)
+            decimal_match = TRAILING_RATING_PATTERN.search(full_match)
             if decimal_match:
                 try:
                     rating = float(decimal_match.group(1))
@@ -222,44 +628,37 @@ class DittoInsuranceScraper:
                         end = min(len(page_text), match.end() + 50)
                         context = page_text[start:end].lower()
                         if 'ditto' in context:
-                            return rating
+                            return rating, 'glued_number'
                 except ValueError:
                     continue
         
         # Pattern 2: Look for rating elements
-        rating_elements = soup.find_all(['div', 'span', 'p', 'h1', 'h2', 'h3'], 
-                                       class_=re.compile(r'rating|score|ditto', re.I))
-        
-        for element in rating_elements:
-            text = element.get_text()
-            matches = re.findall(r'(\d+\.?\d*)', text)
-            for match in matches:
+        for text in page.texts_by_class(RATING_ELEMENT_TAGS, RATING_CLASS_PATTERN):
+            for match in NUMBER_PATTERN.findall(text):
                 try:
                     rating = float(match)
                     if 0 <= rating <= 5:
                         element_text_lower = text.lower()
                         if 'ditto' in element_text_lower or 'rating' in element_text_lower:
-                            return rating
+                            return rating, 'rating_element'
                 except ValueError:
                     continue
         
         # Pattern 3: Look for numbers near "ditto" in the page
-        number_pattern = r'\b(\d+\.\d{1,2})\b'
-        number_matches = re.finditer(number_pattern, page_text)
-        
-        for match in number_matches:
+        page_mentions_ditto = 'ditto' in page.text_lower
+        for match in DECIMAL_PATTERN.finditer(page_text):
             try:
                 rating = float(match.group(1))
                 if 0 <= rating <= 5:
                     start = max(0, match.start() - 100)
                     end = min(len(page_text), match.end() + 100)
                     context = page_text[start:end].lower()
-                    if 'ditto' in context or ('rated' in context and 'ditto' in page_text.lower()):
-                        return rating
+                    if 'ditto' in context or ('rated' in context and page_mentions_ditto):
+                        return rating, 'nearby_number'
             except ValueError:
                 continue
         
-        return None
+        return None, 'not_found'
     
     def extract_provider_name(self, url):
         """Extract provider name from URL"""
@@ -277,163 +676,363 @@ class DittoInsuranceScraper:
             return parts[-1].replace('-', ' ').title()
         return None
     
-    def scrape(self, providers=None):
-        """Main scraping function"""
-        if providers is None:
-            providers = KNOWN_PROVIDERS
+    def provider_display_name(self, provider):
+        """Map a provider URL slug to its display name (e.g., edelweiss -> Zuno)"""
+        return PROVIDER_DISPLAY_NAMES.get(provider, provider.replace('-', ' ').title())
+    
+    def _start_provider(self, idx, total, provider):
+        """Log the start of a provider and return (provider_name, provider_url)"""
+        provider_url = urljoin(self.base_url, f"{provider}/")
+        provider_name = self.provider_display_name(provider)
         
-        print("=" * 70)
-        print("Starting Ditto Insurance Scraper...")
-        print("=" * 70)
-        print(f"Processing {len(providers)} provider(s)")
+        print(f"\n[{idx}/{total}] Processing provider: {provider_name}")
+        print(f"  URL: {provider_url}")
+        sys.stdout.flush()
+        return provider_name, provider_url
+    
+    def _listing_blocked(self, provider_html, status_code):
+        """Whether a provider listing page is missing, forbidden or a 404 page"""
+        return not provider_html or status_code == 403 or '404' in provider_html.lower()[:500]
+    
+    def _report_blocked_listing(self, provider_html):
+        if not provider_html:
+            print(f"  ❌ Failed to fetch provider page, skipping...")
+        else:
+            print(f"  ❌ Page not found (404), skipping...")
+        sys.stdout.flush()
+    
+    def _fallback_plan_urls(self, provider):
+        """Known plan page and candidate plan URLs for a provider with a blocked listing"""
+        known_plan_url = urljoin(self.base_url, f"{provider}/health-insurance-silver/")
+        candidate_urls = [urljoin(self.base_url, f"{provider}/{plan_name}/")
+                          for plan_name in FALLBACK_PLANS.get(provider, [])]
+        return known_plan_url, candidate_urls
+    
+    def _report_fallback(self, known_plan_html, discovered_plans):
+        if discovered_plans:
+            print(f"  ✓ Discovered {len(discovered_plans)} plan(s) via fallback method")
+        elif known_plan_html:
+            print(f"  ❌ Could not discover plans, skipping...")
+        else:
+            print(f"  ❌ Failed to fetch provider page, skipping...")
         sys.stdout.flush()
+    
+    def _plan_links_from_listing(self, provider_html, provider_url):
+        """
+        Extract plan links from a fetched provider listing page.
+
+        Returns:
+            list or None: Plan URLs, or None if the page is a "not found" page
+        """
+        # Check for 404
+        if '404' in provider_html.lower()[:500] or 'not found' in provider_html.lower()[:500]:
+            print(f"  ❌ Page not found (404), skipping...")
+            sys.stdout.flush()
+            return None
         
-        total_plans = 0
+        print(f"  ✓ Provider page fetched")
+        plan_links = self._extract(provider_url, 'plan_links',
+                                   lambda: self.extract_plan_links(provider_html, provider_url))
+        print(f"  ✓ Found {len(plan_links)} plan(s)")
+        sys.stdout.flush()
+        
+        if not plan_links:
+            print(f"  ⚠ No plan links found")
+        return plan_links
+    
+    def _fetch_plan_links(self, idx, total, provider):
+        """
+        Fetch a provider's listing page and extract its plan links.
+
+        Returns:
+            tuple or None: (provider_name, plan_links), or None if the
+                           provider should be skipped
+        """
+        provider_name, provider_url = self._start_provider(idx, total, provider)
+        provider_html, status_code = self.get_page(provider_url, return_status=True)
+        
+        if not self._listing_blocked(provider_html, status_code):
+            plan_links = self._plan_links_from_listing(provider_html, provider_url)
+            return (provider_name, plan_links) if plan_links is not None else None
+        
+        # Special handling for providers with blocked listing pages (like edelweiss)
+        # Try to discover plans from a known working plan page
+        if provider not in FALLBACK_PLANS:
+            self._report_blocked_listing(provider_html)
+            return None
         
-        for idx, provider in enumerate(providers, 1):
-            provider_url = urljoin(BASE_URL, f"{provider}/")
-            # Map URL path to display name (e.g., edelweiss -> Zuno, max-bupa -> Niva Bupa)
-            provider_name_map = {
-                'edelweiss': 'Zuno',
-                'max-bupa': 'Niva Bupa',
-                'new-india-assurance': 'New India Assurance',
-                'sbi': 'SBI',
-                'reliance': 'Reliance',
-                'hdfc-ergo': 'HDFC Ergo',
-                'tata-aig': 'TATA AIG',
-            }
-            provider_name = provider_name_map.get(provider, provider.replace('-', ' ').title())
+        print(f"  ⚠ Provider listing page blocked, trying to discover plans from known plan page...")
+        known_plan_url, candidate_urls = self._fallback_plan_urls(provider)
+        known_plan_html = self.get_page(known_plan_url)
+        discovered_plans = []
+        if known_plan_html:
+            for test_url in candidate_urls:
+                test_html = self.get_page(test_url)
+                if test_html and '404' not in test_html.lower()[:500]:
+                    discovered_plans.append(test_url)
+        self._report_fallback(known_plan_html, discovered_plans)
+        return (provider_name, discovered_plans) if discovered_plans else None
+    
+    def _plan_record(self, provider_name, plan_name, plan_url, plan_html):
+        """Extract the rating from a fetched plan page and build its data record"""
+        print(f"      ✓ Plan page fetched")
+        rating = self._extract(plan_url, 'rating', lambda: self.extract_rating(plan_html))
+        if rating:
+            print(f"      ✓ Rating found: {rating}")
+        else:
+            print(f"      ⚠ Rating: Not found")
+        
+        sys.stdout.flush()
+        
+        return {
+            'Company': provider_name,
+            'Policy Name': plan_name,
+            'Rating By Ditto': rating,
+            'Plan URL': plan_url,
+            'Last Updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+    
+    def _start_plan(self, plan_idx, total, plan_name, plan_url):
+        print(f"    [{plan_idx}/{total}] Processing plan: {plan_name}")
+        print(f"      URL: {plan_url}")
+        sys.stdout.flush()
+    
+    def _report_failed_plan(self):
+        print(f"      ❌ Failed to fetch plan page, skipping...")
+        sys.stdout.flush()
+    
+    def _scrape_plan(self, provider_name, plan_idx, total, plan_name, plan_url):
+        """
+        Fetch a plan page and build its data record.
+
+        Returns:
+            dict or None: Record for the sink, or None if the page failed
+        """
+        self._start_plan(plan_idx, total, plan_name, plan_url)
+        plan_html = self.get_page(plan_url)
+        if not plan_html:
+            self._report_failed_plan()
+            return None
+        return self._plan_record(provider_name, plan_name, plan_url, plan_html)
+    
+    def plan_jobs(self, provider_name, plan_links):
+        """
+        Yield (provider_name, plan_idx, total, plan_name, plan_url) for each
+        plan link worth fetching, skipping non-plan pages.
+        """
+        for plan_idx, plan_url in enumerate(plan_links, 1):
+            plan_name = self.extract_plan_name(plan_url) or urlparse(plan_url).path.split('/')[-1]
             
-            print(f"\n[{idx}/{len(providers)}] Processing provider: {provider_name}")
-            print(f"  URL: {provider_url}")
-            sys.stdout.flush()
+            # Skip non-plan pages (Reviews, FAQ, etc.)
+            plan_name_lower = plan_name.lower()
+            exclude_plan_names = {'reviews', 'review', 'faq', 'faqs', 'about', 'contact', 
+                                'terms', 'privacy', 'claims', 'claim', 'renewal', 
+                                'compare', 'comparison'}
+            if plan_name_lower in exclude_plan_names:
+                print(f"    [{plan_idx}/{len(plan_links)}] Skipping non-plan page: {plan_name}")
+                sys.stdout.flush()
+                continue
             
-            provider_html, status_code = self.get_page(provider_url, return_status=True)
+            yield provider_name, plan_idx, len(plan_links), plan_name, plan_url
+    
+    def _run(self, pool, fn, *args):
+        """Run fn now (sequential mode) or schedule it on the worker pool."""
+        if pool is None:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return pool.submit(fn, *args)
+    
+    def scrape(self, providers=None):
+        """
+        Main scraping function.
+
+        With workers > 1, provider and plan pages are fetched concurrently on
+        a thread pool (still subject to the per-host rate limit). Records are
+        collected in the same order as a sequential run, so the output is
+        identical either way.
+        """
+        if providers is None:
+            providers = KNOWN_PROVIDERS
+        
+        self._print_start(providers)
+        providers = self._pending_providers(providers)
+        total_plans = 0
+        
+        pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            listings = (self._run(pool, self._fetch_plan_links, idx, len(providers), provider)
+                        for idx, provider in enumerate(providers, 1))
+            if pool is not None:
+                # Submit every provider page up front
+                listings = list(listings)
             
-            # Special handling for providers with blocked listing pages (like edelweiss)
-            # Try to discover plans from a known working plan page
-            if not provider_html or status_code == 403 or ('404' in provider_html.lower()[:500] if provider_html else False):
-                if provider == 'edelweiss':
-                    print(f"  ⚠ Provider listing page blocked, trying to discover plans from known plan page...")
-                    # Try to get plans from a known working plan page
-                    known_plan_url = urljoin(BASE_URL, f"{provider}/health-insurance-silver/")
-                    known_plan_html = self.get_page(known_plan_url)
-                    if known_plan_html:
-                        # Try to extract other plan links from this page
-                        soup = BeautifulSoup(known_plan_html, 'html.parser')
-                        # Look for navigation or links to other plans
-                        all_links = soup.find_all('a', href=True)
-                        discovered_plans = []
-                        # Common edelweiss plan patterns
-                        common_plans = ['health-insurance-silver', 'health-insurance-gold', 'health-insurance-platinum']
-                        for plan_name in common_plans:
-                            test_url = urljoin(BASE_URL, f"{provider}/{plan_name}/")
-                            test_html = self.get_page(test_url)
-                            if test_html and '404' not in test_html.lower()[:500]:
-                                discovered_plans.append(test_url)
-                        if discovered_plans:
-                            plan_links = discovered_plans
-                            print(f"  ✓ Discovered {len(plan_links)} plan(s) via fallback method")
-                            total_plans += len(plan_links)
-                        else:
-                            print(f"  ❌ Could not discover plans, skipping...")
-                            sys.stdout.flush()
-                            continue
-                    else:
-                        print(f"  ❌ Failed to fetch provider page, skipping...")
-                        sys.stdout.flush()
-                        continue
-                else:
-                    if not provider_html:
-                        print(f"  ❌ Failed to fetch provider page, skipping...")
-                    else:
-                        print(f"  ❌ Page not found (404), skipping...")
-                    sys.stdout.flush()
-                    continue
-            else:
-                # Check for 404
-                if '404' in provider_html.lower()[:500] or 'not found' in provider_html.lower()[:500]:
-                    print(f"  ❌ Page not found (404), skipping...")
-                    sys.stdout.flush()
-                    continue
-                
-                print(f"  ✓ Provider page fetched")
-                plan_links = self.extract_plan_links(provider_html, provider_url)
-                print(f"  ✓ Found {len(plan_links)} plan(s)")
-                total_plans += len(plan_links)
-                sys.stdout.flush()
-                
-                if not plan_links:
-                    print(f"  ⚠ No plan links found")
-                    continue
+            # (provider, plan futures) not yet written to the sink, in provider order
+            pending = deque()
+            for provider, listing in zip(providers, listings):
+                result = listing.result()
+                plan_futures = []
+                if result is not None:
+                    provider_name, plan_links = result
+                    total_plans += len(plan_links)
+                    
+                    # Process each plan
+                    for job in self.plan_jobs(provider_name, plan_links):
+                        plan_futures.append(self._run(pool, self._scrape_plan, *job))
+                pending.append((provider, plan_futures))
+                self._commit_providers(pending, wait=False)
             
-            # Process each plan
-            for plan_idx, plan_url in enumerate(plan_links, 1):
-                plan_name = self.extract_plan_name(plan_url) or urlparse(plan_url).path.split('/')[-1]
-                
-                # Skip non-plan pages (Reviews, FAQ, etc.)
-                plan_name_lower = plan_name.lower()
-                exclude_plan_names = {'reviews', 'review', 'faq', 'faqs', 'about', 'contact', 
-                                    'terms', 'privacy', 'claims', 'claim', 'renewal', 
-                                    'compare', 'comparison'}
-                if plan_name_lower in exclude_plan_names:
-                    print(f"    [{plan_idx}/{len(plan_links)}] Skipping non-plan page: {plan_name}")
-                    sys.stdout.flush()
-                    continue
-                
-                print(f"    [{plan_idx}/{len(plan_links)}] Processing plan: {plan_name}")
-                print(f"      URL: {plan_url}")
-                sys.stdout.flush()
-                
-                plan_html = self.get_page(plan_url)
-                if not plan_html:
-                    print(f"      ❌ Failed to fetch plan page, skipping...")
-                    sys.stdout.flush()
-                    continue
-                
-                print(f"      ✓ Plan page fetched")
-                rating = self.extract_rating(plan_html)
-                if rating:
-                    print(f"      ✓ Rating found: {rating}")
-                else:
-                    print(f"      ⚠ Rating: Not found")
-                
-                sys.stdout.flush()
-                
-                self.data.append({
-                    'Company': provider_name,
-                    'Policy Name': plan_name,
-                    'Rating By Ditto': rating,
-                    'Plan URL': plan_url,
-                    'Last Updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                })
+            self._commit_providers(pending, wait=True)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
         
+        self._print_summary(providers, total_plans)
+    
+    def _pending_providers(self, providers):
+        """Providers still to scrape (those the sink has not completed yet)"""
+        completed = self.sink.completed_providers()
+        if not completed:
+            return providers
+        remaining = [provider for provider in providers if provider not in completed]
+        print(f"Resuming: {len(providers) - len(remaining)} provider(s) already completed, "
+              f"{len(self.sink)} record(s) kept")
+        sys.stdout.flush()
+        return remaining
+    
+    def commit_provider(self, provider, records):
+        """Write a provider's records to the sink and checkpoint it"""
+        for record in records:
+            if record is not None:
+                self.sink.write(record)
+        self.sink.checkpoint(provider)
+    
+    def _commit_providers(self, pending, wait):
+        """
+        Commit finished providers from the front of pending, in provider
+        order so the sink matches a sequential run. With wait=True, block
+        until every provider is committed.
+        """
+        while pending and (wait or all(future.done() for future in pending[0][1])):
+            provider, plan_futures = pending.popleft()
+            self.commit_provider(provider, [future.result() for future in plan_futures])
+    
+    def _print_start(self, providers):
+        print("=" * 70)
+        print("Starting Ditto Insurance Scraper...")
+        print("=" * 70)
+        print(f"Processing {len(providers)} provider(s)")
+        if self.workers > 1:
+            print(f"Using {self.workers} workers")
+        sys.stdout.flush()
+    
+    def _print_summary(self, providers, total_plans):
         print("\n" + "=" * 70)
         print(f"✓ Scraping complete!")
         print(f"  - Processed {len(providers)} provider(s)")
         print(f"  - Processed {total_plans} plan(s)")
-        print(f"  - Collected {len(self.data)} record(s)")
+        print(f"  - Collected {len(self.sink)} record(s)")
+        if self.rating_strategy_counts:
+            strategies = ', '.join(f"{name}: {count}" for name, count in self.rating_strategy_counts.most_common())
+            print(f"  - Rating strategies: {strategies}")
+        if self.page_cache is not None:
+            print(f"  - Page cache: {self.page_cache.summary()}")
+        if self.retry_policy.stats or self.rate_limiter.stats:
+            print(f"  - Retries: {self.retry_policy.summary()}; "
+                  f"{self.rate_limiter.stats['throttled']} throttled response(s)")
         print("=" * 70)
         sys.stdout.flush()
     
+    @staticmethod
+    def output_sort_key(record):
+        """Company (alphabetical), then Rating By Ditto (descending, missing ratings last)"""
+        rating = record['Rating By Ditto']
+        missing = rating is None or rating != rating
+        return record['Company'], missing, 0.0 if missing else -rating
+    
     def save_to_csv(self, filename='ditto_insurance_data.csv'):
-        """Save data to CSV file"""
-        if not self.data:
+        """
+        Save the sink's records to a CSV file, sorted by output_sort_key.
+        
+        The sort is an external merge over the sink, so memory use does not
+        grow with the number of records. The file is written under a
+        temporary name and renamed into place, so readers never see a
+        partial file.
+        
+        Returns:
+            int or None: Number of rows written, or None if there was no data
+        """
+        if not len(self.sink):
             print("No data to save")
             return None
         
-        df = pd.DataFrame(self.data)
-        # Sort by Company (alphabetical) and Rating By Ditto (descending)
-        # Handle NaN ratings by putting them at the end
-        df['Rating_Sort'] = df['Rating By Ditto'].fillna(-1)  # Use -1 for NaN to sort them last
-        df = df.sort_values(['Company', 'Rating_Sort'], ascending=[True, False])
-        df = df.drop('Rating_Sort', axis=1)  # Remove temporary sort column
-        df = df.reset_index(drop=True)
-        
-        df.to_csv(filename, index=False)
+        tmp_filename = f"{filename}.tmp"
+        rows = write_csv(external_sort(self.sink, self.output_sort_key), tmp_filename)
+        os.replace(tmp_filename, filename)
         print(f"Data saved to {filename}")
-        return df
+        return rows
     
+    def save_to_columnar(self, csv_filename, filename='ditto_insurance_data.arrow'):
+        """
+        Convert the sorted CSV written by save_to_csv to a typed Arrow IPC /
+        Feather file.
+
+        The CSV is streamed through in record batches of COLUMNAR_BLOCK_BYTES,
+        so memory use does not grow with the number of records; a first pass
+        collects the companies, as every batch must share one dictionary.
+        The file is written uncompressed so readers can memory-map it, and
+        swapped into place with a rename: readers that still have the
+        previous version mapped are never exposed to a half-written file.
+
+        Returns:
+            int or None: Number of rows written, or None without pyarrow
+        """
+        if pa is None:
+            print("pyarrow not installed, skipping columnar output")
+            return None
+
+        read_options = pa_csv.ReadOptions(block_size=COLUMNAR_BLOCK_BYTES)
+        companies = set()
+        for batch in pa_csv.open_csv(csv_filename, read_options=read_options, convert_options=pa_csv.ConvertOptions(
+                include_columns=['Company'], column_types={'Company': pa.string()})):
+            companies.update(pc.unique(batch.column('Company')).to_pylist())
+        dictionary = pa.array(sorted(company for company in companies if company is not None), pa.string())
+
+        convert_options = pa_csv.ConvertOptions(
+            column_types={field.name: field.type for field in COLUMNAR_SCHEMA
+                          if not pa.types.is_dictionary(field.type)},
+            timestamp_parsers=['%Y-%m-%d %H:%M:%S'],
+        )
+        rows = 0
+        tmp_filename = f"{filename}.tmp"
+        with pa.OSFile(tmp_filename, 'wb') as sink, ipc.new_file(sink, COLUMNAR_SCHEMA) as writer:
+            for batch in pa_csv.open_csv(csv_filename, read_options=read_options, convert_options=convert_options):
+                company = pa.DictionaryArray.from_arrays(
+                    pc.index_in(batch.column('Company'), value_set=dictionary).cast(pa.int32()), dictionary
+                )
+                columns = [company if field.name == 'Company' else batch.column(field.name)
+                           for field in COLUMNAR_SCHEMA]
+                writer.write_batch(pa.record_batch(columns, schema=COLUMNAR_SCHEMA))
+                rows += batch.num_rows
+        os.replace(tmp_filename, filename)
+        print(f"Columnar data saved to {filename}")
+        return rows
+
+    def save_to_history(self, filename='ditto_insurance_data_history.sqlite'):
+        """Append this run's ratings to the SQLite rating history"""
+        if not len(self.sink):
+            return 0
+        history = RatingHistory(filename)
+        try:
+            written = history.append(self.sink)
+        finally:
+            history.close()
+        print(f"Rating history updated in {filename} ({written} new or changed rating(s))")
+        return written
+
     def filter_data(self, company=None, min_rating=None, max_rating=None):
         """Filter the scraped data"""
         df = pd.DataFrame(self.data)
@@ -454,6 +1053,18 @@ def main():
     parser = argparse.ArgumentParser(description='Scrape Ditto Insurance data')
     parser.add_argument('--output', '-o', default='ditto_insurance_data.csv',
                        help='Output CSV filename')
+    parser.add_argument('--columnar',
+                       help='Output Arrow/Feather filename (default: output with .arrow suffix)')
+    parser.add_argument('--manifest',
+                       help='Dataset manifest to publish (default: output with .manifest.json suffix)')
+    parser.add_argument('--history',
+                       help='SQLite rating history to append to (default: output with _history.sqlite suffix)')
+    parser.add_argument('--sink', choices=sorted(SINKS), default='ndjson',
+                       help='Spool format records are streamed into while scraping')
+    parser.add_argument('--spool',
+                       help='Spool path (default: output with .spool.<sink> suffix)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted run from its spool checkpoint')
     parser.add_argument('--delay', '-d', type=float, default=1.0,
                        help='Delay between requests in seconds')
     parser.add_argument('--company', '-c', type=str,
@@ -464,15 +1075,52 @@ def main():
                        help='Filter by maximum rating')
     parser.add_argument('--providers', nargs='+',
                        help='Specific providers to scrape (space-separated)')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='Number of concurrent fetch workers')
+    parser.add_argument('--rate', type=float,
+                       help='Initial requests per second per host (default: 1/delay)')
+    parser.add_argument('--max-rate', type=float,
+                       help='Ceiling for the adaptive per-host rate (default: 4x rate)')
+    parser.add_argument('--retries', type=int, default=3,
+                       help='Retries per page for transient errors (5xx, 429, timeouts)')
+    parser.add_argument('--retry-budget', type=int, default=50,
+                       help='Retries allowed across the whole run')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                       help='Fetch engine: thread pool or asyncio/aiohttp')
+    parser.add_argument('--base-url', default=BASE_URL,
+                       help='Root URL to scrape (e.g. a local stub server)')
+    parser.add_argument('--cache-dir',
+                       help='Persistent page cache directory (enables conditional requests)')
     
     args = parser.parse_args()
     
-    scraper = DittoInsuranceScraper(delay=args.delay)
+    if args.engine == 'async':
+        from async_scraper import AsyncDittoInsuranceScraper as scraper_class
+    else:
+        scraper_class = DittoInsuranceScraper
+    spool = args.spool or f"{os.path.splitext(args.output)[0]}.spool.{args.sink}"
+    sink = SINKS[args.sink](spool, resume=args.resume)
+    scraper = scraper_class(delay=args.delay, workers=args.workers, rate=args.rate,
+                            base_url=args.base_url, cache_dir=args.cache_dir, max_rate=args.max_rate,
+                            retries=args.retries, retry_budget=args.retry_budget, sink=sink)
     providers = args.providers if args.providers else None
     scraper.scrape(providers=providers)
     
-    if scraper.data:
-        df = scraper.save_to_csv(args.output)
+    if len(scraper.sink):
+        rows = scraper.save_to_csv(args.output)
+        # The output exists now; the next run starts a fresh spool
+        sink.finish()
+        columnar = args.columnar or os.path.splitext(args.output)[0] + '.arrow'
+        if scraper.save_to_columnar(args.output, columnar) is None:
+            columnar = None
+        publish_dataset(
+            args.output,
+            rows=rows,
+            schema=CSV_SCHEMA,
+            columnar_path=columnar,
+            manifest_path=args.manifest or manifest_path_for(args.output),
+        )
+        scraper.save_to_history(args.history or os.path.splitext(args.output)[0] + '_history.sqlite')
         
         # Apply filters if provided
         if args.company or args.min_rating is not None or args.max_rating is not None:
@@ -488,8 +1136,11 @@ def main():
                 filtered_df.to_csv(args.output.replace('.csv', '_filtered.csv'), index=False)
                 print(f"\nFiltered data saved to {args.output.replace('.csv', '_filtered.csv')}")
         else:
-            print(f"\nAll data ({len(df)} records):")
-            print(df.to_string(index=False))
+            print(f"\nAll data ({rows} records):")
+            # A chunk at a time, so the whole dataset is never loaded
+            for start, chunk in enumerate(pd.read_csv(args.output, chunksize=OUTPUT_PRINT_ROWS)):
+                print(chunk.to_string(index=False, header=start == 0))
+    sink.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,84 @@
+"""
+Regression tests for the raw-HTML rating fast path (scrape_ditto._fast_rating).
+
+Whenever the fast path returns a rating it must be the one the full-text
+cascade (DittoInsuranceScraper._rating_cascade) picks for the same page.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrape_ditto import DittoInsuranceScraper, ParsedPage, _fast_rating  # noqa: E402
+
+GLUED_BODY = '<div><span>4.59</span><span>Rated by Ditto Insurance</span></div>'
+
+
+def page(head='', body=GLUED_BODY):
+    return (f'<html><head><title>Plan</title>{head}</head>'
+            f'<body><h1>Care Supreme</h1>{body}</body></html>')
+
+
+def cascade_rating(html):
+    return DittoInsuranceScraper()._rating_cascade(ParsedPage.of(html))[0]
+
+
+@pytest.mark.parametrize('html', [
+    page('<meta name="description" content="4.20 Rated by Ditto">'),
+    page('<meta property="og:title" content="Care Supreme 3.9 Rated by Ditto">'),
+    page('<meta name="description" content="4.20Rated by Ditto">'),
+    page().replace('<title>Plan</title>', '<title>Care Supreme 2.50 Rated by Ditto</title>'),
+    page(body='<!-- 1.25 Rated by Ditto -->' + GLUED_BODY),
+    page(body='<script>var s = "1.25Rated by Ditto";</script>' + GLUED_BODY),
+    page(body='<SCRIPT>var s = "1.11Rated by Ditto";</SCRIPT>' + GLUED_BODY),
+    page(body='<Style>/* 1.11 Rated by Ditto */</Style>' + GLUED_BODY),
+    page(body='<TEMPLATE><b>1.11</b>Rated by Ditto</TEMPLATE>' + GLUED_BODY),
+    page(body='<a title="1.25Rated by Ditto" href="#">link</a>' + GLUED_BODY),
+])
+def test_markers_outside_page_text_are_skipped(html):
+    assert _fast_rating(html) == 4.59
+    assert cascade_rating(html) == 4.59
+
+
+def test_glued_number_wins_over_earlier_spaced_one():
+    html = page(body='<p>4.1 Rated by Ditto</p><p><span>3.55</span>Rated by Ditto</p>')
+    assert cascade_rating(html) == 3.55
+    assert _fast_rating(html) == 3.55
+
+
+def test_first_spaced_number_without_glued_ones():
+    html = page(body='<p>4.1 Rated by Ditto</p><p>3.55 Rated by Ditto</p>')
+    assert _fast_rating(html) == cascade_rating(html) == 4.1
+
+
+def test_later_marker_used_when_first_has_no_number():
+    html = page(body='<p>Rated by Ditto experts</p>' + GLUED_BODY)
+    assert _fast_rating(html) == cascade_rating(html) == 4.59
+
+
+@pytest.mark.parametrize('html', [
+    # The cascade takes a rating from the title before one from the body
+    page(body='<p>3.55 Rated by Ditto</p>').replace(
+        '<title>Plan</title>', '<title>2.50 Rated by Ditto</title>'),
+    page(body='<p>3.55 Rated by Ditto</p>').replace(
+        '<title>Plan</title>', '<title>2.50Rated by Ditto</title>'),
+    # Number further back than the fast path looks
+    page(body='<span>4.59</span>' + '<i></i>' * 100 + '<span>Rated by Ditto</span>'),
+])
+def test_defers_to_cascade(html):
+    assert _fast_rating(html) is None
+
+
+@pytest.mark.parametrize('body', [
+    GLUED_BODY,
+    '<p>Rating 3.44 Rated by Ditto</p>',
+    '<p>Health Shield 3603.76Rated by Ditto</p><p>2.9 Rated by Ditto</p>',
+    '<span>5.00</span>\n<span>Rated&nbsp;by Ditto</span>',
+])
+def test_matches_cascade(body):
+    html = page(body=body)
+    rating = _fast_rating(html)
+    assert rating is None or rating == cascade_rating(html)
@@ -0,0 +1,73 @@
+"""
+build_filtered_statistics (served for filtered /api/statistics requests)
+must give the payload build_statistics gives for the matching plans alone.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_service'))
+
+from aggregates import (  # noqa: E402
+    OTHER_BUCKET, build_company_aggregates, build_filtered_statistics, build_statistics,
+)
+from indexes import build_index  # noqa: E402
+from serialization import dumps_object  # noqa: E402
+
+
+def fuzzed_frame(rng, rows):
+    """Few companies and coarse ratings, so counts and averages tie often"""
+    companies = np.array([f"Company {name}" for name in "EBDACFHG"], dtype=object)
+    ratings = rng.choice([1.5, 2.25, 3.0, 3.33, 3.34, 4.0, 4.31, 4.32, 4.33, 5.0], rows)
+    ratings[rng.random(rows) < 0.15] = np.nan
+    return pd.DataFrame({
+        'Company': companies[rng.integers(0, len(companies), rows)],
+        'Policy Name': [f"Plan {i}" for i in range(rows)],
+        'Rating By Ditto': ratings,
+        'Plan URL': [f"https://example.com/plan-{i}/" for i in range(rows)],
+        'Last Updated': '2024-01-15 10:30:00',
+    })
+
+
+def payload(statistics):
+    # Compared as encoded: key order matters, the dashboard lists companies in payload order
+    return dumps_object(statistics)
+
+
+def filtered_payload(df, companies, buckets):
+    index = build_index(df)
+    aggregates = build_company_aggregates(
+        index.company_codes, len(index.company_names), index.bucket_codes, index.ratings
+    )
+    company_codes = index.exact_companies(companies)
+    return payload(build_filtered_statistics(
+        df, index, aggregates, company_codes, buckets,
+        index.filter(companies=company_codes, buckets=buckets), '2024-01-15 10:30:00',
+    ))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_filtered_statistics_match_statistics_of_matching_plans(seed):
+    rng = np.random.default_rng(seed)
+    df = fuzzed_frame(rng, int(rng.integers(5, 200)))
+    names = sorted(df['Company'].unique())
+    companies = list(rng.choice(names, int(rng.integers(1, len(names) + 1)), replace=False))
+    buckets = np.sort(rng.choice(OTHER_BUCKET + 1, int(rng.integers(1, OTHER_BUCKET + 2)), replace=False))
+
+    index = build_index(df)
+    selected = df['Company'].isin(companies).to_numpy() & np.isin(index.bucket_codes, buckets)
+    subset = df[selected].reset_index(drop=True)
+    expected = payload(build_statistics(subset, build_index(subset), '2024-01-15 10:30:00'))
+
+    assert filtered_payload(df, companies, buckets) == expected
+
+
+def test_unfiltered_statistics_are_identical():
+    df = fuzzed_frame(np.random.default_rng(1), 500)
+    expected = payload(build_statistics(df, build_index(df), '2024-01-15 10:30:00'))
+    actual = filtered_payload(df, sorted(df['Company'].unique()), np.arange(OTHER_BUCKET + 1))
+    assert actual == expected